@@ -1,9 +1,14 @@
 # ai_monitor.py
-# Monitors active app and notifies DigitalDog if a distracting app is used too long (macOS only)
+# Monitors active app and notifies DigitalDog if a distracting app is used too long.
+# The foreground app comes from a focus_probes backend (macOS, X11, or a fake one);
+# every focus session is recorded in the shared focus log for reports.
 import time
-from PyQt5.QtCore import QTimer, QObject
-from AppKit import NSWorkspace
-import subprocess
+from PyQt5.QtCore import QCoreApplication, QTimer, QObject
+from blocklist import BlocklistWatcher, BLOCKLIST_FILE
+from focus_log import domain_of, shared_focus_log
+from focus_probes import select_probe
+from notifications import shared_dispatcher, LOW
+from probe_worker import FocusWatcher
 
 DISTRACTING_BUNDLE_IDS = [
     "com.apple.Safari",
@@ -14,6 +19,11 @@ DISTRACTING_BUNDLE_IDS = [
     "com.instagram.desktop",      # Instagram desktop app (if installed)
     "com.brave.Browser",          # Brave browser
     "com.microsoft.edgemac",      # Microsoft Edge
+    # Linux (X11 WM_CLASS)
+    "google-chrome",
+    "firefox",
+    "brave-browser",
+    "microsoft-edge",
     # Add more bundle IDs as needed
 ]
 DISTRACTING_URL_KEYWORDS = [
@@ -25,83 +35,90 @@ DISTRACTING_URL_KEYWORDS = [
     # Add more site keywords as needed
 ]
 DISTRACTING_THRESHOLD_SECONDS = 5  # 1 minute
+# Used when blocklist.txt is missing; the file holds the same rules and can be edited live
+DEFAULT_RULES = [f"app:{bundle_id}" for bundle_id in DISTRACTING_BUNDLE_IDS] + DISTRACTING_URL_KEYWORDS
+
 
 class AIMonitor(QObject):
-    def __init__(self, dog):
+    """Reacts to focus changes reported by a FocusWatcher. Probing (including the
+    browser URL lookups) happens on the watcher's thread; a distraction is
+    announced once it has lasted DISTRACTING_THRESHOLD_SECONDS, then again every
+    threshold while it continues. probe defaults to the platform's backend; with
+    none available, monitoring is simply off."""
+    def __init__(self, dog, probe=None, focus_log=None):
         super().__init__()
         self.dog = dog
+        self.focus_log = focus_log if focus_log is not None else shared_focus_log()
         self.last_app = None
-        self.distract_start_time = None
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.check_active_app)
-        self.timer.start(2000)  # Check every 2 seconds
         self.last_url = None
+        self.distract_timer = QTimer(self)
+        self.distract_timer.setInterval(int(DISTRACTING_THRESHOLD_SECONDS * 1000))
+        self.distract_timer.timeout.connect(self._on_distracted)
+        self.blocklist = BlocklistWatcher(BLOCKLIST_FILE, DEFAULT_RULES, self)
+        self.blocklist.reloaded.connect(self._on_blocklist_reloaded)
+        probe = probe if probe is not None else select_probe()
+        self.watcher = None
+        if probe is None:
+            print("[AI] No focus probe for this platform; distraction monitoring is off")
+            return
+        self.watcher = FocusWatcher(probe, self)
+        self.watcher.focus_changed.connect(self._on_focus_changed)
+        self.watcher.start()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
 
-    def get_chrome_url(self):
-        try:
-            script = 'tell application "Google Chrome" to get URL of active tab of front window'
-            result = subprocess.run(["osascript", "-e", script], capture_output=True, text=True)
-            url = result.stdout.strip()
-            return url
-        except Exception as e:
-            return None
+    def check_active_app(self):
+        # Ask for a probe now instead of waiting for the next interval
+        if self.watcher is not None:
+            self.watcher.probe_now()
 
-    def get_brave_url(self):
-        try:
-            script = 'tell application "Brave Browser" to get URL of active tab of front window'
-            result = subprocess.run(["osascript", "-e", script], capture_output=True, text=True)
-            url = result.stdout.strip()
-            return url
-        except Exception as e:
-            return None
+    def stop(self):
+        self.distract_timer.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.focus_log.close()
+        self.focus_log.save_rollups()
 
-    def check_active_app(self):
-        active_app = NSWorkspace.sharedWorkspace().frontmostApplication()
-        bundle_id = active_app.bundleIdentifier()
-        # print(f"[AI] Active app: {bundle_id}")
-        url = None
-        if bundle_id == "com.google.Chrome":
-            url = self.get_chrome_url()
-        elif bundle_id == "com.brave.Browser":
-            url = self.get_brave_url()
+    def _on_focus_changed(self, bundle_id, url):
+        # print(f"[AI] Active app: {bundle_id} {url or ''}")
+        self.last_app = bundle_id
+        self.last_url = url
+        distracting = self.blocklist.is_distracting(bundle_id, url)
+        self.focus_log.switch(bundle_id, domain_of(url), distracting)
+        if distracting:
+            # A new distraction restarts the countdown; timer keeps repeating while it lasts
+            self.distract_timer.start()
+            self._set_distraction(time.monotonic())
         else:
-            url = None
+            self.distract_timer.stop()
+            self._set_distraction(None)
 
-        if url and any(keyword in url for keyword in DISTRACTING_URL_KEYWORDS):
-            if self.last_url != url:
-                self.distract_start_time = time.time()
-                self.last_url = url
-            elif self.distract_start_time and (time.time() - self.distract_start_time > DISTRACTING_THRESHOLD_SECONDS):
-                self.react_to_distraction(bundle_id, url)
-            return
-        else:
-            self.last_url = None
-            self.distract_start_time = None
-        if bundle_id in DISTRACTING_BUNDLE_IDS:
-            if self.last_app != bundle_id:
-                self.distract_start_time = time.time()
-                self.last_app = bundle_id
-            elif self.distract_start_time and (time.time() - self.distract_start_time > DISTRACTING_THRESHOLD_SECONDS):
-                self.react_to_distraction(bundle_id)
-        else:
-            self.last_app = None
-            self.distract_start_time = None
+    def _set_distraction(self, since):
+        # Lets the probe schedule tighten as the threshold nears and back off otherwise
+        if self.watcher is not None:
+            self.watcher.set_distraction(since, DISTRACTING_THRESHOLD_SECONDS)
+
+    def _on_blocklist_reloaded(self, blocklist):
+        # Same focus, new rules: only start or stop the countdown, never restart it
+        distracting = blocklist.is_distracting(self.last_app, self.last_url)
+        self.focus_log.switch(self.last_app, domain_of(self.last_url), distracting)
+        if not distracting:
+            self.distract_timer.stop()
+            self._set_distraction(None)
+        elif not self.distract_timer.isActive():
+            self.distract_timer.start()
+            self._set_distraction(time.monotonic())
 
-    def show_mac_notification(self, title, message):
-        script = f'display notification "{message}" with title "{title}"'
-        subprocess.run(["osascript", "-e", script])
+    def _on_distracted(self):
+        url = self.last_url if self.blocklist.blocklist.check_url(self.last_url) else None
+        self.react_to_distraction(self.last_app, url)
 
     def react_to_distraction(self, bundle_id, url=None):
-        # Always send a macOS notification for distraction
+        # The dispatcher rate-limits the nag and picks the sinks: a desktop notification,
+        # and the speech bubble if the pet is already visible (LOW never slides it in)
         if url and "instagram.com" in url:
-            self.show_mac_notification("Digital Dog", "Instagram detected! Let's get back to work! 🐶")
+            message = "Instagram detected! Let's get back to work! 🐶"
         else:
-            self.show_mac_notification("Digital Dog", "Hey! Let's get back to work! 🐶")
-        # Optionally, also show the chat bubble if the pet is visible
-        if hasattr(self.dog, 'show_reminder_bubble') and self.dog.isVisible():
-            if url and "instagram.com" in url:
-                self.dog.show_reminder_bubble("Instagram detected! Let's get back to work! 🐶")
-            else:
-                self.dog.show_reminder_bubble("Hey! Let's get back to work! 🐶")
-        # Reset so it doesn't spam
-        self.distract_start_time = time.time()
+            message = "Hey! Let's get back to work! 🐶"
+        shared_dispatcher().notify("monitor", message, key="distracted", priority=LOW)
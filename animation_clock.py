@@ -0,0 +1,141 @@
+# animation_clock.py
+# One timer that drives every frame sequence in the app. Frame indices are derived
+# from elapsed wall time, so an animation resumes on the right frame after being
+# paused or hidden, and the timer only wakes for the next frame boundary.
+import math
+import time
+from PyQt5.QtCore import QObject, QTimer, QEvent
+
+
+class _Animation:
+    __slots__ = ("name", "frames", "fps", "loop", "on_frame", "on_finished", "host",
+                 "start", "paused_at", "last_index")
+
+    def __init__(self, name, frames, fps, loop, on_frame, on_finished, host, start):
+        self.name = name
+        self.frames = frames
+        self.fps = fps
+        self.loop = loop
+        self.on_frame = on_frame
+        self.on_finished = on_finished
+        self.host = host
+        self.start = start
+        self.paused_at = None
+        self.last_index = None
+
+    def frame_count(self):
+        return None if self.frames is None else len(self.frames)
+
+    def index_at(self, now):
+        """Frame index for time now; None once a non-looping animation has run out."""
+        if hasattr(self.frames, "index_at"):
+            # Sources with their own per-frame delays (e.g. a streamed GIF)
+            return self.frames.index_at(now - self.start, self.loop)
+        index = int((now - self.start) * self.fps)
+        count = self.frame_count()
+        if count is None:
+            return index
+        if self.loop:
+            return index % count if count else None
+        return index if index < count else None
+
+    def next_boundary(self, now):
+        if hasattr(self.frames, "next_boundary"):
+            return self.start + self.frames.next_boundary(now - self.start)
+        return self.start + (math.floor((now - self.start) * self.fps) + 1) / self.fps
+
+
+class AnimationClock(QObject):
+    """Schedules registered animations from a single-shot timer.
+
+    Each animation is tied to a host widget; while none of the hosts are visible
+    the timer is not armed at all. frames may be any sized sequence (it is re-read
+    every tick, so a FrameSet that is still loading just works) or None for an
+    unbounded counter. Sources that define index_at/next_boundary supply their
+    own timing and fps is ignored.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.animations = {}
+        self._hosts = set()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.tick)
+
+    def play(self, name, frames, fps, on_frame, loop=True, on_finished=None, host=None):
+        """(Re)start an animation from frame 0. on_frame(index) fires when the index changes."""
+        self.animations[name] = _Animation(name, frames, fps, loop, on_frame, on_finished, host, time.monotonic())
+        if host is not None and host not in self._hosts:
+            host.installEventFilter(self)
+            self._hosts.add(host)
+        self.tick()
+
+    def stop(self, name):
+        self.animations.pop(name, None)
+        self._reschedule()
+
+    def is_playing(self, name):
+        return name in self.animations
+
+    def pause(self, name):
+        animation = self.animations.get(name)
+        if animation and animation.paused_at is None:
+            animation.paused_at = time.monotonic()
+            self._reschedule()
+
+    def resume(self, name, keep_time=True):
+        """Resume a paused animation. keep_time=False continues from where it stopped."""
+        animation = self.animations.get(name)
+        if animation and animation.paused_at is not None:
+            if not keep_time:
+                animation.start += time.monotonic() - animation.paused_at
+            animation.paused_at = None
+            self.tick()
+
+    def _is_active(self, animation):
+        if animation.paused_at is not None:
+            return False
+        return animation.host is None or animation.host.isVisible()
+
+    def tick(self):
+        now = time.monotonic()
+        for animation in list(self.animations.values()):
+            if not self._is_active(animation):
+                continue
+            index = animation.index_at(now)
+            if index is None:
+                if animation.frame_count() == 0 and animation.loop:
+                    continue  # nothing loaded yet
+                self.animations.pop(animation.name, None)
+                if animation.on_finished:
+                    animation.on_finished()
+                continue
+            if index != animation.last_index:
+                animation.last_index = index
+                animation.on_frame(index)
+        self._reschedule()
+
+    def _reschedule(self):
+        now = time.monotonic()
+        boundaries = [a.next_boundary(now) for a in self.animations.values() if self._is_active(a)]
+        if not boundaries:
+            self.timer.stop()
+            return
+        self.timer.start(max(0, int(math.ceil((min(boundaries) - now) * 1000))))
+
+    def eventFilter(self, obj, event):
+        if obj in self._hosts and event.type() in (QEvent.Show, QEvent.Hide):
+            # Showing catches every animation up to the current time immediately
+            QTimer.singleShot(0, self.tick)
+        return False
+
+
+_shared_clock = None
+
+
+def shared_clock():
+    """The application-wide clock (created on first use, after QApplication exists)."""
+    global _shared_clock
+    if _shared_clock is None:
+        _shared_clock = AnimationClock()
+    return _shared_clock
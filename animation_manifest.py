@@ -0,0 +1,152 @@
+# animation_manifest.py
+# Declarative animation list (animations.json) and the state machine that plays it.
+# Only "preload": 0 sets load at startup; the rest are prefetched in the background
+# in priority order, and anything without a priority loads on first use.
+import json
+from PyQt5.QtCore import QObject, pyqtSignal
+
+MANIFEST_FILE = "animations.json"
+IDLE = "idle"
+
+DEFAULT_MANIFEST = {
+    IDLE: {"frames": "Dog tongue animation/Dog_Tongue_*.png", "fps": 5, "loop": True, "preload": 0},
+}
+
+
+class AnimationSpec:
+    __slots__ = ("name", "frames", "fps", "loop", "preload", "then")
+
+    def __init__(self, name, frames, fps=5, loop=True, preload=None, then=IDLE):
+        self.name = name
+        self.frames = frames
+        self.fps = float(fps)
+        self.loop = bool(loop)
+        self.preload = preload
+        self.then = then
+
+
+def parse_manifest(data):
+    specs = {}
+    for name, entry in data.items():
+        if "frames" not in entry:
+            raise ValueError(f"animation '{name}' has no frames")
+        specs[name] = AnimationSpec(name, entry["frames"], entry.get("fps", 5), entry.get("loop", True),
+                                    entry.get("preload"), entry.get("then", IDLE))
+    if IDLE not in specs:
+        raise ValueError("manifest needs an 'idle' animation")
+    return specs
+
+
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, "r") as f:
+            return parse_manifest(json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"[Animations] Using built-in manifest, could not load {path}: {e}")
+        return parse_manifest(DEFAULT_MANIFEST)
+
+
+class DogAnimator(QObject):
+    """Moves the dog between idle and one-shot/looping actions (eating, walking, playing...).
+
+    Idle keeps running on the clock underneath and is only paused while an action
+    plays, so returning to idle lands on the frame it would be on by now. An action
+    with no frames on disk is skipped and the dog stays idle.
+    """
+    state_changed = pyqtSignal(str)
+
+    IDLE_KEY = "dog_idle"
+    ACTION_KEY = "dog_action"
+
+    def __init__(self, manifest, loader, clock, host, show_frame, size=(100, 100), device_pixel_ratio=1.0):
+        super().__init__(host)
+        self.manifest = manifest
+        self.loader = loader
+        self.clock = clock
+        self.host = host
+        self.show_frame = show_frame
+        self.size = size
+        self.device_pixel_ratio = device_pixel_ratio
+        self.state = None
+        self.idle_frames = None
+        self.idle_index = 0
+        self._prefetch_queue = []
+        self._prefetching = None
+        self.loader.frame_loaded.connect(self._on_frame_loaded)
+        self.loader.finished.connect(self._on_loader_finished)
+
+    def load(self, name):
+        spec = self.manifest[name]
+        return self.loader.load(spec.frames, size=self.size, device_pixel_ratio=self.device_pixel_ratio, name=name)
+
+    def start(self):
+        spec = self.manifest[IDLE]
+        self.idle_frames = self.load(IDLE)
+        self._prefetch_queue = sorted(
+            (s for s in self.manifest.values() if s.name != IDLE and s.preload is not None),
+            key=lambda s: s.preload)
+        self.state = IDLE
+        self.clock.play(self.IDLE_KEY, self.idle_frames, spec.fps, self._show_idle_frame, host=self.host)
+        return self.idle_frames
+
+    def set_state(self, name):
+        """Switch to the named animation. Returns False if it has no frames to play."""
+        if name == IDLE or name not in self.manifest:
+            self._return_to_idle()
+            return name == IDLE
+        spec = self.manifest[name]
+        frames = self.load(name)
+        if not frames:
+            self._return_to_idle()
+            return False
+        self.clock.pause(self.IDLE_KEY)
+        # Replaces any action already in progress
+        self.clock.play(self.ACTION_KEY, frames, spec.fps, lambda index: self._show(frames, index),
+                        loop=spec.loop, on_finished=lambda: self.set_state(spec.then), host=self.host)
+        self._enter(name)
+        return True
+
+    def _return_to_idle(self):
+        self.clock.stop(self.ACTION_KEY)
+        self.clock.resume(self.IDLE_KEY)
+        self.restore_idle_frame()
+        self._enter(IDLE)
+
+    def _enter(self, name):
+        if name != self.state:
+            self.state = name
+            self.state_changed.emit(name)
+
+    def _show(self, frames, index):
+        frame = frames[index]
+        if frame is not None:
+            self.show_frame(frame)
+
+    def _show_idle_frame(self, index):
+        self.idle_index = index
+        self._show(self.idle_frames, index)
+
+    def restore_idle_frame(self):
+        if self.idle_frames and self.idle_frames[self.idle_index] is not None:
+            self.show_frame(self.idle_frames[self.idle_index])
+
+    def _on_frame_loaded(self, frame_set, index):
+        # Show the first idle frame as soon as any of them is decoded
+        if frame_set is self.idle_frames and self.state == IDLE and getattr(frame_set, "ready", 0) == 1:
+            self.idle_index = index
+            self.restore_idle_frame()
+
+    def _on_loader_finished(self, frame_set):
+        if frame_set is self.idle_frames and self._prefetching is None:
+            self._prefetch_next()
+        elif self._prefetching is not None and frame_set.name == self._prefetching:
+            self._prefetch_next()
+
+    def _prefetch_next(self):
+        # One set at a time so background decoding never competes with the idle loop
+        if not self._prefetch_queue:
+            self._prefetching = ""
+            return
+        spec = self._prefetch_queue.pop(0)
+        self._prefetching = spec.name
+        self.load(spec.name)
@@ -0,0 +1,724 @@
+# benchmarks.py
+# Timing harness for the pet's hot paths. Runs headless:
+#   QT_QPA_PLATFORM=offscreen python benchmarks.py --output bench.json
+#   QT_QPA_PLATFORM=offscreen python benchmarks.py --compare bench.json
+# Each benchmark runs at every requested size (--tasks, --frames, --events), keeps the
+# best of --repeat runs per metric, and results go to JSON. --compare flags any metric that
+# got slower than the stored baseline by more than --threshold, or has no result at
+# all, and exits non-zero; so does any benchmark that fails.
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from PyQt5.QtCore import QEventLoop, QTimer, Qt, QT_VERSION_STR
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QApplication, QLabel
+from dog_animation import FrameLoader, load_frames
+from pixmap_cache import PixmapCache
+from blocklist import Blocklist
+from calendar_cache import CalendarCache
+from focus_log import FocusLog
+from focus_probes import FakeProbe
+from notifications import NotificationDispatcher, URGENT, LOW
+from helper_process import HELPER_SCRIPT, HelperError, HelperProcess, HelperTimeout
+from probe_worker import FocusWatcher
+from reminder_scheduler import ReminderScheduler
+from sprite_widget import SpriteWidget
+from persistence import DEBOUNCE_MS
+from task_store import TaskStore
+from tests.fake_calendar import FakeCalendarServer, RestCalendarClient, fake_event
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+TASK_SIZES = (10, 100, 1000, 10000, 100000)
+FRAME_SIZES = (5, 50, 500)
+EVENT_SIZES = (100, 1000, 10000)
+THRESHOLD = 0.15  # relative slowdown that counts as a regression
+NOISE_FLOOR_MS = 0.5  # absolute differences below this are run-to-run noise, never flagged
+GUI_BLOCK_BUDGET_MS = 16.0  # persistence_burst: one frame of GUI-thread work is always allowed,
+GUI_BLOCK_PER_CHANGE_MS = 0.003  # plus this much per change for collecting the journal lines
+DUE_BASE = 1893484800  # 2030-01-01, so no reminder is due while benchmarking
+# Files DigitalDog writes into its working directory; everything else is linked in
+STATE_FILES = {".sprite_cache", "pet_state.json", "pet_history.bin", "tasks.json", "tasks.journal", "focus_log",
+               "calendar_cache.sqlite3"}
+
+BENCHMARKS = []  # (name, size parameter or None, function)
+_qapp = None  # the QApplication main() runs under
+
+
+def benchmark(name, param=None):
+    """Register fn(size) -> {metric: ms}; param is "tasks", "frames", "events" or None."""
+    def register(fn):
+        BENCHMARKS.append((name, param, fn))
+        return fn
+    return register
+
+
+def _settle(ms):
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+# --- Fixtures ---
+
+def make_frames(directory, count, size=256):
+    """Write count synthetic PNG frames; returns their glob pattern."""
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setBrush(QColor.fromHsv(i * 7 % 360, 200, 220))
+        painter.drawEllipse(i % 64, i % 48, size - 80, size - 60)
+        painter.end()
+        image.save(os.path.join(directory, f"frame_{i:04d}.png"))
+    return os.path.join(directory, "frame_*.png")
+
+
+def make_records(count):
+    return [(f"task {i} review report", DUE_BASE + i * 60, {}) for i in range(count)]
+
+
+def write_task_file(directory, count):
+    path = os.path.join(directory, "tasks.json")
+    store = TaskStore(path, debounce_ms=None)
+    store.add_many(make_records(count))
+    store.compact()
+    return path
+
+
+# --- Frame loading and painting ---
+
+def bench_frame_loading(pattern, cache_dir, timeout_ms=60000):
+    """Return (time-to-first-frame, time-to-all-frames) in ms for one FrameLoader.load."""
+    # A private pixmap cache, so "warm" measures the on-disk atlas and not memory
+    loader = FrameLoader(cache_dir=cache_dir, cache=PixmapCache())
+    loop = QEventLoop()
+    marks = {}
+
+    def on_frame_loaded(frame_set, index):
+        marks.setdefault("first", time.perf_counter())
+
+    def on_finished(frame_set):
+        marks["all"] = time.perf_counter()
+        loop.quit()
+
+    loader.frame_loaded.connect(on_frame_loaded)
+    loader.finished.connect(on_finished)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    start = time.perf_counter()
+    frame_set = loader.load(pattern)
+    if "all" not in marks:
+        loop.exec_()
+    loader.pool.waitForDone()  # let the atlas write-back finish before the next run
+    first = (marks.get("first", start) - start) * 1000
+    total = (marks.get("all", start) - start) * 1000
+    return first, total, len(frame_set)
+
+
+@benchmark("frame_load", "frames")
+def frame_load(count):
+    work = tempfile.mkdtemp(prefix="dogbench-")
+    try:
+        pattern = make_frames(os.path.join(work, "frames"), count)
+        cache_dir = os.path.join(work, "cache")
+        cold_first, cold_all, _ = bench_frame_loading(pattern, cache_dir)
+        warm_first, warm_all, _ = bench_frame_loading(pattern, cache_dir)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {"cold_first_ms": cold_first, "cold_all_ms": cold_all,
+            "warm_first_ms": warm_first, "warm_all_ms": warm_all}
+
+
+def bench_frame_paint(widget_class, frames, ticks=200):
+    """Mean ms per animation tick (set the frame, then flush the repaint) for a widget class."""
+    widget = widget_class()
+    widget.setAttribute(Qt.WA_TranslucentBackground, True)
+    widget.setFixedSize(200, 200)
+    widget.show()
+    app = QApplication.instance()
+    app.processEvents()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        widget.setPixmap(frames[tick % len(frames)])
+        app.processEvents()
+    elapsed = (time.perf_counter() - start) * 1000
+    widget.close()
+    return elapsed / ticks
+
+
+@benchmark("frame_paint")
+def frame_paint(_):
+    cache_dir = tempfile.mkdtemp(prefix="dogbench-")
+    frames = load_frames(os.path.join(REPO_DIR, "Dog tongue animation/Dog_Tongue_*.png"), cache_dir=cache_dir)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    if not frames:
+        return {}
+    return {f"{widget_class.__name__}_tick_ms": bench_frame_paint(widget_class, frames)
+            for widget_class in (QLabel, SpriteWidget)}
+
+
+# --- Startup ---
+
+def startup_probe():
+    """Child-process side of the startup benchmark: build the dog in the current
+    directory and print import/construct/first-frame times as JSON."""
+    start = time.perf_counter()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    from digital_dog import DigitalDog
+    imported = _ms(start)
+    dog = DigitalDog()
+    constructed = _ms(start)
+    loop = QEventLoop()
+    frames = dog.dog_frames
+    if frames is not None and len(frames) and not getattr(frames, "ready", 1):
+        dog.frame_loader.frame_loaded.connect(lambda *args: loop.quit())
+        QTimer.singleShot(30000, loop.quit)
+        loop.exec_()
+    first_frame = _ms(start)
+    dog.frame_loader.pool.waitForDone()
+    print(json.dumps({"import_ms": imported, "construct_ms": constructed, "first_frame_ms": first_frame}))
+    app.quit()
+
+
+def _startup_dir():
+    # The real assets, linked into a scratch directory so no state file is touched
+    work = tempfile.mkdtemp(prefix="dogbench-")
+    for name in os.listdir(REPO_DIR):
+        if name not in STATE_FILES and not name.startswith("."):
+            os.symlink(os.path.join(REPO_DIR, name), os.path.join(work, name))
+    return work
+
+
+def _run_startup(work):
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+               PYTHONPATH=REPO_DIR)
+    result = subprocess.run([sys.executable, os.path.join(REPO_DIR, "benchmarks.py"), "--startup-probe"],
+                            cwd=work, env=env, capture_output=True, text=True, timeout=120)
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode or not lines:
+        raise RuntimeError(f"startup probe failed: {result.stderr.strip()[-400:]}")
+    return json.loads(lines[-1])
+
+
+@benchmark("startup")
+def startup(_):
+    """A fresh process per run: cold has no atlas cache yet, warm reuses it."""
+    work = _startup_dir()
+    try:
+        cold = _run_startup(work)
+        warm = _run_startup(work)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    metrics = {f"cold_{key}": value for key, value in cold.items()}
+    metrics.update({f"warm_{key}": value for key, value in warm.items()})
+    return metrics
+
+
+@benchmark("task_manager_startup", "tasks")
+def task_manager_startup(count):
+    from task_manager import TaskManager
+    work = tempfile.mkdtemp(prefix="dogbench-")
+    try:
+        path = write_task_file(work, count)
+        manager_class = type("BenchTaskManager", (TaskManager,), {"TASKS_FILE": path})
+        start = time.perf_counter()
+        manager = manager_class()
+        elapsed = _ms(start)
+        manager.store.close()
+        manager.deleteLater()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {"construct_ms": elapsed}
+
+
+# --- Reminders ---
+
+@benchmark("reminder_scan", "tasks")
+def reminder_scan(count):
+    """Arming every task's two reminders, a check_reminders pass with nothing due, and
+    per-task cancel+reschedule churn."""
+    scheduler = ReminderScheduler(lambda key, payload: None, clock=lambda: DUE_BASE - 3600)
+    start = time.perf_counter()
+    for task_id in range(count):
+        scheduler.schedule((task_id, "upcoming"), DUE_BASE + task_id * 60 - 600)
+        scheduler.schedule((task_id, "due"), DUE_BASE + task_id * 60)
+    arm = _ms(start)
+    start = time.perf_counter()
+    for _ in range(100):
+        scheduler.fire_due()
+    scan = _ms(start) / 100
+    churn_ops = min(count, 1000)
+    start = time.perf_counter()
+    for task_id in range(churn_ops):
+        scheduler.cancel((task_id, "due"))
+        scheduler.schedule((task_id, "due"), DUE_BASE + task_id * 60 + 30)
+    churn = _ms(start) / churn_ops
+    scheduler.timer.stop()
+    return {"arm_ms": arm, "scan_ms": scan, "reschedule_ms": churn}
+
+
+# --- Task persistence ---
+
+@benchmark("task_save_load", "tasks")
+def task_save_load(count):
+    work = tempfile.mkdtemp(prefix="dogbench-")
+    try:
+        path = os.path.join(work, "tasks.json")
+        store = TaskStore(path, compact_min_ops=10 ** 9)
+        start = time.perf_counter()
+        store.add_many(make_records(count))
+        insert = _ms(start)
+        store.flush()
+        start = time.perf_counter()
+        replay_store = TaskStore(path, compact_min_ops=10 ** 9, debounce_ms=None)
+        replay = _ms(start)
+        start = time.perf_counter()
+        store.compact()
+        store.flush()
+        save = _ms(start)
+        store.close()
+        start = time.perf_counter()
+        loaded = TaskStore(path, debounce_ms=None)
+        load = _ms(start)
+        assert len(loaded.tasks) == len(replay_store.tasks) == count
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {"insert_ms": insert, "save_ms": save, "load_ms": load, "journal_replay_ms": replay}
+
+
+@benchmark("persistence_burst", "tasks")
+def persistence_burst(count, settle_ms=500):
+    """Add count tasks one by one as fast as possible, editing every third and completing
+    every fifth along the way, with the event loop running in between as it would for a
+    user or a voice burst: per-change cost, writes and GUI-thread blocking. Writes must
+    stay at one per debounce window (plus the final flush), blocking within
+    GUI_BLOCK_BUDGET_MS, and after flush() the file must hold exactly these edits."""
+    work = tempfile.mkdtemp(prefix="dogbench-")
+    try:
+        path = os.path.join(work, "tasks.json")
+        store = TaskStore(path)
+        expected = {}  # id -> (text, due) of the tasks still pending
+        changes = 0
+        start = time.perf_counter()
+        for i in range(count):
+            if i % 50 == 0:
+                QApplication.processEvents()  # lets debounce windows close mid-burst
+            record = store.add(f"task {i}", DUE_BASE + i)
+            expected[record.id] = (record.text, record.due)
+            changes += 1
+            if i % 3 == 0:
+                store.edit(record.id, text=f"task {i} (edited)")
+                expected[record.id] = (f"task {i} (edited)", record.due)
+                changes += 1
+            if i % 5 == 0:
+                store.complete(record.id)
+                del expected[record.id]
+                changes += 1
+        per_change = _ms(start) / changes
+        _settle(settle_ms)
+        store.flush()
+        elapsed_ms = _ms(start)
+        on_disk = {r.id: (r.text, r.due) for r in TaskStore(path, debounce_ms=None).pending()}
+        store.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    if on_disk != expected:
+        missing = len(expected.keys() - on_disk.keys())
+        wrong = sum(1 for k in expected.keys() & on_disk.keys() if expected[k] != on_disk[k])
+        raise RuntimeError(f"after flush() the file has {len(on_disk)} pending tasks, expected "
+                           f"{len(expected)} ({missing} missing, {wrong} with stale fields)")
+    max_writes = elapsed_ms // DEBOUNCE_MS + 2
+    if store.worker.writes > max_writes:
+        raise RuntimeError(f"{store.worker.writes} writes in {elapsed_ms:.0f} ms; debouncing allows {max_writes:.0f}")
+    budget = max(GUI_BLOCK_BUDGET_MS, changes * GUI_BLOCK_PER_CHANGE_MS)
+    if store.worker.gui_blocked_ms > budget:
+        raise RuntimeError(f"saving blocked the GUI thread for {store.worker.gui_blocked_ms:.1f} ms "
+                           f"over {changes} changes (budget {budget:.1f} ms)")
+    return {"change_ms": per_change, "gui_blocked_ms": store.worker.gui_blocked_ms,
+            "writes": store.worker.writes}
+
+
+# --- Focus probing ---
+
+def _max_gap(duration_ms, interval_ms=5):
+    """Run the GUI event loop for duration_ms; return the longest gap between heartbeats."""
+    marks = [time.perf_counter()]
+    heartbeat = QTimer()
+    heartbeat.timeout.connect(lambda: marks.append(time.perf_counter()))
+    heartbeat.start(interval_ms)
+    _settle(duration_ms)
+    heartbeat.stop()
+    marks.append(time.perf_counter())
+    return max(b - a for a, b in zip(marks, marks[1:])) * 1000
+
+
+@benchmark("focus_probe")
+def focus_probe(_):
+    """A probe that blocks 300 ms per call must not stall the GUI thread, a pushed
+    change should reach the GUI without any poll, and stop() must kill a helper
+    command that is still running instead of waiting for it."""
+    events = []
+    slow = FakeProbe("app.0", delay=0.3)
+    watcher = FocusWatcher(slow, interval_ms=50, timeout=1.0)
+    watcher.focus_changed.connect(lambda app_id, url: events.append(app_id))
+    watcher.start()
+    QTimer.singleShot(700, lambda: slow.push("app.1"))
+    gap = _max_gap(1500)
+    watcher.stop()
+    if events != ["app.0", "app.1"]:
+        raise RuntimeError(f"expected two focus changes from the slow probe, got {events}")
+    # Event-driven backend: time from a pushed change to the GUI-thread signal
+    pushed = FakeProbe("app.0", event_driven=True)
+    arrivals = []
+    watcher = FocusWatcher(pushed)
+    watcher.focus_changed.connect(lambda app_id, url: arrivals.append(time.perf_counter()))
+    watcher.start()
+    _settle(50)
+    sent = time.perf_counter()
+    pushed.push("app.1")
+    _settle(300)
+    watcher.stop()
+    if len(arrivals) != 2:
+        raise RuntimeError(f"expected two pushed focus changes, got {len(arrivals)}")
+    latency = (arrivals[1] - sent) * 1000
+    hung = FocusWatcher(lambda worker: (worker.run_command(["sleep", "10"], timeout=30), None),
+                        interval_ms=50, timeout=30)
+    hung.start()
+    _settle(100)
+    start = time.perf_counter()
+    hung.stop()
+    stop = _ms(start)
+    if hung.probe_thread.isRunning():
+        raise RuntimeError("probe thread did not stop")
+    return {"gui_max_gap_ms": gap, "stop_ms": stop, "push_latency_ms": latency}
+
+
+class _TimedProbe(FakeProbe):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.times = []
+
+    def probe(self, worker):
+        self.times.append(time.monotonic())
+        return super().probe(worker)
+
+
+@benchmark("probe_schedule")
+def probe_schedule(_, base_ms=40, threshold=0.6):
+    """Adaptive polling at a 40 ms base: probes made while focus is stable, how close
+    the last probe lands before a distraction's threshold, and probes while idle."""
+    probe = _TimedProbe("editor")
+    watcher = FocusWatcher(probe, interval_ms=base_ms)
+    watcher.start()
+    _settle(1500)
+    stable = len(probe.times)
+    since = time.monotonic()
+    watcher.set_distraction(since, threshold)
+    watcher.probe_now()
+    _settle(int(threshold * 1000) + 100)
+    before = [t for t in probe.times if since <= t < since + threshold]
+    lead_ms = (since + threshold - before[-1]) * 1000 if before else threshold * 1000
+    watcher.set_distraction(None, threshold)
+    probe.idle = float("inf")
+    _settle(200)
+    count = len(probe.times)
+    _settle(1000)
+    idle = len(probe.times) - count
+    probe.idle = None
+    probe.push("browser")
+    changed = []
+    watcher.focus_changed.connect(lambda app_id, url: changed.append(app_id))
+    _settle(300)
+    watcher.stop()
+    stats = watcher.stats
+    if idle or changed != ["browser"]:
+        raise RuntimeError(f"expected no probes while idle and a prompt resume, got {idle} and {changed}")
+    return {"stable_probes": stable, "fixed_probes": 1500 / base_ms, "threshold_lead_ms": lead_ms,
+            "saved_per_hour": stats["saved_per_hour"]}
+
+
+@benchmark("helper")
+def helper(_, calls=200):
+    """Round trip to the persistent helper (fake backend) against starting a helper per
+    call, plus recovery from a crash and from a request that hangs."""
+    process = HelperProcess(backend="fake", timeout=2.0)
+    try:
+        process.request("ping")  # started outside the timing, as it is once per session
+        start = time.perf_counter()
+        for _ in range(calls):
+            process.request("script", source="URL of active tab")
+        roundtrip = _ms(start) / calls
+        command = [sys.executable, HELPER_SCRIPT, "--backend", "fake"]
+        request = json.dumps({"id": 1, "op": "script", "args": {"source": "URL of active tab"}}) + "\n"
+        start = time.perf_counter()
+        for _ in range(10):
+            subprocess.run(command, input=request, capture_output=True, text=True, check=True)
+        spawn = _ms(start) / 10
+        try:
+            process.request("crash")
+        except HelperError:
+            pass
+        start = time.perf_counter()
+        process.request("ping")
+        restart = _ms(start)
+        start = time.perf_counter()
+        try:
+            process.request("sleep", timeout=0.2, seconds=10)
+            raise RuntimeError("a hung request did not time out")
+        except HelperTimeout:
+            pass
+        hung = _ms(start)
+        if process.request("ping") != "pong" or process.restarts != 2:
+            raise RuntimeError(f"helper did not recover (restarts={process.restarts})")
+    finally:
+        process.close()
+    return {"roundtrip_ms": roundtrip, "spawn_per_call_ms": spawn, "restart_ms": restart, "timeout_ms": hung}
+
+
+@benchmark("notifications")
+def notifications(_, overdue=200, nags=50):
+    """A storm of overdue-task reminders plus repeated distraction nags through the
+    dispatcher: cost per notify() call and what actually reaches the sinks."""
+    dispatcher = NotificationDispatcher(coalesce_ms=20)
+    shown = []
+    dispatcher.add_sink(lambda notification: shown.append(notification))
+    start = time.perf_counter()
+    for i in range(overdue):
+        dispatcher.notify("tasks", f"Task 'task {i}' is due!", key=(i, "due"), priority=URGENT,
+                          summary="{count} tasks overdue")
+    for _ in range(nags):
+        dispatcher.notify("monitor", "Hey! Let's get back to work!", key="distracted", priority=LOW)
+    notify_us = _ms(start) * 1000 / (overdue + nags)
+    _settle(100)
+    if [n.message for n in shown] != [f"{overdue} tasks overdue", "Hey! Let's get back to work!"]:
+        raise RuntimeError(f"unexpected deliveries: {[n.message for n in shown]}")
+    return {"notify_us": notify_us, "delivered": len(shown), "coalesced": dispatcher.stats["coalesced"],
+            "duplicates": dispatcher.stats["duplicates"]}
+
+
+@benchmark("blocklist")
+def blocklist(_, rules=20000, lookups=20000):
+    """Compile a large block/allow list, then time URL and app lookups against it."""
+    lines = []
+    for i in range(rules // 4):
+        lines += [f"site{i}.example.com", f"news{i}.example.org/sport/live",
+                  f"!site{i}.example.com/docs", f"app:com.vendor{i}.*"]
+    start = time.perf_counter()
+    compiled = Blocklist(lines)
+    compile_ms = _ms(start)
+    urls = [f"https://m.site{i}.example.com/docs/page?q={i}" for i in range(lookups)]
+    start = time.perf_counter()
+    for url in urls:
+        compiled.check_url(url)
+    url_us = _ms(start) * 1000 / lookups
+    apps = [f"com.vendor{i}.editor" for i in range(lookups)]
+    start = time.perf_counter()
+    for app_id in apps:
+        compiled.check_app(app_id)
+    app_us = _ms(start) * 1000 / lookups
+    if compiled.is_distracting(None, "https://notsite1.example.com.evil/"):
+        raise RuntimeError("suffix rule matched an unrelated host")
+    if compiled.check_url(urls[1]) is not False or compiled.check_app(apps[1]) is not True:
+        raise RuntimeError("blocklist gave the wrong verdict")
+    return {"compile_ms": compile_ms, "url_lookup_us": url_us, "app_lookup_us": app_us}
+
+
+@benchmark("focus_report")
+def focus_report(_, days=180, per_day=200):
+    """Log months of focus sessions, then time reports (served from the rollups) and
+    reopening the log; the reports must agree with a scan of the raw sessions."""
+    directory = tempfile.mkdtemp(prefix="dogbench-focus-")
+    try:
+        focus = FocusLog(directory)
+        now = time.time()
+        t = now - days * 86400
+        step = 86400 / per_day
+        apps = [f"app.{i}" for i in range(40)]
+        start = time.perf_counter()
+        for i in range(days * per_day):
+            focus.append(t, step * 0.9, apps[i % 40], f"site{i % 25}.com" if i % 3 == 0 else None, i % 4 == 0)
+            t += step
+        append_us = _ms(start) * 1000 / (days * per_day)
+        focus.save_rollups()
+        timings = {}
+        for span in (7, 30, 365):
+            start = time.perf_counter()
+            report = focus.report(span, now)
+            timings[f"report_{span}d_ms"] = _ms(start)
+        scanned = sum(duration for _, duration, *rest in focus.sessions(float("-inf"), float("inf")))
+        if abs(report["seconds"] - scanned) > 1.0:
+            raise RuntimeError(f"rollups cover {report['seconds']:.0f}s, the log {scanned:.0f}s")
+        start = time.perf_counter()
+        reopened = FocusLog(directory)
+        timings["load_ms"] = _ms(start)
+        if len(reopened) != days * per_day or reopened.report(365, now)["sessions"] != report["sessions"]:
+            raise RuntimeError("reopened log does not match")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return dict(timings, append_us=append_us)
+
+
+@benchmark("calendar_sync", "events")
+def calendar_sync(count):
+    """Full sync of count events from a local fake Calendar server, then an incremental
+    sync after a handful of edits: time and bytes transferred for each, and the cost of
+    reading the upcoming list from the cache. The cache must mirror the server after
+    each sync, including after the server expires the sync token."""
+    server = FakeCalendarServer()
+    directory = tempfile.mkdtemp(prefix="dogbench-calendar-")
+    try:
+        base = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        for i in range(count):
+            server.put(fake_event(i, base + datetime.timedelta(minutes=30 * (i - count // 2))))
+        client = RestCalendarClient(server.base_url)
+        cache = CalendarCache(os.path.join(directory, "calendar.sqlite3"))
+
+        def check():
+            live = sum(1 for e in server.events.values() if e.get("status") != "cancelled")
+            if cache.count() != live:
+                raise RuntimeError(f"cache holds {cache.count()} events, server {live}")
+
+        start = time.perf_counter()
+        cache.sync(client)
+        full_ms, full_kb = _ms(start), client.bytes_received / 1024
+        check()
+        ids = sorted(server.events)
+        for event_id in ids[:5]:
+            server.put(dict(server.events[event_id], summary="Moved"))
+        for event_id in ids[5:7]:
+            server.delete(event_id)
+        for i in range(3):
+            server.put(fake_event(count + i, base + datetime.timedelta(hours=i + 1)))
+        client.bytes_received = 0
+        start = time.perf_counter()
+        changed = cache.sync(client)
+        incremental_ms, incremental_kb = _ms(start), client.bytes_received / 1024
+        check()
+        if changed != 10:
+            raise RuntimeError(f"incremental sync saw {changed} changes, expected 10")
+        start = time.perf_counter()
+        cache.upcoming(20)
+        read_ms = _ms(start)
+        server.min_token = server.version + 1
+        server.put(fake_event(count + 3, base))
+        cache.sync(client)  # 410, then a full sync
+        check()
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+    return {"full_sync_ms": full_ms, "full_sync_kb": full_kb, "incremental_sync_ms": incremental_ms,
+            "incremental_sync_kb": incremental_kb, "cached_read_ms": read_ms}
+
+
+# --- Running and comparing ---
+
+def _sizes(text):
+    return tuple(int(part) for part in text.split(",") if part)
+
+
+def run(args):
+    """Returns (results, attempted keys, failures as [(key, error)])."""
+    results, attempted, failures = {}, [], []
+    for name, param, fn in BENCHMARKS:
+        if args.only and not any(word in name for word in args.only):
+            continue
+        sizes = {"tasks": args.tasks, "frames": args.frames, "events": args.events}.get(param, (None,))
+        for size in sizes:
+            key = name if size is None else f"{name}[{param}={size}]"
+            attempted.append(key)
+            best = {}
+            try:
+                for _ in range(args.repeat):
+                    for metric, value in fn(size).items():
+                        best[metric] = min(value, best.get(metric, value))
+            except ImportError as e:
+                # An optional dependency missing here; compare() still reports the gap
+                print(f"{key}: skipped ({e})")
+                continue
+            except Exception as e:
+                print(f"{key}: FAILED ({type(e).__name__}: {e})")
+                failures.append((key, e))
+                continue
+            results[key] = best
+            print(key + ": " + ", ".join(f"{metric} {value:.3f}" for metric, value in best.items()))
+    return results, attempted, failures
+
+
+def compare(results, baseline, threshold=THRESHOLD, attempted=None):
+    """Return [(key, metric, old, new)] for metrics more than threshold slower, plus
+    (key, None, None, None) for each baseline key (of those attempted, if given) that
+    has no result at all."""
+    regressions = []
+    for key in baseline:
+        if key not in results and (attempted is None or key in attempted):
+            regressions.append((key, None, None, None))
+    for key, metrics in results.items():
+        for metric, new in metrics.items():
+            old = baseline.get(key, {}).get(metric)
+            if old is None or not metric.endswith("_ms"):
+                continue
+            if new > old * (1 + threshold) and new - old > NOISE_FLOOR_MS:
+                regressions.append((key, metric, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Digital Dog benchmarks")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tasks", type=_sizes, default=TASK_SIZES, help="comma-separated task counts")
+    parser.add_argument("--frames", type=_sizes, default=FRAME_SIZES, help="comma-separated frame counts")
+    parser.add_argument("--events", type=_sizes, default=EVENT_SIZES, help="comma-separated calendar event counts")
+    parser.add_argument("--only", nargs="*", help="run benchmarks whose name contains any of these")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="flag regressions against a results file")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--startup-probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.startup_probe:
+        startup_probe()
+        return 0
+    global _qapp
+    # Kept in a global: PyQt destroys a QApplication as soon as nothing references it
+    _qapp = QApplication.instance() or QApplication(sys.argv[:1])
+    results, attempted, failures = run(args)
+    if args.output:
+        report = {
+            "meta": {"python": platform.python_version(), "qt": QT_VERSION_STR, "platform": platform.platform(),
+                     "qpa": os.environ.get("QT_QPA_PLATFORM", ""), "repeat": args.repeat,
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f).get("results", {})
+        regressions = compare(results, baseline, args.threshold, set(attempted))
+        for key, metric, old, new in regressions:
+            if metric is None:
+                print(f"REGRESSION {key}: in the baseline but produced no result")
+            else:
+                print(f"REGRESSION {key} {metric}: {old:.3f} -> {new:.3f} ms (+{(new / old - 1) * 100:.0f}%)")
+        print(f"{len(regressions)} regression(s) against {args.compare}")
+        if regressions:
+            return 1
+    if failures:
+        print(f"{len(failures)} benchmark(s) failed: " + ", ".join(key for key, _ in failures))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
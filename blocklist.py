@@ -0,0 +1,223 @@
+# blocklist.py
+# Block/allow rules for distracting apps and sites, compiled for fast lookups and
+# reloaded whenever the list file changes. One rule per line in blocklist.txt:
+#
+#   youtube.com              the domain and every subdomain (m.youtube.com, ...)
+#   reddit.com/r/funny       only paths under /r/funny on that domain
+#   app:com.netflix.Netflix  an app id; * and ? wildcards allowed (app:com.google.*)
+#   !youtube.com/feed/lectures   a leading ! turns any rule into an allow rule
+#
+# The most specific matching rule wins (deeper domain, then longer path, then a more
+# literal app pattern); an allow rule beats a block rule that is just as specific.
+import fnmatch
+import os
+import re
+from urllib.parse import urlsplit
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+BLOCKLIST_FILE = "blocklist.txt"
+RELOAD_DELAY_MS = 200  # editors often write a file in several steps
+
+
+class _Node:
+    __slots__ = ("children", "verdict", "paths")
+
+    def __init__(self):
+        self.children = {}
+        self.verdict = None  # True = block, False = allow, None = no rule ends here
+        self.paths = None  # domain nodes only: trie of path segments for this domain
+
+
+class _PatternNode:
+    __slots__ = ("children", "patterns")
+
+    def __init__(self):
+        self.children = {}
+        self.patterns = []  # (compiled regex, verdict) whose literal prefix ends here
+
+
+def _insert(root, parts, block):
+    node = root
+    for part in parts:
+        node = node.children.setdefault(part, _Node())
+    # Allow wins a tie between rules on the same key
+    node.verdict = block if node.verdict is None else (node.verdict and block)
+
+
+def _path_segments(path):
+    return [segment for segment in path.split("/") if segment]
+
+
+def _split_url(url):
+    if "://" not in url:
+        url = "http://" + url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").rstrip(".")
+    return host, parts.path
+
+
+class Blocklist:
+    """Compiled rules. Domains live in a trie keyed by reversed labels
+    (com -> youtube -> m) and each domain node holds a trie of path segments, so a
+    URL lookup walks each label and path segment once: O(len(url)) no matter how
+    many rules there are. Exact app ids are a dict; wildcard app ids hang off a
+    character trie of their literal prefix (the part before the first wildcard), so
+    only patterns whose prefix matches are ever tried."""
+
+    def __init__(self, rules=()):
+        self.domains = _Node()
+        self.apps = {}  # exact app id -> verdict
+        self.app_patterns = _PatternNode()
+        self.rule_count = 0
+        for rule in rules:
+            self.add(rule)
+
+    @classmethod
+    def parse(cls, text):
+        return cls(line for line in text.splitlines())
+
+    @classmethod
+    def load(cls, path=BLOCKLIST_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f)
+
+    def add(self, rule):
+        rule = rule.split("#", 1)[0].strip()
+        if not rule:
+            return
+        block = not rule.startswith("!")
+        rule = rule.lstrip("!").strip()
+        if rule.lower().startswith("app:"):
+            pattern = rule[4:].strip()
+            if any(char in pattern for char in "*?["):
+                node = self.app_patterns
+                for char in re.split(r"[*?\[]", pattern, 1)[0]:
+                    node = node.children.setdefault(char, _PatternNode())
+                node.patterns.append((re.compile(fnmatch.translate(pattern)), block))
+            else:
+                self.apps[pattern] = block if pattern not in self.apps else (self.apps[pattern] and block)
+        else:
+            host, path = _split_url(rule.lower())
+            if not host:
+                return
+            host = host[2:] if host.startswith("*.") else host
+            domain = self.domains
+            for label in reversed(host.split(".")):
+                domain = domain.children.setdefault(label, _Node())
+            if domain.paths is None:
+                domain.paths = _Node()
+            _insert(domain.paths, _path_segments(path), block)
+        self.rule_count += 1
+
+    def check_url(self, url):
+        """True if url is blocked, False if explicitly allowed, None if no rule applies."""
+        if not url:
+            return None
+        host, path = _split_url(url.lower())
+        if not host:
+            return None
+        segments = _path_segments(path)
+        best, best_rank = None, (-1, -1)
+        node = self.domains
+        for depth, label in enumerate(reversed(host.split(".")), 1):
+            node = node.children.get(label)
+            if node is None:
+                break
+            paths = node.paths
+            if paths is None:
+                continue
+            # Longest path prefix with a rule under this domain
+            verdict, length = paths.verdict, 0
+            path_node = paths
+            for index, segment in enumerate(segments, 1):
+                path_node = path_node.children.get(segment)
+                if path_node is None:
+                    break
+                if path_node.verdict is not None:
+                    verdict, length = path_node.verdict, index
+            if verdict is not None and (depth, length) >= best_rank:
+                best, best_rank = verdict, (depth, length)
+        return best
+
+    def check_app(self, app_id):
+        """True if app_id is blocked, False if explicitly allowed, None if no rule applies."""
+        if not app_id:
+            return None
+        verdict = self.apps.get(app_id)
+        if verdict is not None:
+            return verdict
+        # Patterns whose literal prefix app_id starts with, shortest prefix first
+        levels = []
+        node = self.app_patterns
+        for char in app_id:
+            if node.patterns:
+                levels.append(node.patterns)
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            if node.patterns:
+                levels.append(node.patterns)
+        for patterns in reversed(levels):
+            verdicts = [block for regex, block in patterns if regex.match(app_id)]
+            if verdicts:
+                return all(verdicts)  # allow wins a tie
+        return None
+
+    def is_distracting(self, app_id, url=None):
+        """A rule about the URL decides when there is one; otherwise the app's rule does."""
+        verdict = self.check_url(url)
+        if verdict is None:
+            verdict = self.check_app(app_id)
+        return bool(verdict)
+
+
+class BlocklistWatcher(QObject):
+    """Keeps a compiled Blocklist in sync with its file. The list is swapped in whole,
+    so lookups never see a half-loaded state; a file that fails to load keeps the
+    previous list."""
+    reloaded = pyqtSignal(object)  # the new Blocklist
+
+    def __init__(self, path=BLOCKLIST_FILE, default_rules=(), parent=None):
+        super().__init__(parent)
+        self.path = os.path.abspath(path)
+        self.default_rules = list(default_rules)
+        self.blocklist = Blocklist(self.default_rules)
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(RELOAD_DELAY_MS)
+        self.reload_timer.timeout.connect(self.reload)
+        # Watch the directory too: editors that save by rename replace the file
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.addPath(os.path.dirname(self.path))
+        self.watcher.fileChanged.connect(self._on_changed)
+        self.watcher.directoryChanged.connect(self._on_changed)
+        self.mtime = -1  # never loaded; None means the file is missing
+        self.reload()
+
+    def _on_changed(self, changed_path):
+        self.reload_timer.start()
+
+    def reload(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return
+        self.mtime = mtime
+        if mtime is None:
+            self.blocklist = Blocklist(self.default_rules)
+        else:
+            try:
+                self.blocklist = Blocklist.load(self.path)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"[Blocklist] Keeping the previous list, could not load {self.path}: {e}")
+                return
+            if self.path not in self.watcher.files():
+                self.watcher.addPath(self.path)
+        print(f"[Blocklist] Loaded {self.blocklist.rule_count} rule(s)")
+        self.reloaded.emit(self.blocklist)
+
+    def is_distracting(self, app_id, url=None):
+        return self.blocklist.is_distracting(app_id, url)
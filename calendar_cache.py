@@ -0,0 +1,170 @@
+# calendar_cache.py
+# Local SQLite copy of the calendar, kept current by the Calendar API's incremental
+# sync: the first sync pages through every event and stores the nextSyncToken it ends
+# with; later syncs send that token and receive only events changed since (deleted
+# ones arrive with status "cancelled"). The dashboard reads from here, so it shows
+# events instantly and while offline.
+import datetime
+import json
+import sqlite3
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+
+CACHE_FILE = "calendar_cache.sqlite3"
+PAGE_SIZE = 250
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, id)
+);
+CREATE INDEX IF NOT EXISTS events_by_end ON events (calendar_id, end_ts);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at REAL
+);
+"""
+
+
+class SyncTokenExpired(Exception):
+    """The server no longer accepts the stored sync token (HTTP 410); sync in full."""
+
+
+def event_time(when):
+    """Epoch seconds from an event's start/end: {"dateTime": RFC 3339} or {"date": all-day}."""
+    when = when or {}
+    if when.get("dateTime"):
+        value = when["dateTime"].replace("Z", "+00:00")
+        return datetime.datetime.fromisoformat(value).timestamp()
+    if when.get("date"):
+        return datetime.datetime.strptime(when["date"], "%Y-%m-%d").timestamp()
+    return 0.0
+
+
+class CalendarCache:
+    """Every method opens its own connection, so the cache can be read on the GUI
+    thread while a sync writes from another; WAL keeps readers from waiting."""
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def upcoming(self, limit=20, now=None, calendar_id="primary"):
+        """Events that have not ended yet, soonest first, as the API's event dicts."""
+        now = datetime.datetime.now().timestamp() if now is None else now
+        with self._connect() as db:
+            rows = db.execute("SELECT body FROM events WHERE calendar_id = ? AND end_ts > ? "
+                              "ORDER BY start_ts LIMIT ?", (calendar_id, now, limit)).fetchall()
+        return [json.loads(body) for body, in rows]
+
+    def count(self, calendar_id="primary"):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM events WHERE calendar_id = ?", (calendar_id,)).fetchone()[0]
+
+    def sync_token(self, calendar_id="primary"):
+        with self._connect() as db:
+            row = db.execute("SELECT sync_token FROM sync_state WHERE calendar_id = ?", (calendar_id,)).fetchone()
+        return row[0] if row else None
+
+    def store(self, event, calendar_id="primary", db=None):
+        """Insert or replace one event (e.g. the one the API returned after an insert)."""
+        row = (calendar_id, event["id"], event_time(event.get("start")),
+               event_time(event.get("end") or event.get("start")), json.dumps(event))
+        if db is not None:
+            db.execute("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)", row)
+            return
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?)", row)
+
+    def remove(self, event_id, calendar_id="primary"):
+        with self._connect() as db:
+            db.execute("DELETE FROM events WHERE calendar_id = ? AND id = ?", (calendar_id, event_id))
+
+    def sync(self, client, calendar_id="primary"):
+        """Bring the cache up to date from client.list_events; returns events changed.
+
+        Runs in one transaction, so a sync that fails part way leaves the previous
+        events and token in place. An expired token falls back to a full sync.
+        """
+        token = self.sync_token(calendar_id)
+        if token is not None:
+            try:
+                return self._sync(client, calendar_id, token)
+            except SyncTokenExpired:
+                print("[Calendar] Sync token expired; syncing in full")
+        return self._sync(client, calendar_id, None)
+
+    def _sync(self, client, calendar_id, token):
+        changed = 0
+        page = None
+        db = self._connect()
+        try:
+            with db:
+                if token is None:
+                    db.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+                while True:
+                    response = client.list_events(calendar_id=calendar_id, sync_token=token, page_token=page)
+                    for event in response.get("items", []):
+                        if event.get("status") == "cancelled":
+                            db.execute("DELETE FROM events WHERE calendar_id = ? AND id = ?",
+                                       (calendar_id, event["id"]))
+                        else:
+                            self.store(event, calendar_id, db)
+                        changed += 1
+                    page = response.get("nextPageToken")
+                    if not page:
+                        break
+                db.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                           (calendar_id, response.get("nextSyncToken"), datetime.datetime.now().timestamp()))
+        finally:
+            db.close()
+        return changed
+
+
+class CalendarSyncer(QObject):
+    """Runs CalendarCache.sync on a background thread, one sync at a time; a request
+    made while one is running queues exactly one more. finished(changed, error) is
+    delivered on the thread that created the syncer."""
+    finished = pyqtSignal(int, str)
+
+    def __init__(self, cache, client, parent=None, calendar_id="primary"):
+        super().__init__(parent)
+        self.cache = cache
+        self.client = client
+        self.calendar_id = calendar_id
+        self._lock = threading.Lock()
+        self._running = False
+        self._again = False
+
+    def start(self):
+        if self.client is None:
+            self.finished.emit(0, "not connected to a calendar")
+            return
+        with self._lock:
+            if self._running:
+                self._again = True
+                return
+            self._running = True
+        threading.Thread(target=self._run, name="calendar-sync", daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                changed, error = self.cache.sync(self.client, self.calendar_id), ""
+            except Exception as e:
+                changed, error = 0, str(e)
+                print(f"[Calendar] Sync failed: {e}")
+            self.finished.emit(changed, error)
+            with self._lock:
+                if not self._again:
+                    self._running = False
+                    return
+                self._again = False
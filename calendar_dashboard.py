@@ -1,9 +1,10 @@
 # calendar_dashboard.py
-# A separate dashboard window for Google Calendar integration
+# A separate dashboard window for Google Calendar integration. Events are shown from
+# the local cache at once; a background incremental sync then updates it.
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QListWidget, QListWidgetItem, QHBoxLayout, QDateTimeEdit, QDialog, QDialogButtonBox, QLineEdit, QMessageBox
 from PyQt5.QtCore import Qt, QDateTime
 import datetime
-from calendar_integration import CalendarIntegration
+from calendar_cache import CalendarCache, CalendarSyncer
 
 class CalendarDashboard(QWidget):
     def __init__(self, parent=None):
@@ -11,12 +12,23 @@ class CalendarDashboard(QWidget):
         self.setWindowTitle("Calendar Dashboard")
         self.setFixedSize(500, 400)
         self.setStyleSheet("")
-        self.cal = CalendarIntegration()
+        self.cache = CalendarCache()
+        try:
+            # Imported here so the cached events still show without the Google client libraries
+            from calendar_integration import CalendarIntegration
+            self.cal = CalendarIntegration()
+        except Exception as e:
+            print(f"[Calendar] Working offline: {e}")
+            self.cal = None
+        self.syncer = CalendarSyncer(self.cache, self.cal, self)
+        self.syncer.finished.connect(self._on_synced)
         self.layout = QVBoxLayout(self)
 
         self.event_list = QListWidget()
         self.layout.addWidget(QLabel("Upcoming Events:"))
         self.layout.addWidget(self.event_list)
+        self.status_label = QLabel("")
+        self.layout.addWidget(self.status_label)
 
         btn_row = QHBoxLayout()
         self.refresh_btn = QPushButton("Refresh")
@@ -33,17 +45,26 @@ class CalendarDashboard(QWidget):
         self.refresh_events()
 
     def refresh_events(self):
+        self.show_cached_events()
+        self.status_label.setText("Syncing...")
+        self.syncer.start()
+
+    def show_cached_events(self):
         self.event_list.clear()
-        try:
-            events = self.cal.get_upcoming_events(20)
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date', ''))
-                summary = event.get('summary', '(No Title)')
-                item = QListWidgetItem(f"{summary} | {start}")
-                item.setData(Qt.UserRole, event['id'])
-                self.event_list.addItem(item)
-        except Exception as e:
-            QMessageBox.warning(self, "Calendar Error", f"Could not fetch events: {e}")
+        for event in self.cache.upcoming(20):
+            start = event['start'].get('dateTime', event['start'].get('date', ''))
+            summary = event.get('summary', '(No Title)')
+            item = QListWidgetItem(f"{summary} | {start}")
+            item.setData(Qt.UserRole, event['id'])
+            self.event_list.addItem(item)
+
+    def _on_synced(self, changed, error):
+        if error:
+            self.status_label.setText(f"Offline, showing saved events ({error})")
+            return
+        self.status_label.setText(f"Up to date ({changed} change(s))")
+        if changed:
+            self.show_cached_events()
 
     def add_event_dialog(self):
         dialog = QDialog(self)
@@ -68,13 +89,18 @@ class CalendarDashboard(QWidget):
         buttons.accepted.connect(dialog.accept)
         buttons.rejected.connect(dialog.reject)
         if dialog.exec_() == QDialog.Accepted:
+            if self.cal is None:
+                QMessageBox.warning(self, "Calendar Error", "Not connected to a calendar.")
+                return
             try:
-                self.cal.add_event(
+                created = self.cal.add_event(
                     title_edit.text(),
                     start_dt.dateTime().toPyDateTime(),
                     end_dt.dateTime().toPyDateTime(),
                     desc_edit.text()
                 )
+                # Written through to the cache; the next incremental sync confirms it
+                self.cache.store(created)
                 self.refresh_events()
             except Exception as e:
                 QMessageBox.warning(self, "Calendar Error", f"Could not add event: {e}")
@@ -85,8 +111,12 @@ class CalendarDashboard(QWidget):
             QMessageBox.information(self, "Delete Event", "Select an event to delete.")
             return
         event_id = item.data(Qt.UserRole)
+        if self.cal is None:
+            QMessageBox.warning(self, "Calendar Error", "Not connected to a calendar.")
+            return
         try:
             self.cal.delete_event(event_id)
+            self.cache.remove(event_id)
             self.refresh_events()
         except Exception as e:
             QMessageBox.warning(self, "Calendar Error", f"Could not delete event: {e}")
@@ -5,10 +5,13 @@
 
 import os
 import datetime
+import threading
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.auth.transport.requests import Request
+from calendar_cache import SyncTokenExpired, PAGE_SIZE
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 TOKEN_FILE = 'token.json'
@@ -18,6 +21,8 @@ class CalendarIntegration:
     def __init__(self):
         self.creds = None
         self.service = None
+        # The API client's HTTP connection is not thread-safe, and syncs run off the GUI thread
+        self.lock = threading.Lock()
         self.authenticate()
 
     def authenticate(self):
@@ -35,12 +40,30 @@ class CalendarIntegration:
 
     def get_upcoming_events(self, max_results=10):
         now = datetime.datetime.utcnow().isoformat() + 'Z'
-        events_result = self.service.events().list(
-            calendarId='primary', timeMin=now,
-            maxResults=max_results, singleEvents=True,
-            orderBy='startTime').execute()
+        with self.lock:
+            events_result = self.service.events().list(
+                calendarId='primary', timeMin=now,
+                maxResults=max_results, singleEvents=True,
+                orderBy='startTime').execute()
         return events_result.get('items', [])
 
+    def list_events(self, calendar_id='primary', sync_token=None, page_token=None):
+        """One page of an incremental sync (see calendar_cache.CalendarCache.sync).
+        Without sync_token this pages through every event; the last page carries
+        nextSyncToken. timeMin/orderBy cannot be combined with sync tokens."""
+        params = dict(calendarId=calendar_id, singleEvents=True, maxResults=PAGE_SIZE)
+        if sync_token:
+            params['syncToken'] = sync_token
+        if page_token:
+            params['pageToken'] = page_token
+        try:
+            with self.lock:
+                return self.service.events().list(**params).execute()
+        except HttpError as e:
+            if e.resp.status == 410:
+                raise SyncTokenExpired(str(e))
+            raise
+
     def add_event(self, summary, start_dt, end_dt, description=None):
         event = {
             'summary': summary,
@@ -48,18 +71,21 @@ class CalendarIntegration:
             'start': {'dateTime': start_dt.isoformat(), 'timeZone': 'UTC'},
             'end': {'dateTime': end_dt.isoformat(), 'timeZone': 'UTC'},
         }
-        created_event = self.service.events().insert(calendarId='primary', body=event).execute()
+        with self.lock:
+            created_event = self.service.events().insert(calendarId='primary', body=event).execute()
         return created_event
 
     def update_event(self, event_id, **kwargs):
-        event = self.service.events().get(calendarId='primary', eventId=event_id).execute()
-        for key, value in kwargs.items():
-            event[key] = value
-        updated_event = self.service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
+        with self.lock:
+            event = self.service.events().get(calendarId='primary', eventId=event_id).execute()
+            for key, value in kwargs.items():
+                event[key] = value
+            updated_event = self.service.events().update(calendarId='primary', eventId=event_id, body=event).execute()
         return updated_event
 
     def delete_event(self, event_id):
-        self.service.events().delete(calendarId='primary', eventId=event_id).execute()
+        with self.lock:
+            self.service.events().delete(calendarId='primary', eventId=event_id).execute()
 
 # Usage example (to be called from DigitalDog or dashboard):
 # cal = CalendarIntegration()
@@ -1,21 +1,25 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar, QPushButton, QFileDialog
-from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtCore import Qt
 from task_manager import TaskManager
+from animation_clock import shared_clock
+from pet_needs import NeedsModel
+from history_chart import HistoryChart
+from focus_log import shared_focus_log
+from focus_report import FocusReport
 
 class DogDashboard(QWidget):
     def __init__(self, parent = None):
         super().__init__(None)
         self.setWindowFlags(Qt.Window)
         self.setWindowTitle("Dog Dashboard")
-        self.setFixedSize(350, 250)
+        self.setFixedSize(350, 280)
         # Remove any custom stylesheet to use the default macOS/Qt style
         self.setStyleSheet("")
         main_layout = QVBoxLayout(self)
 
-        # Internal float values for bars
-        self.food_value = 80.0
-        self.happy_value = 90.0
-        self.walk_value = 40.0
+        # Needs decay analytically from a saved timestamp; bars just display the model
+        self.needs = NeedsModel(parent=self)
+        self.needs.changed.connect(self.refresh_bars)
 
         # Food bar and button
         food_layout = QHBoxLayout()
@@ -53,15 +57,25 @@ class DogDashboard(QWidget):
         walk_layout.addWidget(self.walk_button)
         main_layout.addLayout(walk_layout)
 
+        # History chart of the bars over days and weeks
+        self.history_chart = None
+        self.open_history_button = QPushButton("Show History")
+        self.open_history_button.clicked.connect(self.open_history)
+        main_layout.addWidget(self.open_history_button)
+
+        # Where focus time went, from the distraction monitor's session log
+        self.focus_report = None
+        self.open_focus_report_button = QPushButton("Show Focus Report")
+        self.open_focus_report_button.clicked.connect(self.open_focus_report)
+        main_layout.addWidget(self.open_focus_report_button)
+
         # Add Task Manager button
         self.open_task_manager_button = QPushButton("Open Task Manager")
         self.open_task_manager_button.clicked.connect(self.open_task_manager)
         main_layout.addWidget(self.open_task_manager_button)
 
-        # Timer to deplete bars
-        self.deplete_timer = QTimer(self)
-        self.deplete_timer.timeout.connect(self.deplete_bars)
-        self.deplete_timer.start(2000)  # Deplete every 2 seconds
+        # Redraw the bars every 2 seconds on the shared clock, only while the dashboard is visible
+        shared_clock().play("dashboard_refresh", None, 0.5, lambda step: self.refresh_bars(), host=self)
 
         self.on_dashboard_closed_callback = None
         self.task_manager = None
@@ -75,26 +89,48 @@ class DogDashboard(QWidget):
         self.move(x, y)
         super().showEvent(event)
 
+    @property
+    def food_value(self):
+        return self.needs.value("food")
+
+    @property
+    def happy_value(self):
+        return self.needs.value("happiness")
+
+    @property
+    def walk_value(self):
+        return self.needs.value("walk")
+
     def feed_dog(self):
-        self.food_value = min(100.0, self.food_value + 20.0)
-        self.food_bar.setValue(int(self.food_value))
+        self.needs.add("food", 20.0)
 
     def play_with_dog(self):
-        self.happy_value = min(100.0, self.happy_value + 15.0)
-        self.happy_bar.setValue(int(self.happy_value))
+        self.needs.add("happiness", 15.0)
 
     def walk_dog(self):
-        self.walk_value = min(100.0, self.walk_value + 20.0)
-        self.walk_bar.setValue(int(self.walk_value))
+        self.needs.add("walk", 20.0)
 
-    def deplete_bars(self):
-        self.food_value = max(0.0, self.food_value - 0.75)
-        self.happy_value = max(0.0, self.happy_value - 1.5)
-        self.walk_value = max(0.0, self.walk_value - 0.5)
+    def refresh_bars(self):
+        self.needs.record_history()
         self.food_bar.setValue(int(self.food_value))
         self.happy_bar.setValue(int(self.happy_value))
         self.walk_bar.setValue(int(self.walk_value))
 
+    def open_history(self):
+        self.needs.record_history()
+        if self.history_chart is None:
+            self.history_chart = HistoryChart(self.needs.history)
+        self.history_chart.show()
+        self.history_chart.raise_()
+        self.history_chart.plot.update()
+
+    def open_focus_report(self):
+        if self.focus_report is None:
+            self.focus_report = FocusReport(shared_focus_log())
+        self.focus_report.show()
+        self.focus_report.raise_()
+        self.focus_report.refresh()
+
     def open_task_manager(self):
         if self.task_manager is None:
             self.task_manager = TaskManager()
@@ -105,9 +141,6 @@ class DogDashboard(QWidget):
             # Insert at the top of the Task Manager layout
             layout = self.task_manager.layout()
             layout.insertWidget(0, self.back_button)
-            # Connect reminder callback to dog's show_reminder_bubble
-            if self.dog_ref and hasattr(self.dog_ref, 'show_reminder_bubble'):
-                self.task_manager.reminder_callback = self.dog_ref.show_reminder_bubble
         self.hide()  # Hide the dashboard when opening the Task Manager
         self.task_manager.show()
         self.task_manager.raise_()
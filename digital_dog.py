@@ -1,9 +1,14 @@
 # digital_dog.py
 from PyQt5.QtWidgets import QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout, QFrame
-from PyQt5.QtGui import QPixmap, QIcon
+from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import QTimer, Qt, QPoint, QPropertyAnimation, QTime
 from dashboard import DogDashboard
-from dog_animation import load_frames
+from dog_animation import FrameLoader
+from animation_clock import shared_clock
+from sprite_widget import SpriteWidget
+from pixmap_cache import shared_pixmap_cache
+from animation_manifest import DogAnimator, load_manifest
+from notifications import shared_dispatcher, LOW
 
 class DigitalDog(QWidget):
     def __init__(self):
@@ -18,6 +23,7 @@ class DigitalDog(QWidget):
         self.dashboard = DogDashboard(parent=self)
         self.dashboard.on_dashboard_closed_callback = self.on_dashboard_closed
         self.dashboard.on_dog_image_selected = self.set_dog_image
+        self.dashboard.needs.threshold_crossed.connect(self._on_need_threshold)
 
         # Layout
         self.layout = QVBoxLayout(self)
@@ -29,25 +35,30 @@ class DigitalDog(QWidget):
         self.inactive_timer = QTimer(self)
         self.inactive_timer.setInterval(5000)
         self.inactive_timer.timeout.connect(self.slide_out)
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.next_frame)
-        self.animation_timer.start(200)
         self._drag_active = False
         self._drag_position = None
         self._press_time = None
         self._click_pos = None
-        self.dog_frames = load_frames("Dog tongue animation/Dog_Tongue_*.png")
-        self.current_frame = 0
-        self.eating_frames = load_frames("Dog eating/Dog_Eating_*.png")
-        self.eating_frame_idx = 0
-
-        # Dog image label
-        self.label = QLabel(self)
-        self.label.setAttribute(Qt.WA_TranslucentBackground, True)
+        # Dog sprite: paints the current frame itself and only repaints what changed
+        self.label = SpriteWidget(self)
         self.label.setFixedSize(200, 200)
         self.layout.addWidget(self.label, alignment=Qt.AlignCenter)
+
+        # Frames are scaled to the sprite's size and this screen's DPR, decode in the
+        # background and live in the shared pixmap cache; each FrameSet fills in as frames arrive
+        self.sprite_size = (self.label.width(), self.label.height())
+        self.dpr = self.devicePixelRatioF()
+        self.pixmap_cache = shared_pixmap_cache()
+        self.frame_loader = FrameLoader(self)
+        # Animations come from animations.json. Only idle loads now; the others are
+        # prefetched in the background by priority. All of them share one clock
+        # that sleeps while the dog is hidden.
+        self.clock = shared_clock()
+        self.animator = DogAnimator(load_manifest(), self.frame_loader, self.clock, self,
+                                    self.label.setPixmap, self.sprite_size, self.dpr)
+        self.dog_frames = self.animator.start()
         # Set a debug pixmap if no dog image is loaded
-        if not self.dog_frames or not self.dog_frames[0]:
+        if not self.dog_frames:
             from PyQt5.QtGui import QPixmap, QColor
             pixmap = QPixmap(100, 100)
             pixmap.fill(QColor('red'))
@@ -214,67 +225,33 @@ class DigitalDog(QWidget):
         self.reset_inactive_timer()
 
     def set_dog_image(self, image_path):
-        pixmap = QPixmap(image_path)
+        pixmap = self.pixmap_cache.load_pixmap(image_path, self.sprite_size, self.dpr)
         if not pixmap.isNull():
-            pixmap = pixmap.scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
             self.label.setPixmap(pixmap)
 
     def feed(self):
-        self.play_eating_animation()
+        self.animator.set_state("eating")
         # Update dashboard food bar
         if self.dashboard:
             self.dashboard.feed_dog()
 
     def walk(self):
-        if hasattr(self, "play_walking_animation"):
-            self.play_walking_animation()
-        else:
-            pixmap = QPixmap("dog_walking.png")
-            if not pixmap.isNull():
-                pixmap = pixmap.scaled(100, 100, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.label.setPixmap(pixmap)
+        self.animator.set_state("walking")
         # Update dashboard walk bar
         if self.dashboard:
             self.dashboard.walk_dog()
 
     def play(self):
-        # Optionally add a play animation here
+        self.animator.set_state("playing")
         if self.dashboard:
             self.dashboard.play_with_dog()
 
-    def next_frame(self):
-        if self.dog_frames:
-            self.current_frame = (self.current_frame + 1) % len(self.dog_frames)
-            self.label.setPixmap(self.dog_frames[self.current_frame])
+    def _on_need_threshold(self, need, label):
+        # LOW: the bubble sink only speaks up if the dog is already on screen
+        shared_dispatcher().notify("pet", f"I'm {label}! 🐶", key=need, priority=LOW)
 
     def restore_animation(self):
-        if self.dog_frames:
-            self.label.setPixmap(self.dog_frames[self.current_frame])
-
-    def play_eating_animation(self):
-        if not self.eating_frames:
-            self.restore_animation()
-            return
-
-        self.animation_timer.stop()  # Pause main animation
-        self.eating_frame_idx = 0
-
-        # Stop any previous eating timer
-        if hasattr(self, "eating_timer") and self.eating_timer is not None:
-            self.eating_timer.stop()
-        self.eating_timer = QTimer(self)
-        self.eating_timer.timeout.connect(self.next_eating_frame)
-        self.eating_timer.start(120)  # Adjust speed as needed
-
-    def next_eating_frame(self):
-        if self.eating_frame_idx < len(self.eating_frames):
-            self.label.setPixmap(self.eating_frames[self.eating_frame_idx])
-            self.eating_frame_idx += 1
-        else:
-            self.eating_timer.stop()
-            self.eating_timer = None
-            self.animation_timer.start(200)  # Resume main animation
-            self.restore_animation()
+        self.animator.restore_idle_frame()
 
     # --- Dragging logic ---
     def mousePressEvent(self, event):
@@ -1,7 +1,456 @@
 # dog_animation.py
+# Loads animation frames, packing each animation into a pre-scaled atlas that is
+# cached on disk so a warm start is a single read instead of decoding every PNG.
+import bisect
 import glob
-from PyQt5.QtGui import QPixmap
+import hashlib
+import json
+import os
+from array import array
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QRect, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPainter, QPixmap
+from pixmap_cache import PixmapCache, frames_bytes, shared_pixmap_cache
 
-def load_frames(folder_pattern, size=(100, 100)):
-    paths = sorted(glob.glob(folder_pattern))
-    return [QPixmap(path).scaled(*size, aspectRatioMode=1, transformMode=1) for path in paths]
\ No newline at end of file
+ATLAS_CACHE_DIR = ".sprite_cache"
+ATLAS_FORMAT = QImage.Format_ARGB32_Premultiplied
+STREAMED_EXTENSIONS = (".gif", ".apng", ".webp")
+
+
+def _atlas_key(folder_pattern, paths, size, device_pixel_ratio):
+    # Any change to a source frame (added, removed, touched) or to the target
+    # size/DPR produces a new key, which forces a rebuild
+    h = hashlib.sha1()
+    h.update(json.dumps([folder_pattern, list(size), device_pixel_ratio]).encode())
+    for path in paths:
+        st = os.stat(path)
+        h.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+    return h.hexdigest()
+
+
+def _atlas_paths(folder_pattern, cache_dir):
+    name = hashlib.sha1(folder_pattern.encode()).hexdigest()[:16]
+    base = os.path.join(cache_dir, name)
+    return base + ".json", base + ".atlas"
+
+
+def scale_frame(path, size, device_pixel_ratio=1.0):
+    """Decode one frame and scale it to size (logical pixels) as a premultiplied QImage."""
+    image = QImage(path)
+    if image.isNull():
+        return image
+    width = round(size[0] * device_pixel_ratio)
+    height = round(size[1] * device_pixel_ratio)
+    image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image.convertToFormat(ATLAS_FORMAT)
+
+
+def pack_atlas(images):
+    """Pack frames left to right into one premultiplied image. Returns (atlas, rects)."""
+    images = [image for image in images if not image.isNull()]
+    if not images:
+        return None, []
+    width = sum(image.width() for image in images)
+    height = max(image.height() for image in images)
+    atlas = QImage(width, height, ATLAS_FORMAT)
+    atlas.fill(Qt.transparent)
+    painter = QPainter(atlas)
+    painter.setCompositionMode(QPainter.CompositionMode_Source)
+    rects = []
+    x = 0
+    for image in images:
+        painter.drawImage(x, 0, image)
+        rects.append((x, 0, image.width(), image.height()))
+        x += image.width()
+    painter.end()
+    return atlas, rects
+
+
+def _read_atlas(index_path, atlas_path, key):
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        if index.get("key") != key:
+            return None, []
+        atlas = QImage(index["width"], index["height"], ATLAS_FORMAT)
+        buffer = atlas.bits()
+        buffer.setsize(atlas.byteCount())
+        with open(atlas_path, "rb") as f:
+            if f.readinto(memoryview(buffer)) != atlas.byteCount():
+                return None, []
+        return atlas, [tuple(rect) for rect in index["frames"]]
+    except FileNotFoundError:
+        return None, []
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[dog_animation] Ignoring atlas cache {index_path}: {e}")
+        return None, []
+
+
+def _write_atlas(index_path, atlas_path, key, atlas, rects):
+    # Raw premultiplied pixels so a warm start needs no PNG decode at all.
+    # Both files go through temp-file-plus-rename so a crash never leaves a torn cache.
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        buffer = atlas.constBits()
+        buffer.setsize(atlas.byteCount())
+        with open(atlas_path + ".tmp", "wb") as f:
+            f.write(memoryview(buffer))
+        os.replace(atlas_path + ".tmp", atlas_path)
+        index = {"key": key, "width": atlas.width(), "height": atlas.height(), "frames": rects}
+        with open(index_path + ".tmp", "w") as f:
+            json.dump(index, f)
+        os.replace(index_path + ".tmp", index_path)
+    except OSError as e:
+        print(f"[dog_animation] Could not write atlas cache {index_path}: {e}")
+
+
+def find_frames(folder_pattern):
+    return sorted(glob.glob(folder_pattern))
+
+
+def read_cached_atlas(folder_pattern, key, cache_dir=ATLAS_CACHE_DIR):
+    index_path, atlas_path = _atlas_paths(folder_pattern, cache_dir)
+    return _read_atlas(index_path, atlas_path, key)
+
+
+def write_cached_atlas(folder_pattern, key, atlas, rects, cache_dir=ATLAS_CACHE_DIR):
+    index_path, atlas_path = _atlas_paths(folder_pattern, cache_dir)
+    _write_atlas(index_path, atlas_path, key, atlas, rects)
+
+
+def load_atlas(folder_pattern, size=(100, 100), device_pixel_ratio=1.0, cache_dir=ATLAS_CACHE_DIR):
+    """Return (atlas QImage, frame rects) for a glob of frames, rebuilding the cache if stale.
+
+    Only touches QImage, so it is safe to call off the GUI thread.
+    """
+    paths = find_frames(folder_pattern)
+    if not paths:
+        return None, []
+    key = _atlas_key(folder_pattern, paths, size, device_pixel_ratio)
+    atlas, rects = read_cached_atlas(folder_pattern, key, cache_dir)
+    if atlas is None:
+        atlas, rects = pack_atlas([scale_frame(path, size, device_pixel_ratio) for path in paths])
+        if atlas is not None:
+            write_cached_atlas(folder_pattern, key, atlas, rects, cache_dir)
+    return atlas, rects
+
+
+def atlas_to_frames(atlas, rects, device_pixel_ratio=1.0):
+    """Upload the atlas once and cut it into per-frame pixmaps (GUI thread only)."""
+    if atlas is None:
+        return []
+    sheet = QPixmap.fromImage(atlas)
+    frames = []
+    for rect in rects:
+        frame = sheet.copy(QRect(*rect))
+        frame.setDevicePixelRatio(device_pixel_ratio)
+        frames.append(frame)
+    return frames
+
+
+def load_frames(folder_pattern, size=(100, 100), device_pixel_ratio=1.0, cache_dir=ATLAS_CACHE_DIR):
+    atlas, rects = load_atlas(folder_pattern, size, device_pixel_ratio, cache_dir)
+    return atlas_to_frames(atlas, rects, device_pixel_ratio)
+
+
+class FrameSet:
+    """Frames of one animation, filled in as the loader delivers them.
+
+    len() is the number of source frames; a slot stays None until decoded.
+    """
+    def __init__(self, name, total=0):
+        self.name = name
+        self.frames = [None] * total
+        self.ready = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    def __iter__(self):
+        return (frame for frame in self.frames if frame is not None)
+
+    def set_frame(self, index, pixmap):
+        if self.frames[index] is None:
+            self.ready += 1
+        self.frames[index] = pixmap
+
+    def is_complete(self):
+        return self.ready == len(self.frames)
+
+    def next_ready(self, index):
+        """Index of the first loaded frame after index (wrapping), or None if none are loaded."""
+        count = len(self.frames)
+        for step in range(1, count + 1):
+            candidate = (index + step) % count
+            if self.frames[candidate] is not None:
+                return candidate
+        return None
+
+
+class _Task(QRunnable):
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+
+    def run(self):
+        self.fn(*self.args)
+
+
+class FrameLoader(QObject):
+    """Decodes animation frames on a thread pool and hands them to the GUI thread.
+
+    Workers only produce QImages; conversion to QPixmap happens in the slots below,
+    which run on the thread that owns the loader. A warm atlas cache costs one task;
+    a cold one decodes each frame in parallel and then writes the atlas back.
+    Finished frame sets go into the shared PixmapCache, so asking for a set that
+    is still resident is free and one that was evicted is simply loaded again.
+    """
+    frame_loaded = pyqtSignal(object, int)  # (FrameSet, index)
+    finished = pyqtSignal(object)  # FrameSet
+
+    # Internal, emitted from worker threads and delivered queued
+    _atlas_read = pyqtSignal(object, object, object)  # (job, atlas, rects)
+    _frame_decoded = pyqtSignal(object, int, object)  # (job, index, image)
+
+    def __init__(self, parent=None, pool=None, cache_dir=ATLAS_CACHE_DIR, cache=None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self.cache_dir = cache_dir
+        self.cache = cache if cache is not None else shared_pixmap_cache()
+        self._loading = {}  # cache key -> FrameSet still being decoded
+        self._atlas_read.connect(self._on_atlas_read)
+        self._frame_decoded.connect(self._on_frame_decoded)
+
+    def load(self, folder_pattern, size=(100, 100), device_pixel_ratio=1.0, name=None):
+        """Start loading and return the (still empty) FrameSet straight away.
+
+        A single animated file (GIF/APNG/WebP) is streamed instead of preloaded.
+        """
+        if is_streamed(folder_pattern):
+            frame_set = StreamingAnimation(folder_pattern, size, device_pixel_ratio, name=name)
+            QTimer.singleShot(0, lambda: self._announce(frame_set))
+            return frame_set
+        key = PixmapCache.key(folder_pattern, size, device_pixel_ratio)
+        if key in self._loading:
+            return self._loading[key]
+        frame_set = self.cache.get(key)
+        if frame_set is not None:
+            QTimer.singleShot(0, lambda: self._announce(frame_set))
+            return frame_set
+        paths = find_frames(folder_pattern)
+        frame_set = FrameSet(name or folder_pattern, len(paths))
+        if not paths:
+            self.finished.emit(frame_set)
+            return frame_set
+        self._loading[key] = frame_set
+        job = {
+            "cache_key": key,
+            "frame_set": frame_set,
+            "pattern": folder_pattern,
+            "paths": paths,
+            "size": size,
+            "dpr": device_pixel_ratio,
+            "key": _atlas_key(folder_pattern, paths, size, device_pixel_ratio),
+            "images": [None] * len(paths),
+            "pending": len(paths),
+        }
+        self.pool.start(_Task(self._read_atlas_task, job))
+        return frame_set
+
+    def _announce(self, frame_set):
+        if len(frame_set) and frame_set[0] is not None:
+            self.frame_loaded.emit(frame_set, 0)
+        self.finished.emit(frame_set)
+
+    def _finish(self, job):
+        frame_set = job["frame_set"]
+        self._loading.pop(job["cache_key"], None)
+        self.cache.put(job["cache_key"], frame_set, frames_bytes(frame_set))
+        self.finished.emit(frame_set)
+
+    def _read_atlas_task(self, job):
+        atlas, rects = read_cached_atlas(job["pattern"], job["key"], self.cache_dir)
+        self._atlas_read.emit(job, atlas, rects)
+
+    def _decode_task(self, job, index):
+        self._frame_decoded.emit(job, index, scale_frame(job["paths"][index], job["size"], job["dpr"]))
+
+    def _write_atlas_task(self, job):
+        atlas, rects = pack_atlas(job["images"])
+        if atlas is not None:
+            write_cached_atlas(job["pattern"], job["key"], atlas, rects, self.cache_dir)
+
+    def _on_atlas_read(self, job, atlas, rects):
+        frame_set = job["frame_set"]
+        if atlas is None or len(rects) != len(frame_set):
+            # Cache miss: decode every frame in parallel, first frame first
+            for index in range(len(frame_set)):
+                self.pool.start(_Task(self._decode_task, job, index))
+            return
+        for index, frame in enumerate(atlas_to_frames(atlas, rects, job["dpr"])):
+            frame_set.set_frame(index, frame)
+            self.frame_loaded.emit(frame_set, index)
+        self._finish(job)
+
+    def _on_frame_decoded(self, job, index, image):
+        frame_set = job["frame_set"]
+        job["images"][index] = image
+        job["pending"] -= 1
+        if not image.isNull():
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(job["dpr"])
+            frame_set.set_frame(index, pixmap)
+            self.frame_loaded.emit(frame_set, index)
+        if job["pending"] == 0:
+            self.pool.start(_Task(self._write_atlas_task, job))
+            self._finish(job)
+
+
+def is_streamed(path):
+    return not glob.has_magic(path) and path.lower().endswith(STREAMED_EXTENSIONS)
+
+
+class StreamingAnimation:
+    """An animated GIF/APNG decoded on demand with a bounded look-ahead buffer.
+
+    Quacks like a FrameSet: len() is the frame count and [index] returns a scaled
+    pixmap. At most `lookahead` decoded frames are held at once, so memory stays
+    flat however long the file is; only per-frame start times (8 bytes a frame)
+    are remembered. It also provides index_at/next_boundary so AnimationClock
+    honours the file's own frame delays instead of a fixed fps.
+    """
+    DEFAULT_DELAY_MS = 100
+
+    def __init__(self, path, size=(100, 100), device_pixel_ratio=1.0, lookahead=8, name=None):
+        self.name = name or path
+        self.path = path
+        self.size = size
+        self.device_pixel_ratio = device_pixel_ratio
+        self.lookahead = max(1, lookahead)
+        self.buffer = OrderedDict()  # index -> QPixmap, oldest first
+        self.offsets = array("d", [0.0])  # start time (ms) of each frame seen so far
+        self._reader = None
+        self._next_index = 0
+        self._prefetch_pending = False
+        reader = QImageReader(path)
+        self.count = max(0, reader.imageCount()) if reader.canRead() else 0
+        self.ready = self.count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (self[index] for index in range(self.count))
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        frame = self.buffer.get(index)
+        if frame is None:
+            frame = self._decode_until(index)
+        # Frames behind the playhead are never needed again this lap
+        while self.buffer and next(iter(self.buffer)) < index:
+            self.buffer.popitem(last=False)
+        self._schedule_prefetch()
+        return frame
+
+    def is_complete(self):
+        return True
+
+    def next_ready(self, index):
+        return (index + 1) % self.count if self.count else None
+
+    def _open_reader(self):
+        reader = QImageReader(self.path)
+        source = reader.size()
+        if source.isValid():
+            target = source.scaled(round(self.size[0] * self.device_pixel_ratio),
+                                   round(self.size[1] * self.device_pixel_ratio), Qt.KeepAspectRatio)
+            reader.setScaledSize(target)
+        self._reader = reader
+        self._next_index = 0
+
+    def _decode_next(self):
+        image = self._reader.read()
+        index = self._next_index
+        self._next_index += 1
+        delay = self._reader.nextImageDelay()
+        if index + 1 == len(self.offsets):
+            self.offsets.append(self.offsets[index] + (delay if delay > 0 else self.DEFAULT_DELAY_MS))
+        if image.isNull():
+            return index, None
+        pixmap = QPixmap.fromImage(image.convertToFormat(ATLAS_FORMAT))
+        pixmap.setDevicePixelRatio(self.device_pixel_ratio)
+        return index, pixmap
+
+    def _store(self, index, pixmap):
+        if pixmap is None:
+            return
+        self.buffer[index] = pixmap
+        while len(self.buffer) > self.lookahead:
+            self.buffer.popitem(last=False)
+
+    def _decode_until(self, index):
+        # GIF frames build on the previous ones, so going backwards means rewinding
+        if self._reader is None or index < self._next_index:
+            self._open_reader()
+            self.buffer.clear()
+        frame = None
+        while self._next_index <= index:
+            decoded, frame = self._decode_next()
+            if decoded >= index - self.lookahead + 1:
+                self._store(decoded, frame)
+        return frame
+
+    def _schedule_prefetch(self):
+        if not self._prefetch_pending and self.count:
+            self._prefetch_pending = True
+            QTimer.singleShot(0, self._prefetch)
+
+    def _prefetch(self):
+        # Top the look-ahead up one frame per event-loop pass so playback never decodes in bulk
+        self._prefetch_pending = False
+        if self._reader is None or self._next_index >= self.count:
+            return
+        oldest = next(iter(self.buffer)) if self.buffer else self._next_index
+        if self._next_index - oldest < self.lookahead:
+            self._store(*self._decode_next())
+            self._schedule_prefetch()
+
+    # --- Timing, used by AnimationClock in place of a fixed fps ---
+
+    def _start_ms(self, index):
+        known = len(self.offsets) - 1
+        if index <= known:
+            return self.offsets[index]
+        return self.offsets[known] + (index - known) * self.DEFAULT_DELAY_MS
+
+    def duration_ms(self):
+        return self._start_ms(self.count)
+
+    def index_at(self, elapsed, loop=True):
+        ms = elapsed * 1000
+        total = self.duration_ms()
+        if not self.count or total <= 0:
+            return None
+        if ms >= total:
+            if not loop:
+                return None
+            ms %= total
+        known = len(self.offsets) - 1
+        if ms < self.offsets[known]:
+            return bisect.bisect_right(self.offsets, ms) - 1
+        return min(self.count - 1, known + int((ms - self.offsets[known]) // self.DEFAULT_DELAY_MS))
+
+    def next_boundary(self, elapsed):
+        ms = elapsed * 1000
+        total = self.duration_ms()
+        if not self.count or total <= 0:
+            return elapsed + self.DEFAULT_DELAY_MS / 1000
+        lap_start = (ms // total) * total
+        index = self.index_at(elapsed)
+        return (lap_start + self._start_ms(index + 1)) / 1000
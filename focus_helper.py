@@ -0,0 +1,124 @@
+# focus_helper.py
+# The long-lived helper process behind helper_process.HelperProcess. It runs for the
+# whole session so platform scripting (AppleScript URL lookups, notifications) costs a
+# pipe round trip instead of a fork, exec and script compile per call.
+#
+# Protocol: one JSON object per line in each direction, requests handled in order.
+#   request:   {"id": 7, "op": "script", "args": {"source": "..."}}
+#   response:  {"id": 7, "ok": true, "result": "..."}
+#              {"id": 7, "ok": false, "error": "..."}
+# Ops every backend answers: ping, script(source), notify(title, message). A backend
+# that cannot do one replies with ok false. The fake backend adds sleep(seconds) and
+# crash() for benchmarks and manual testing.
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+
+class MacHelper:
+    """Runs AppleScript in-process through NSAppleScript, compiling each source once."""
+    def __init__(self):
+        from Foundation import NSAppleScript  # pyobjc, macOS only
+        self.NSAppleScript = NSAppleScript
+        self.compiled = {}
+
+    def script(self, source):
+        script = self.compiled.get(source)
+        if script is None:
+            script = self.NSAppleScript.alloc().initWithSource_(source)
+            ok, error = script.compileAndReturnError_(None)
+            if not ok:
+                raise RuntimeError(f"script did not compile: {error}")
+            self.compiled[source] = script
+        result, error = script.executeAndReturnError_(None)
+        if result is None:
+            raise RuntimeError(f"script failed: {error}")
+        return result.stringValue()
+
+    def notify(self, title, message):
+        def quote(text):
+            return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        self.script(f"display notification {quote(message)} with title {quote(title)}")
+
+
+class LinuxHelper:
+    """No scripting; notifications go through notify-send when it is installed."""
+    def __init__(self):
+        self.notify_send = shutil.which("notify-send")
+
+    def script(self, source):
+        raise RuntimeError("scripting is not supported on this platform")
+
+    def notify(self, title, message):
+        if self.notify_send is None:
+            raise RuntimeError("notify-send is not installed")
+        subprocess.run([self.notify_send, title, message], timeout=5, check=False)
+
+
+class FakeHelper:
+    """Canned answers: script() returns FOCUS_HELPER_FAKE_URL (or an example URL)."""
+    def __init__(self):
+        self.notifications = 0
+
+    def script(self, source):
+        return os.environ.get("FOCUS_HELPER_FAKE_URL", "https://example.com/")
+
+    def notify(self, title, message):
+        self.notifications += 1
+        return self.notifications
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def crash(self):
+        os._exit(1)
+
+
+BACKENDS = {"mac": MacHelper, "linux": LinuxHelper, "fake": FakeHelper}
+
+
+def default_backend():
+    return "mac" if sys.platform == "darwin" else "linux"
+
+
+def serve(helper, lines, out):
+    for line in lines:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        op = request.get("op")
+        response = {"id": request.get("id")}
+        try:
+            if op == "ping":
+                result = "pong"
+            elif op in ("script", "notify") or (isinstance(helper, FakeHelper) and op in ("sleep", "crash")):
+                result = getattr(helper, op)(**request.get("args", {}))
+            else:
+                raise ValueError(f"unknown op {op!r}")
+            response.update(ok=True, result=result)
+        except Exception as e:
+            response.update(ok=False, error=str(e))
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Digital Dog platform helper")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=default_backend())
+    args = parser.parse_args(argv)
+    try:
+        helper = BACKENDS[args.backend]()
+    except Exception as e:
+        print(f"[Helper] {args.backend} backend unavailable: {e}", file=sys.stderr)
+        return 1
+    serve(helper, sys.stdin, sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
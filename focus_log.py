@@ -0,0 +1,257 @@
+# focus_log.py
+# Every focus session (app, site, start, duration, distracting or not) in an append-only
+# columnar log, one typed-array file per column, plus daily and weekly rollups that are
+# updated as each session closes. Reports read the rollups, so a year of history costs
+# a few hundred dictionary merges rather than a pass over every session.
+#
+# On disk (FOCUS_LOG_DIR):
+#   start.d, duration.f, app.I, domain.I, distracting.B   one value per session
+#   names.txt      app ids and domains, line n is code n (code 0 means none)
+#   rollups.json   the rollups and how many sessions they include; sessions logged
+#                  after the last save are folded in again on load
+import datetime
+import itertools
+import json
+import os
+import time
+from array import array
+from urllib.parse import urlsplit
+
+FOCUS_LOG_DIR = "focus_log"
+COLUMNS = (("start", "d"), ("duration", "f"), ("app", "I"), ("domain", "I"), ("distracting", "B"))
+ROLLUP_SAVE_EVERY = 50  # sessions between rollup saves; the log itself is written per session
+
+
+def domain_of(url):
+    if not url:
+        return None
+    host = urlsplit(url if "://" in url else "http://" + url).hostname or ""
+    return host[4:] if host.startswith("www.") else host or None
+
+
+def _bucket():
+    return {"seconds": 0.0, "distracting": 0.0, "sessions": 0, "apps": {}, "domains": {}}
+
+
+def _merge(total, bucket):
+    total["seconds"] += bucket["seconds"]
+    total["distracting"] += bucket["distracting"]
+    total["sessions"] += bucket["sessions"]
+    for key in ("apps", "domains"):
+        for name, seconds in bucket[key].items():
+            total[key][name] = total[key].get(name, 0.0) + seconds
+
+
+def _week_of(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+class FocusLog:
+    def __init__(self, directory=FOCUS_LOG_DIR, clock=time.time):
+        self.directory = directory
+        self.clock = clock
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self.names = [""]
+        self.codes = {"": 0}
+        self.days = {}  # "YYYY-MM-DD" -> bucket
+        self.weeks = {}  # Monday's "YYYY-MM-DD" -> bucket
+        self.folded = 0  # sessions included in the rollups
+        self.current = None  # open session: (start, app, domain, distracting)
+        self.load()
+
+    def __len__(self):
+        return len(self.columns["start"])
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    # --- Recording ---
+
+    def switch(self, app, domain, distracting, now=None):
+        """Close the open session and start one for app/domain. No-op if nothing changed."""
+        now = self.clock() if now is None else now
+        if self.current is not None and self.current[1:] == (app, domain, distracting):
+            return
+        self.close(now)
+        if app:
+            self.current = (now, app, domain, distracting)
+
+    def close(self, now=None):
+        if self.current is None:
+            return
+        now = self.clock() if now is None else now
+        start, app, domain, distracting = self.current
+        self.current = None
+        self.append(start, max(0.0, now - start), app, domain, distracting)
+
+    def append(self, start, duration, app, domain=None, distracting=False):
+        row = {"start": start, "duration": duration, "app": self._code(app),
+               "domain": self._code(domain), "distracting": int(bool(distracting))}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name, code in COLUMNS:
+                with open(self._path(f"{name}.{code}"), "ab") as f:
+                    array(code, [row[name]]).tofile(f)
+        except OSError as e:
+            print(f"[FocusLog] Failed to append a session: {e}")
+        for name, _ in COLUMNS:
+            self.columns[name].append(row[name])
+        self._fold(self.days, self.weeks, start, duration, app, domain, distracting)
+        self.folded += 1
+        if self.folded % ROLLUP_SAVE_EVERY == 0:
+            self.save_rollups()
+
+    def _code(self, name):
+        name = (name or "").replace("\n", " ")
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._path("names.txt"), "a", encoding="utf-8") as f:
+                    f.write(name + "\n")
+            except OSError as e:
+                print(f"[FocusLog] Failed to save a name: {e}")
+        return code
+
+    @staticmethod
+    def _fold(days, weeks, start, duration, app, domain, distracting):
+        # Split at local midnights so each day gets only its own share
+        t, end, first = start, start + duration, True
+        while first or t < end:
+            day = datetime.date.fromtimestamp(t)
+            midnight = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time()).timestamp()
+            seconds = min(end, midnight) - t
+            for table, key in ((days, day.isoformat()), (weeks, _week_of(day).isoformat())):
+                bucket = table.get(key)
+                if bucket is None:
+                    bucket = table[key] = _bucket()
+                bucket["seconds"] += seconds
+                bucket["sessions"] += first
+                if distracting:
+                    bucket["distracting"] += seconds
+                bucket["apps"][app] = bucket["apps"].get(app, 0.0) + seconds
+                if domain:
+                    bucket["domains"][domain] = bucket["domains"].get(domain, 0.0) + seconds
+            t, first = t + seconds, False
+
+    # --- Reports ---
+
+    def report(self, days=7, now=None):
+        """Totals over the last `days` calendar days including today, open session included.
+
+        Returns {"seconds", "distracting", "sessions", "ratio", "apps", "domains"} where
+        apps and domains are [(name, seconds)] with the most time first.
+        """
+        now = self.clock() if now is None else now
+        last = datetime.date.fromtimestamp(now)
+        first = last - datetime.timedelta(days=days - 1)
+        live_days, live_weeks = {}, {}
+        if self.current is not None:
+            start, app, domain, distracting = self.current
+            self._fold(live_days, live_weeks, start, max(0.0, now - start), app, domain, distracting)
+        total = _bucket()
+        day = first
+        while day <= last:
+            # Whole weeks inside the range come from the weekly rollup
+            if day.weekday() == 0 and day + datetime.timedelta(days=6) <= last:
+                tables, key, step = (self.weeks, live_weeks), day.isoformat(), 7
+            else:
+                tables, key, step = (self.days, live_days), day.isoformat(), 1
+            for table in tables:
+                bucket = table.get(key)
+                if bucket is not None:
+                    _merge(total, bucket)
+            day += datetime.timedelta(days=step)
+        total["ratio"] = total["distracting"] / total["seconds"] if total["seconds"] else 0.0
+        for key in ("apps", "domains"):
+            total[key] = sorted(total[key].items(), key=lambda item: item[1], reverse=True)
+        return total
+
+    def sessions(self, start, end):
+        """Yield (start, duration, app, domain, distracting) for sessions starting in [start, end)."""
+        starts = self.columns["start"]
+        lo, hi = 0, len(starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if starts[mid] < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        for i in range(lo, len(starts)):
+            if starts[i] >= end:
+                break
+            yield (starts[i], self.columns["duration"][i], self.names[self.columns["app"][i]] or None,
+                   self.names[self.columns["domain"][i]] or None, bool(self.columns["distracting"][i]))
+
+    # --- Persistence ---
+
+    def save_rollups(self):
+        data = {"sessions": self.folded, "days": self.days, "weeks": self.weeks}
+        path = self._path("rollups.json")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"[FocusLog] Failed to save {path}: {e}")
+
+    def load(self):
+        if not os.path.isdir(self.directory):
+            return
+        try:
+            if os.path.exists(self._path("names.txt")):
+                with open(self._path("names.txt"), "r", encoding="utf-8") as f:
+                    for line in f:
+                        name = line.rstrip("\n")
+                        self.codes.setdefault(name, len(self.names))
+                        self.names.append(name)
+            for name, code in COLUMNS:
+                path = self._path(f"{name}.{code}")
+                column = array(code)
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        column.fromfile(f, os.path.getsize(path) // column.itemsize)
+                self.columns[name] = column
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            print(f"[FocusLog] Ignoring {self.directory}: {e}")
+            self.columns = {name: array(code) for name, code in COLUMNS}
+            return
+        # A crash mid-append can leave some columns one value longer than the others, or a
+        # partial value at the end; cut the files too, so the next append lines up again
+        count = min(len(column) for column in self.columns.values())
+        for name, code in COLUMNS:
+            column = self.columns[name]
+            del column[count:]
+            path = self._path(f"{name}.{code}")
+            try:
+                if os.path.exists(path) and os.path.getsize(path) != count * column.itemsize:
+                    os.truncate(path, count * column.itemsize)
+            except OSError as e:
+                print(f"[FocusLog] Failed to repair {path}: {e}")
+        try:
+            with open(self._path("rollups.json"), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data["sessions"] <= count:
+                self.days, self.weeks, self.folded = data["days"], data["weeks"], data["sessions"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # rebuilt from the log below
+        for session in itertools.islice(self.sessions(float("-inf"), float("inf")), self.folded, None):
+            self._fold(self.days, self.weeks, *session)
+        if self.folded < count:
+            print(f"[FocusLog] Folded {count - self.folded} session(s) into the rollups")
+            self.folded = count
+            self.save_rollups()
+
+
+_shared_log = None
+
+
+def shared_focus_log():
+    """The process-wide log, shared by the monitor that writes it and the reports that read it."""
+    global _shared_log
+    if _shared_log is None:
+        _shared_log = FocusLog()
+    return _shared_log
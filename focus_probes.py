@@ -0,0 +1,202 @@
+# focus_probes.py
+# Backends that report the foreground app (and, where possible, the URL it shows).
+# A backend either answers probe(worker) when polled, or, if event_driven, blocks in
+# watch(worker) and reports focus changes as the platform pushes them. Platform
+# libraries are imported only when their backend is created.
+import abc
+import os
+import queue
+import select
+import sys
+import time
+from helper_process import HelperError
+
+# AppleScript that reads the active tab's URL, per browser bundle id
+MAC_URL_SCRIPTS = {
+    "com.google.Chrome": 'tell application "Google Chrome" to get URL of active tab of front window',
+    "com.brave.Browser": 'tell application "Brave Browser" to get URL of active tab of front window',
+    "com.microsoft.edgemac": 'tell application "Microsoft Edge" to get URL of active tab of front window',
+    "com.apple.Safari": 'tell application "Safari" to get URL of front document',
+}
+
+
+class FocusProbe(abc.ABC):
+    """Backend interface. probe(worker) returns (app_id, url); url may be None.
+
+    Event-driven backends set event_driven and implement watch(worker): report each
+    change with worker.report((app_id, url)) and return once worker.cancelled is set.
+    A backend missing probe() cannot be created, and a class that sets event_driven
+    without its own watch() cannot be defined.
+
+    idle_seconds() is how long the user has been away (inf while the screen is
+    locked), or None if the backend cannot tell; polling pauses while it is large.
+    """
+    name = "none"
+    event_driven = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.event_driven and cls.watch is FocusProbe.watch:
+            raise TypeError(f"{cls.__name__} is event_driven but does not implement watch()")
+
+    @abc.abstractmethod
+    def probe(self, worker):
+        """Return the current (app_id, url)."""
+
+    def idle_seconds(self):
+        return None
+
+    def watch(self, worker):
+        raise NotImplementedError(f"{type(self).__name__} is polled; it has no watch()")
+
+
+class MacProbe(FocusProbe):
+    """NSWorkspace for the frontmost app; the URL of known browsers comes from
+    AppleScript run by the session's helper process (via the worker, so it is timed
+    out and cancellable) instead of an osascript per probe. Polled."""
+    name = "macos"
+
+    def __init__(self, url_scripts=None, helper=None):
+        from AppKit import NSWorkspace  # pyobjc, macOS only
+        from helper_process import shared_helper
+        self.workspace = NSWorkspace.sharedWorkspace()
+        self.url_scripts = MAC_URL_SCRIPTS if url_scripts is None else url_scripts
+        self.helper = helper if helper is not None else shared_helper()
+        try:
+            import Quartz  # pyobjc-framework-Quartz; without it polling never pauses
+        except ImportError:
+            Quartz = None
+        self.quartz = Quartz
+
+    def idle_seconds(self):
+        if self.quartz is None:
+            return None
+        session = self.quartz.CGSessionCopyCurrentDictionary() or {}
+        if session.get("CGSSessionScreenIsLocked"):
+            return float("inf")
+        return self.quartz.CGEventSourceSecondsSinceLastEventType(
+            self.quartz.kCGEventSourceStateCombinedSessionState, self.quartz.kCGAnyInputEventType)
+
+    def probe(self, worker):
+        active_app = self.workspace.frontmostApplication()
+        bundle_id = active_app.bundleIdentifier() if active_app is not None else None
+        script = self.url_scripts.get(bundle_id)
+        url = None
+        if script:
+            try:
+                url = worker.request(self.helper, "script", source=script)
+            except HelperError:
+                pass  # e.g. the browser has no window open; the app is still worth reporting
+        return bundle_id, url or None
+
+
+class X11Probe(FocusProbe):
+    """Listens for PropertyNotify on the root window's _NET_ACTIVE_WINDOW instead of
+    polling. The app id is the window's WM_CLASS class, lower-cased (e.g.
+    "google-chrome"); X11 has no URL to offer, so url is always None."""
+    name = "x11"
+    event_driven = True
+    WAKE_SECONDS = 0.25  # how often the blocked watch loop checks for cancellation
+
+    def __init__(self, display_name=None):
+        from Xlib import X, display, error  # python-xlib
+        self.X = X
+        self.errors = (error.BadWindow, error.BadValue, error.BadMatch)
+        self.display = display.Display(display_name)
+        self.root = self.display.screen().root
+        self.active_atom = self.display.intern_atom("_NET_ACTIVE_WINDOW")
+
+    def _active(self):
+        prop = self.root.get_full_property(self.active_atom, self.X.AnyPropertyType)
+        window_id = prop.value[0] if prop is not None and len(prop.value) else 0
+        if not window_id:
+            return None, None
+        window = self.display.create_resource_object("window", window_id)
+        try:
+            wm_class = window.get_wm_class()
+        except self.errors:
+            return None, None  # closed between the event and the query
+        return (wm_class[-1].lower() if wm_class else None), None
+
+    def probe(self, worker):
+        return self._active()
+
+    def watch(self, worker):
+        self.root.change_attributes(event_mask=self.X.PropertyChangeMask)
+        self.display.flush()
+        worker.report(self._active())
+        fd = self.display.fileno()
+        while not worker.cancelled:
+            if not self.display.pending_events():
+                select.select([fd], [], [], self.WAKE_SECONDS)
+            changed = False
+            while self.display.pending_events():
+                event = self.display.next_event()
+                if event.type == self.X.PropertyNotify and event.atom == self.active_atom:
+                    changed = True
+            if changed:
+                worker.report(self._active())
+
+
+class FakeProbe(FocusProbe):
+    """Scriptable backend for benchmarks and manual testing.
+
+    Polled (event_driven=False): probe() sleeps delay seconds, then returns the
+    current sample. Event-driven: watch() reports every push() as it arrives.
+    script is a list of (seconds to wait, app_id, url) played at the start of watch().
+    Set idle (seconds, or None) to play an away or locked user.
+    """
+    name = "fake"
+
+    def __init__(self, app_id=None, url=None, delay=0.0, event_driven=False, script=()):
+        self.current = (app_id, url)
+        self.delay = delay
+        self.event_driven = event_driven
+        self.script = list(script)
+        self.pushed = queue.Queue()
+        self.calls = 0
+        self.idle = None
+
+    def push(self, app_id, url=None):
+        """Change the foreground app. Thread-safe."""
+        self.pushed.put((app_id, url))
+
+    def idle_seconds(self):
+        return self.idle
+
+    def probe(self, worker):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        while not self.pushed.empty():
+            self.current = self.pushed.get()
+        return self.current
+
+    def watch(self, worker):
+        worker.report(self.current)
+        for wait, app_id, url in self.script:
+            deadline = time.monotonic() + wait
+            while not worker.cancelled and time.monotonic() < deadline:
+                time.sleep(min(0.05, max(0.0, deadline - time.monotonic())))
+            self.push(app_id, url)
+        while not worker.cancelled:
+            try:
+                self.current = self.pushed.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            worker.report(self.current)
+
+
+def select_probe():
+    """The best backend for this platform, or None if focus cannot be observed here."""
+    candidates = []
+    if sys.platform == "darwin":
+        candidates.append(MacProbe)
+    elif os.environ.get("DISPLAY"):
+        candidates.append(X11Probe)
+    for backend in candidates:
+        try:
+            return backend()
+        except Exception as e:  # missing library, no display...
+            print(f"[Monitor] {backend.name} focus probe unavailable: {e}")
+    return None
@@ -0,0 +1,54 @@
+# focus_report.py
+# A small window that summarises focus sessions from the focus log's rollups: time
+# tracked, how much of it was distracting, and where it went by app and by site.
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLabel, QListWidget
+
+RANGES = [
+    ("Today", 1),
+    ("Last 7 days", 7),
+    ("Last 30 days", 30),
+    ("Last 90 days", 90),
+    ("Last year", 365),
+]
+TOP_ENTRIES = 10
+
+
+def format_duration(seconds):
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+class FocusReport(QWidget):
+    def __init__(self, focus_log, parent=None):
+        super().__init__(parent)
+        self.focus_log = focus_log
+        self.setWindowTitle("Focus Report")
+        layout = QVBoxLayout(self)
+        self.range_box = QComboBox()
+        for label, _ in RANGES:
+            self.range_box.addItem(label)
+        self.range_box.currentIndexChanged.connect(self.refresh)
+        layout.addWidget(self.range_box)
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+        lists = QHBoxLayout()
+        self.apps_list = QListWidget()
+        self.sites_list = QListWidget()
+        for title, widget in (("Apps", self.apps_list), ("Sites", self.sites_list)):
+            column = QVBoxLayout()
+            column.addWidget(QLabel(title))
+            column.addWidget(widget)
+            lists.addLayout(column)
+        layout.addLayout(lists)
+
+    def refresh(self):
+        report = self.focus_log.report(RANGES[self.range_box.currentIndex()][1])
+        self.summary.setText(
+            f"Tracked {format_duration(report['seconds'])} over {report['sessions']} session(s); "
+            f"{format_duration(report['distracting'])} distracted ({report['ratio']:.0%})")
+        for widget, entries in ((self.apps_list, report["apps"]), (self.sites_list, report["domains"])):
+            widget.clear()
+            for name, seconds in entries[:TOP_ENTRIES]:
+                widget.addItem(f"{name} - {format_duration(seconds)}")
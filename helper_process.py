@@ -0,0 +1,157 @@
+# helper_process.py
+# Client side of the focus_helper.py co-process: starts it once, sends JSON-line
+# requests over its stdin and matches responses read from its stdout by a reader
+# thread. A helper that exits is restarted on the next request; one that stops
+# answering is killed when a request times out, since it handles requests in order
+# and would stall every later one too.
+import itertools
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from PyQt5.QtCore import QCoreApplication
+from focus_helper import default_backend
+
+HELPER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "focus_helper.py")
+HELPER_TIMEOUT = 1.5  # seconds a request may take
+MAX_STARTS = 5  # starts allowed within RESTART_WINDOW before giving up for a while
+RESTART_WINDOW = 60.0
+
+
+class HelperError(Exception):
+    pass
+
+
+class HelperTimeout(HelperError):
+    pass
+
+
+class HelperProcess:
+    """Thread-safe; request() blocks its caller only, send() never waits."""
+    def __init__(self, backend=None, command=None, timeout=HELPER_TIMEOUT):
+        self.command = command or [sys.executable, HELPER_SCRIPT, "--backend", backend or default_backend()]
+        self.timeout = timeout
+        self.requests = 0
+        self.restarts = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._process = None
+        self._pending = {}  # request id -> (waiter queue, process it was sent to)
+        self._starts = []
+        self._closed = False
+
+    def _ensure_started(self):
+        # Called with the lock held
+        if self._closed:
+            raise HelperError("helper is closed")
+        if self._process is not None and self._process.poll() is None:
+            return
+        now = time.monotonic()
+        self._starts = [t for t in self._starts if now - t < RESTART_WINDOW]
+        if len(self._starts) >= MAX_STARTS:
+            raise HelperError(f"helper exited {MAX_STARTS} times within {RESTART_WINDOW:.0f}s")
+        if self._process is not None:
+            self.restarts += 1
+            print(f"[Helper] Restarting (exit code {self._process.returncode})")
+        self._starts.append(now)
+        try:
+            self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             text=True, bufsize=1)
+        except OSError as e:
+            self._process = None
+            raise HelperError(f"could not start helper: {e}")
+        threading.Thread(target=self._read, args=(self._process,), name="helper-reader", daemon=True).start()
+
+    def _read(self, process):
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                entry = self._pending.pop(response.get("id"), None)
+            if entry is not None:
+                entry[0].put(response)
+        process.wait()
+        self._fail_pending(f"helper exited (code {process.returncode})", process)
+
+    def _fail_pending(self, error, process=None):
+        with self._lock:
+            failed = [request_id for request_id, (_, owner) in self._pending.items()
+                      if process is None or owner is process]
+            entries = [self._pending.pop(request_id) for request_id in failed]
+        for waiter, _ in entries:
+            waiter.put({"ok": False, "error": error})
+
+    def _write(self, op, args, waiter):
+        with self._lock:
+            self._ensure_started()
+            request_id = next(self._ids)
+            process = self._process
+            if waiter is not None:
+                self._pending[request_id] = (waiter, process)
+            try:
+                process.stdin.write(json.dumps({"id": request_id, "op": op, "args": args}) + "\n")
+                process.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._pending.pop(request_id, None)
+                raise HelperError(f"helper is not accepting requests: {e}")
+            self.requests += 1
+        return request_id, process
+
+    def request(self, op, timeout=None, **args):
+        """Send op and wait for its result; raises HelperTimeout or HelperError."""
+        waiter = queue.Queue(1)
+        request_id, process = self._write(op, args, waiter)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            response = waiter.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            process.kill()
+            process.wait()  # reaped, so the next request starts a fresh helper
+            raise HelperTimeout(f"{op} took longer than {timeout}s")
+        if not response.get("ok"):
+            raise HelperError(response.get("error") or f"{op} failed")
+        return response.get("result")
+
+    def send(self, op, **args):
+        """Send op without waiting for (or checking) the result."""
+        try:
+            self._write(op, args, None)
+        except HelperError as e:
+            print(f"[Helper] Could not send {op}: {e}")
+
+    def cancel_pending(self):
+        """Make every waiting request fail now with HelperError("cancelled")."""
+        self._fail_pending("cancelled")
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            process, self._process = self._process, None
+        self._fail_pending("helper is closed")
+        if process is not None and process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=1.0)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+
+
+_shared_helper = None
+
+
+def shared_helper():
+    """The session's helper, started on first use and closed when the app quits."""
+    global _shared_helper
+    if _shared_helper is None:
+        _shared_helper = HelperProcess()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_shared_helper.close)
+    return _shared_helper
@@ -0,0 +1,81 @@
+# history_chart.py
+# A small window that charts the pet's stat history (mean line plus min/max band).
+import time
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QLabel
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt5.QtCore import Qt, QPointF
+
+RANGES = [
+    ("Last 24 hours", 86400),
+    ("Last 7 days", 7 * 86400),
+    ("Last 30 days", 30 * 86400),
+    ("Last year", 365 * 86400),
+]
+COLORS = {
+    "food": QColor("#e07a1f"),
+    "happiness": QColor("#d63f8c"),
+    "walk": QColor("#2f8fd6"),
+}
+
+
+class HistoryPlot(QWidget):
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.span = RANGES[0][1]
+        self.setMinimumSize(360, 180)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(self.rect(), Qt.white)
+        area = self.rect().adjusted(8, 8, -8, -8)
+        end = time.time()
+        start = end - self.span
+        # One row per horizontal pixel is all the chart can show
+        points = max(1, area.width())
+
+        def to_point(t, v):
+            return QPointF(area.left() + (t - start) / self.span * area.width(),
+                           area.bottom() - v / 100.0 * area.height())
+
+        for stat in self.history.stats:
+            rows = self.history.query(stat, start, end, max_points=points)
+            if not rows:
+                continue
+            color = COLORS.get(stat, Qt.black)
+            band = QPolygonF([to_point(t, hi) for t, lo, hi, mean in rows] +
+                             [to_point(t, lo) for t, lo, hi, mean in reversed(rows)])
+            fill = QColor(color)
+            fill.setAlpha(40)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(fill)
+            painter.drawPolygon(band)
+            painter.setPen(QPen(color, 1.5))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPolyline(QPolygonF([to_point(t, mean) for t, lo, hi, mean in rows]))
+        painter.end()
+
+
+class HistoryChart(QWidget):
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Dog History")
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        self.range_box = QComboBox()
+        for label, _ in RANGES:
+            self.range_box.addItem(label)
+        self.range_box.currentIndexChanged.connect(self._on_range_changed)
+        controls.addWidget(self.range_box)
+        for stat, color in COLORS.items():
+            legend = QLabel(stat.capitalize())
+            legend.setStyleSheet(f"color: {color.name()};")
+            controls.addWidget(legend)
+        layout.addLayout(controls)
+        self.plot = HistoryPlot(history)
+        layout.addWidget(self.plot)
+
+    def _on_range_changed(self, index):
+        self.plot.span = RANGES[index][1]
+        self.plot.update()
@@ -5,6 +5,8 @@ from PyQt5.QtGui import QIcon
 from digital_dog import DigitalDog
 from ai_monitor import AIMonitor
 from calendar_dashboard import CalendarDashboard
+from helper_process import shared_helper
+from notifications import shared_dispatcher, BubbleSink, TraySink, DesktopSink, URGENT, LOW
 
 app = QApplication(sys.argv)
 dog = DigitalDog()
@@ -35,4 +37,10 @@ menu.addAction(quit_action)
 tray.setContextMenu(menu)
 tray.show()
 
+# Everything the app tells the user goes through one rate-limited dispatcher
+notifications = shared_dispatcher()
+notifications.add_sink(BubbleSink(dog))
+notifications.add_sink(TraySink(tray), max_priority=URGENT)
+notifications.add_sink(DesktopSink(shared_helper()), max_priority=LOW, sources={"tasks", "monitor"})
+
 sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,223 @@
+# notifications.py
+# One non-blocking path for everything the app tells the user. Callers notify() and
+# return at once; a single-shot timer later delivers what is queued, most urgent
+# first, to whichever sinks (speech bubble, tray balloon, desktop notification) accept
+# it. Each source has a token bucket so a burst cannot flood the screen, a repeat of
+# something already queued or just shown is dropped, and notifications that share a
+# summary are coalesced into one ("3 tasks overdue").
+import itertools
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+URGENT, NORMAL, LOW = 0, 1, 2
+COALESCE_MS = 250  # how long a notification waits for others to batch with
+DEDUPE_SECONDS = 60.0  # the same (source, key) is not shown again within this
+MAX_PENDING = 50  # per source; past this the least urgent, oldest that cannot coalesce is dropped
+# source -> (notifications per minute, burst)
+RATE_LIMITS = {
+    "tasks": (6, 3),
+    "monitor": (2, 1),
+    "pet": (2, 2),
+}
+DEFAULT_RATE_LIMIT = (10, 3)
+
+
+class Notification:
+    __slots__ = ("source", "key", "title", "message", "priority", "summary", "seq", "items")
+
+    def __init__(self, source, key, title, message, priority, summary, seq):
+        self.source = source
+        self.key = key
+        self.title = title
+        self.message = message
+        self.priority = priority
+        self.summary = summary  # e.g. "{count} tasks overdue"; None never coalesces
+        self.seq = seq
+        self.items = [message]  # the messages a coalesced notification stands for
+
+
+class TokenBucket:
+    """Holds up to burst tokens, refilled at rate per second; one per delivery."""
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now=None):
+        self._refill(self.clock() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait(self, now=None):
+        """Seconds until a token is available."""
+        self._refill(self.clock() if now is None else now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+# --- Sinks: callables taking a Notification ---
+
+class BubbleSink:
+    """The dog's speech bubble. Priorities up to wake_priority slide the dog in; the
+    rest are only shown if it is already on screen."""
+    def __init__(self, dog, wake_priority=NORMAL):
+        self.dog = dog
+        self.wake_priority = wake_priority
+
+    def __call__(self, notification):
+        if notification.priority <= self.wake_priority or self.dog.isVisible():
+            self.dog.show_reminder_bubble(notification.message)
+
+
+class TraySink:
+    """A balloon from the system tray icon, where the platform supports them."""
+    def __init__(self, tray, timeout_ms=8000):
+        self.tray = tray
+        self.timeout_ms = timeout_ms
+
+    def __call__(self, notification):
+        if self.tray.isVisible() and self.tray.supportsMessages():
+            self.tray.showMessage(notification.title, notification.message, self.tray.Information, self.timeout_ms)
+
+
+class DesktopSink:
+    """A system notification sent through the session's helper process."""
+    def __init__(self, helper):
+        self.helper = helper
+
+    def __call__(self, notification):
+        self.helper.send("notify", title=notification.title, message=notification.message)
+
+
+class NotificationDispatcher(QObject):
+    delivered = pyqtSignal(object)  # Notification
+
+    def __init__(self, parent=None, clock=time.monotonic, coalesce_ms=COALESCE_MS):
+        super().__init__(parent)
+        self.clock = clock
+        self.sinks = []  # (sink, max priority, sources or None)
+        self.buckets = {}
+        self.pending = {}  # source -> {key: Notification}
+        self.recent = {}  # (source, key) -> time last delivered
+        self.stats = {"queued": 0, "delivered": 0, "duplicates": 0, "coalesced": 0, "rate_limited": 0}
+        self._seq = itertools.count()
+        self.coalesce_ms = coalesce_ms
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def add_sink(self, sink, max_priority=LOW, sources=None):
+        """Deliver notifications at least as urgent as max_priority (from sources, if given) to sink."""
+        self.sinks.append((sink, max_priority, None if sources is None else set(sources)))
+
+    def set_rate_limit(self, source, per_minute, burst):
+        self.buckets[source] = TokenBucket(per_minute / 60.0, burst, self.clock)
+
+    def _bucket(self, source):
+        bucket = self.buckets.get(source)
+        if bucket is None:
+            per_minute, burst = RATE_LIMITS.get(source, DEFAULT_RATE_LIMIT)
+            bucket = self.buckets[source] = TokenBucket(per_minute / 60.0, burst, self.clock)
+        return bucket
+
+    def notify(self, source, message, key=None, priority=NORMAL, title="Digital Dog", summary=None):
+        """Queue a notification; returns immediately. key identifies repeats (default: message)."""
+        key = message if key is None else key
+        now = self.clock()
+        shown = self.recent.get((source, key))
+        if shown is not None and now - shown < DEDUPE_SECONDS:
+            self.stats["duplicates"] += 1
+            return
+        queue = self.pending.setdefault(source, {})
+        existing = queue.get(key)
+        if existing is not None:
+            # Already waiting: keep one, with the newest text and the highest urgency
+            self.stats["duplicates"] += 1
+            existing.message = message
+            existing.items = [message]
+            existing.priority = min(existing.priority, priority)
+        else:
+            queue[key] = Notification(source, key, title, message, priority, summary, next(self._seq))
+            self.stats["queued"] += 1
+            if len(queue) > MAX_PENDING:
+                # Coalescing ones are kept: they leave as one notification and their count matters
+                loose = [n for n in queue.values() if n.summary is None]
+                if loose:
+                    del queue[max(loose, key=lambda n: (n.priority, -n.seq)).key]
+        if not self.timer.isActive():
+            self.timer.start(self.coalesce_ms)
+
+    def flush(self):
+        now = self.clock()
+        ready = []
+        wait = None
+        for source, queue in list(self.pending.items()):
+            bucket = self._bucket(source)
+            while queue:
+                if not bucket.take(now):
+                    self.stats["rate_limited"] += 1
+                    delay = bucket.wait(now)
+                    wait = delay if wait is None else min(wait, delay)
+                    break
+                ready.append(self._next(queue))
+            if not queue:
+                del self.pending[source]
+        for notification in sorted(ready, key=lambda n: (n.priority, n.seq)):
+            self._deliver(notification, now)
+        if wait is not None:
+            self.timer.start(max(self.coalesce_ms, int(wait * 1000) + 1))
+        # Forget deliveries old enough that a repeat would be shown again
+        self.recent = {k: t for k, t in self.recent.items() if now - t < DEDUPE_SECONDS}
+
+    def _next(self, queue):
+        """Take the most urgent notification from queue, merged with its summary group."""
+        first = min(queue.values(), key=lambda n: (n.priority, n.seq))
+        group = [first]
+        if first.summary is not None:
+            group = sorted((n for n in queue.values() if n.summary == first.summary), key=lambda n: n.seq)
+        for notification in group:
+            del queue[notification.key]
+        if len(group) == 1:
+            return first
+        self.stats["coalesced"] += len(group) - 1
+        merged = Notification(first.source, [n.key for n in group], first.title,
+                              first.summary.format(count=len(group)),
+                              min(n.priority for n in group), first.summary, first.seq)
+        merged.items = [n.message for n in group]
+        return merged
+
+    def _deliver(self, notification, now):
+        keys = notification.key if isinstance(notification.key, list) else [notification.key]
+        for key in keys:
+            self.recent[(notification.source, key)] = now
+        self.stats["delivered"] += 1
+        delivered = False
+        for sink, max_priority, sources in self.sinks:
+            if notification.priority > max_priority or (sources is not None and notification.source not in sources):
+                continue
+            try:
+                sink(notification)
+                delivered = True
+            except Exception as e:
+                print(f"[Notify] {type(sink).__name__} failed: {e}")
+        if not delivered:
+            print(f"[Notify] {notification.title}: {notification.message}")
+        self.delivered.emit(notification)
+
+
+_shared_dispatcher = None
+
+
+def shared_dispatcher():
+    """The process-wide dispatcher; main.py attaches the sinks."""
+    global _shared_dispatcher
+    if _shared_dispatcher is None:
+        _shared_dispatcher = NotificationDispatcher()
+    return _shared_dispatcher
@@ -0,0 +1,98 @@
+# persistence.py
+# Debounced, off-thread writer. Save requests within a short window are coalesced on the
+# GUI thread into one job, and the job's file I/O runs on a single background thread so
+# bursts of edits never stall the UI. Jobs run strictly in submission order.
+import queue
+import threading
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+DEBOUNCE_MS = 200
+
+
+class PersistenceWorker(QObject):
+    """Calls collect() on the GUI thread once the debounce window closes and runs the
+    callable it returns on the writer thread.
+
+    pending is the number of requested changes not yet on disk; pending_changed
+    fires whenever it moves, for a "saving..." indicator. flush() blocks until
+    everything requested so far has been written.
+    """
+    pending_changed = pyqtSignal(int)
+    _written = pyqtSignal(int)  # emitted from the writer thread, delivered queued
+
+    def __init__(self, collect, debounce_ms=DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.collect = collect
+        self.pending = 0
+        self._requested = 0  # changes requested since the last dispatch
+        self.writes = 0  # jobs completed by the writer thread
+        self.gui_blocked_ms = 0.0  # time spent on the GUI thread collecting jobs
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._dispatch)
+        self._written.connect(self._on_written)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="persistence-writer", daemon=True)
+        self._thread.start()
+
+    def request(self, count=1):
+        self.pending += count
+        self._requested += count
+        self.pending_changed.emit(self.pending)
+        # Not restarted on every request, so a steady stream still writes once per window
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def _dispatch(self):
+        self.timer.stop()
+        if not self._requested:
+            return
+        start = time.perf_counter()
+        job = self.collect()
+        self.gui_blocked_ms += (time.perf_counter() - start) * 1000
+        count, self._requested = self._requested, 0
+        if self._thread.is_alive():
+            self._queue.put((job, count))
+        else:
+            # Stopped (app is quitting): nothing left to hand off to, write inline
+            self._run_job(job)
+            self.pending = max(0, self.pending - count)
+
+    def flush(self):
+        """Write everything requested so far and wait for it to hit the disk."""
+        self._dispatch()
+        self._queue.join()
+        # The completion signals are still queued for the event loop; settle the count now
+        self.pending = self._requested
+        self.pending_changed.emit(self.pending)
+
+    def stop(self):
+        if self._thread.is_alive():
+            self.flush()
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            job, count = item
+            self._run_job(job)
+            self._written.emit(count)
+            self._queue.task_done()
+
+    def _run_job(self, job):
+        try:
+            if job is not None:
+                job()
+        except Exception as e:
+            print(f"[Persistence] Write failed: {e}")
+        self.writes += 1
+
+    def _on_written(self, count):
+        self.pending = max(self._requested, self.pending - count)
+        self.pending_changed.emit(self.pending)
@@ -0,0 +1,139 @@
+# pet_needs.py
+# The dog's food/happiness/walk needs, decayed analytically from a timestamp instead of
+# being ticked down by a timer. Values are computed when read, one single-shot timer is
+# armed for the next threshold crossing, and state persists so decay covers time the
+# app was closed.
+import json
+import os
+import time
+from PyQt5.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+from stat_history import StatHistory
+
+NEEDS_FILE = "pet_state.json"
+MAX_VALUE = 100.0
+
+# Points lost per second (same pace as the old 2-second tick: 0.75, 1.5 and 0.5 per tick)
+DECAY_PER_SECOND = {
+    "food": 0.375,
+    "happiness": 0.75,
+    "walk": 0.25,
+}
+DEFAULT_VALUES = {
+    "food": 80.0,
+    "happiness": 90.0,
+    "walk": 40.0,
+}
+# need -> (level, label) announced once when the value falls to or below level
+THRESHOLDS = {
+    "food": (30.0, "hungry"),
+    "happiness": (30.0, "bored"),
+    "walk": (30.0, "restless"),
+}
+
+
+class NeedsModel(QObject):
+    threshold_crossed = pyqtSignal(str, str)  # (need, label)
+    changed = pyqtSignal()
+
+    def __init__(self, path=NEEDS_FILE, parent=None, clock=time.time):
+        super().__init__(parent)
+        self.path = path
+        self.clock = clock
+        self.rates = dict(DECAY_PER_SECOND)
+        self.base = dict(DEFAULT_VALUES)
+        self.updated = self.clock()
+        self.load()
+        # Samples are backfilled from the closed form whenever the model is touched,
+        # so keeping history needs no timer of its own
+        self.history = StatHistory(self.base.keys())
+        self.history.load()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.save_history)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_threshold_timer)
+        self._announced = {name for name in THRESHOLDS if self.value(name) <= THRESHOLDS[name][0]}
+        self._arm()
+
+    def value(self, name, now=None):
+        now = self.clock() if now is None else now
+        elapsed = max(0.0, now - self.updated)
+        return max(0.0, self.base[name] - self.rates[name] * elapsed)
+
+    def values(self, now=None):
+        now = self.clock() if now is None else now
+        return {name: self.value(name, now) for name in self.base}
+
+    def add(self, name, amount):
+        # Fold the decay so far into the base values, then apply the change
+        now = self.clock()
+        self.record_history(now)
+        self.base = self.values(now)
+        self.updated = now
+        self.base[name] = min(MAX_VALUE, max(0.0, self.base[name] + amount))
+        self.history.record(now + 0.001, self.base)
+        if name in THRESHOLDS and self.base[name] > THRESHOLDS[name][0]:
+            self._announced.discard(name)
+        self.save()
+        self._arm()
+        self.changed.emit()
+
+    def seconds_until(self, name, level, now=None):
+        """Seconds until name decays to level (0 if already there, None if it never will)."""
+        current = self.value(name, now)
+        if current <= level:
+            return 0.0
+        rate = self.rates[name]
+        return (current - level) / rate if rate > 0 else None
+
+    def _arm(self):
+        now = self.clock()
+        waits = [self.seconds_until(name, level, now) for name, (level, _) in THRESHOLDS.items()
+                 if name not in self._announced]
+        waits = [w for w in waits if w is not None]
+        if not waits:
+            self.timer.stop()
+            return
+        # QTimer intervals are capped at ~24 days; re-arming then is harmless
+        self.timer.start(min(int(min(waits) * 1000) + 1, 2 ** 31 - 1))
+
+    def record_history(self, now=None):
+        now = self.clock() if now is None else now
+        self.history.backfill(self.values, now)
+
+    def save_history(self):
+        self.record_history()
+        self.history.save()
+
+    def _on_threshold_timer(self):
+        now = self.clock()
+        self.record_history(now)
+        for name, (level, label) in THRESHOLDS.items():
+            if name not in self._announced and self.value(name, now) <= level:
+                self._announced.add(name)
+                self.threshold_crossed.emit(name, label)
+        self._arm()
+        self.changed.emit()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+            for name, value in state.get("values", {}).items():
+                if name in self.base:
+                    self.base[name] = float(value)
+            self.updated = float(state.get("updated", self.updated))
+        except (OSError, ValueError) as e:
+            print(f"[Needs] Failed to load {self.path}: {e}")
+
+    def save(self):
+        state = {"updated": self.updated, "values": self.base}
+        try:
+            with open(self.path + ".tmp", "w") as f:
+                json.dump(state, f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"[Needs] Failed to save {self.path}: {e}")
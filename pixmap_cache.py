@@ -0,0 +1,112 @@
+# pixmap_cache.py
+# Central LRU cache for scaled pixmaps and whole frame sets, bounded by a byte budget.
+# Keys are (source, logical size, devicePixelRatio) so HiDPI screens get their own entries.
+from collections import OrderedDict
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
+
+DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+
+
+def pixmap_bytes(pixmap):
+    if pixmap is None or pixmap.isNull():
+        return 0
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+def frames_bytes(frames):
+    return sum(pixmap_bytes(frame) for frame in frames)
+
+
+class PixmapCache:
+    """Least-recently-used store of pixmaps / frame sets with hit, miss and size counters.
+
+    Evicting an entry only drops the cache's reference; anything still holding the
+    value (e.g. an animation that is playing) keeps it alive until it lets go.
+    """
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()  # key -> (value, nbytes)
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(source, size, device_pixel_ratio=1.0):
+        return (source, tuple(size), float(device_pixel_ratio))
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, nbytes):
+        self.discard(key)
+        self.entries[key] = (value, nbytes)
+        self.resident_bytes += nbytes
+        self._evict(keep=key)
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.resident_bytes -= entry[1]
+
+    def set_budget(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def _evict(self, keep=None):
+        # Never evict the entry that was just added, even if it alone exceeds the budget
+        while self.resident_bytes > self.budget_bytes and len(self.entries) > (1 if keep else 0):
+            key = next(iter(self.entries))
+            if key == keep:
+                self.entries.move_to_end(key)
+                continue
+            self.discard(key)
+            self.evictions += 1
+
+    def clear(self):
+        self.entries.clear()
+        self.resident_bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "resident_bytes": self.resident_bytes,
+            "budget_bytes": self.budget_bytes,
+        }
+
+    def load_pixmap(self, path, size, device_pixel_ratio=1.0):
+        """A single image scaled to size (logical pixels), from cache when possible."""
+        key = self.key(path, size, device_pixel_ratio)
+        pixmap = self.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(path)
+            if pixmap.isNull():
+                return pixmap
+            pixmap = pixmap.scaled(round(size[0] * device_pixel_ratio), round(size[1] * device_pixel_ratio),
+                                   Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+            self.put(key, pixmap, pixmap_bytes(pixmap))
+        return pixmap
+
+
+_shared_cache = None
+
+
+def shared_pixmap_cache():
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = PixmapCache()
+    return _shared_cache
@@ -0,0 +1,276 @@
+# probe_worker.py
+# Runs focus probing (which app is in front, which URL it shows) on its own thread.
+# Probes may block on slow helpers such as osascript; the GUI thread only ever sees
+# a queued focus_changed signal when the answer actually changes. Polled backends run
+# on an adaptive schedule: slower while focus is stable, faster as a distraction nears
+# its threshold, and paused while the user is idle or the screen is locked.
+import subprocess
+import threading
+import time
+from PyQt5.QtCore import QObject, QThread, QTimer, QMetaObject, Qt, pyqtSignal, pyqtSlot
+from helper_process import HelperError, HelperTimeout
+
+PROBE_INTERVAL_MS = 2000  # the old fixed cadence, and the pace right after a change
+BACKOFF = 2  # interval multiplier per unchanged, undistracted probe
+MAX_BACKOFF = 8  # the interval never grows past PROBE_INTERVAL_MS x this
+MIN_INTERVAL_FRACTION = 8  # nor shrinks below PROBE_INTERVAL_MS / this near a threshold
+IDLE_AFTER_SECONDS = 120  # no input for this long (or a locked screen) pauses probing
+IDLE_CHECK_MS = 5000  # while paused, only the cheap idle check runs, this often
+PROBE_TIMEOUT = 1.5  # seconds one probe may take before its result is dropped
+
+
+class ProbeTimeout(Exception):
+    pass
+
+
+class AdaptiveSchedule:
+    """Decides the delay before the next probe, and counts probes against what the
+    fixed base_ms cadence would have made over the same time."""
+    def __init__(self, base_ms=PROBE_INTERVAL_MS, idle_after=IDLE_AFTER_SECONDS, clock=time.monotonic):
+        self.base_ms = base_ms
+        self.min_ms = max(1, base_ms // MIN_INTERVAL_FRACTION)
+        self.max_ms = base_ms * MAX_BACKOFF
+        self.idle_after = idle_after
+        self.idle_check_ms = IDLE_CHECK_MS * base_ms // PROBE_INTERVAL_MS  # same ratio for other bases
+        self.clock = clock
+        self.interval_ms = base_ms
+        self.started = clock()
+        self.probes = 0
+        self.paused_checks = 0
+        self.distraction = None  # (monotonic start, threshold seconds) while distracted
+
+    def next_interval(self, changed):
+        """Delay in ms after a probe; changed says whether it saw a new app or URL."""
+        self.probes += 1
+        if changed:
+            self.interval_ms = self.base_ms
+        distraction = self.distraction
+        if distraction is not None:
+            since, threshold = distraction
+            remaining = threshold - (self.clock() - since)
+            if remaining > 0:
+                # Halve the gap as the nag nears, so leaving just in time still cancels it
+                self.interval_ms = int(min(self.base_ms, max(self.min_ms, remaining * 500)))
+            else:
+                self.interval_ms = self.base_ms
+        elif not changed:
+            self.interval_ms = min(self.max_ms, self.interval_ms * BACKOFF)
+        return self.interval_ms
+
+    def paused(self, idle):
+        return idle is not None and idle >= self.idle_after
+
+    def stats(self):
+        elapsed = max(1e-9, self.clock() - self.started)
+        fixed = elapsed * 1000 / self.base_ms
+        return {"probes": self.probes, "fixed_probes": fixed, "paused_checks": self.paused_checks,
+                "saved_per_hour": (fixed - self.probes) * 3600 / elapsed}
+
+
+class ProbeWorker(QObject):
+    """Drives a focus_probes backend on the thread it lives on.
+
+    A polled backend is asked probe(worker) -> (app_id, url) on an AdaptiveSchedule
+    around interval_ms; if it has idle_seconds(), probing pauses while the user is
+    away. An event-driven one runs watch(worker) instead and reports changes itself, so there
+    is no poll at all. A plain callable(worker) is treated as a polled backend.
+
+    Commands started through run_command are killed once they pass the timeout or
+    when cancel() is called from any thread; requests made through request() to a
+    HelperProcess get the same timeout and are abandoned by cancel(). A probe that
+    overruns the timeout some other way has its (stale) result discarded.
+    """
+    focus_changed = pyqtSignal(object, object)  # (app_id, url)
+    stats_changed = pyqtSignal(object)  # stats() after every poll
+
+    def __init__(self, probe, interval_ms=PROBE_INTERVAL_MS, timeout=PROBE_TIMEOUT):
+        super().__init__()
+        self.backend = probe
+        self.probe = getattr(probe, "probe", probe)
+        self.interval_ms = interval_ms
+        self.schedule = AdaptiveSchedule(interval_ms)
+        self.idle_seconds = getattr(probe, "idle_seconds", lambda: None)  # plain callables have none
+        self.timeout = timeout
+        self.timer = None
+        self.last = None
+        self.probes = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._process = None
+        self._helper = None
+        self._cancelled = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @pyqtSlot()
+    def start(self):
+        if getattr(self.backend, "event_driven", False):
+            # Blocks this thread until cancel(); the backend reports pushes itself
+            try:
+                self.backend.watch(self)
+            except Exception as e:
+                print(f"[Monitor] Focus watch stopped: {e}")
+            return
+        # Runs on the worker thread, so the timer belongs to that thread's event loop
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.poll)
+        self.poll()
+
+    @pyqtSlot()
+    def poll(self):
+        if self._cancelled:
+            return
+        try:
+            idle = self.idle_seconds()
+        except Exception:
+            idle = None
+        if self.schedule.paused(idle):
+            self.schedule.paused_checks += 1
+            self.timer.start(self.schedule.idle_check_ms)
+        else:
+            changed = self._probe()
+            if not self._cancelled:
+                self.timer.start(self.schedule.next_interval(changed))
+        self.stats_changed.emit(self.stats())
+
+    def stats(self):
+        """The schedule's counters (probes, fixed_probes, paused_checks, saved_per_hour)
+        plus timeouts."""
+        return dict(self.schedule.stats(), timeouts=self.timeouts)
+
+    def _probe(self):
+        started = time.monotonic()
+        self.probes += 1
+        try:
+            sample = self.probe(self)
+        except ProbeTimeout as e:
+            if not self._cancelled:
+                self.timeouts += 1
+                print(f"[Monitor] Probe timed out: {e}")
+            return False
+        except Exception as e:
+            print(f"[Monitor] Probe failed: {e}")
+            return False
+        if time.monotonic() - started > self.timeout:
+            self.timeouts += 1
+            print("[Monitor] Probe overran its timeout; dropping the result")
+            return False
+        return self.report(sample)
+
+    def report(self, sample):
+        """Emit focus_changed if sample differs from the last one; returns whether it did.
+        Worker thread only."""
+        if sample != self.last and not self._cancelled:
+            self.last = sample
+            self.focus_changed.emit(*sample)
+            return True
+        return False
+
+    def run_command(self, args, timeout=None):
+        """Run a helper command for a probe and return its stripped stdout."""
+        with self._lock:
+            if self._cancelled:
+                raise ProbeTimeout("cancelled")
+            process = self._process = subprocess.Popen(args, stdout=subprocess.PIPE,
+                                                       stderr=subprocess.DEVNULL, text=True)
+        try:
+            out, _ = process.communicate(timeout=self.timeout if timeout is None else timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise ProbeTimeout(f"{args[0]} took longer than {self.timeout}s")
+        finally:
+            with self._lock:
+                self._process = None
+        if self._cancelled:
+            raise ProbeTimeout("cancelled")
+        return out.strip()
+
+    def request(self, helper, op, **args):
+        """Ask a HelperProcess for op's result within this worker's timeout."""
+        with self._lock:
+            if self._cancelled:
+                raise ProbeTimeout("cancelled")
+            self._helper = helper
+        try:
+            return helper.request(op, timeout=self.timeout, **args)
+        except HelperTimeout as e:
+            raise ProbeTimeout(str(e))
+        except HelperError:
+            if self._cancelled:
+                raise ProbeTimeout("cancelled")
+            raise
+        finally:
+            with self._lock:
+                self._helper = None
+
+    def cancel(self):
+        """Stop probing; kills a helper command that is still running. Thread-safe."""
+        with self._lock:
+            self._cancelled = True
+            if self._process is not None:
+                self._process.kill()
+            if self._helper is not None:
+                self._helper.cancel_pending()
+
+    @pyqtSlot()
+    def stop_timer(self):
+        if self.timer is not None:
+            self.timer.stop()
+
+
+class FocusWatcher(QObject):
+    """Owns a ProbeWorker and the QThread it runs on; re-emits its focus changes on
+    the thread the watcher was created on (normally the GUI thread).
+
+    stats holds the worker's latest counters (see ProbeWorker.stats; empty for
+    event-driven backends, which never poll) and stats_changed fires as they move.
+    """
+    focus_changed = pyqtSignal(object, object)
+    stats_changed = pyqtSignal(object)
+
+    def __init__(self, probe, parent=None, interval_ms=PROBE_INTERVAL_MS, timeout=PROBE_TIMEOUT):
+        super().__init__(parent)
+        self.probe_thread = QThread()
+        self.probe_thread.setObjectName("focus-probe")
+        self.worker = ProbeWorker(probe, interval_ms, timeout)
+        self.worker.moveToThread(self.probe_thread)
+        self.probe_thread.started.connect(self.worker.start)
+        self.worker.focus_changed.connect(self.focus_changed)  # queued across threads
+        self.stats = {}
+        self.worker.stats_changed.connect(self._on_stats)
+
+    def _on_stats(self, stats):
+        self.stats = stats
+        self.stats_changed.emit(stats)
+
+    def start(self):
+        self.probe_thread.start()
+
+    def set_distraction(self, since, threshold):
+        """Tell the schedule a distraction began at monotonic time since (None: it ended),
+        so probes tighten as threshold seconds approach. Thread-safe."""
+        self.worker.schedule.distraction = None if since is None else (since, threshold)
+
+    def probe_now(self):
+        # Event-driven backends already report every change
+        if not getattr(self.worker.backend, "event_driven", False):
+            QMetaObject.invokeMethod(self.worker, "poll", Qt.QueuedConnection)
+
+    def stop(self, wait_ms=2000):
+        if not self.probe_thread.isRunning():
+            return
+        self.worker.cancel()
+        QMetaObject.invokeMethod(self.worker, "stop_timer", Qt.QueuedConnection)
+        self.probe_thread.quit()
+        if not self.probe_thread.wait(wait_ms):
+            print("[Monitor] Probe thread did not stop in time")
+        if not getattr(self.worker.backend, "event_driven", False):
+            # The worker's thread has stopped; take the final counts directly
+            self._on_stats(self.worker.stats())
+            stats = self.stats
+            print(f"[Monitor] {stats['probes']} probe(s) where a fixed interval would have made "
+                  f"{stats['fixed_probes']:.0f}; {stats['saved_per_hour']:.0f} saved per hour")
@@ -0,0 +1,203 @@
+# recurrence.py
+# RRULE-style repeat rules (FREQ, INTERVAL, COUNT, UNTIL, BYDAY) for recurring tasks.
+# BYDAY takes plain weekdays and applies to DAILY and WEEKLY rules only; anything else
+# (ordinals like 2MO, BYDAY on MONTHLY/YEARLY) is rejected when parsed.
+# Occurrences come from generators and are only produced as far as the caller reads,
+# so an open-ended rule is a few fields on the task and is never expanded in full.
+import datetime
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_DAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_UNITS = {"DAILY": "day", "WEEKLY": "week", "MONTHLY": "month", "YEARLY": "year"}
+_UNTIL_FORMAT = "%Y%m%dT%H%M%S"
+
+# Choices offered when adding a task: label -> rule text
+PRESETS = {
+    "Once": None,
+    "Daily": "FREQ=DAILY",
+    "Weekdays": "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR",
+    "Weekly": "FREQ=WEEKLY",
+    "Monthly": "FREQ=MONTHLY",
+}
+
+
+def _local(epoch):
+    return datetime.datetime.fromtimestamp(epoch)
+
+
+def _epoch(dt):
+    return int(dt.timestamp())
+
+
+class RecurrenceRule:
+    """A parsed rule such as "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;COUNT=10".
+
+    Occurrences keep dtstart's local wall-clock time, so a 9:00 standup stays at 9:00
+    across DST changes. Months without dtstart's day (e.g. the 31st) are skipped, as
+    in RFC 5545.
+    """
+    __slots__ = ("freq", "interval", "count", "until", "byday")
+
+    def __init__(self, freq, interval=1, count=None, until=None, byday=None):
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unsupported FREQ: {freq}")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("INTERVAL and COUNT must be positive")
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until  # epoch seconds, inclusive
+        if byday and freq not in ("DAILY", "WEEKLY"):
+            raise ValueError(f"BYDAY is only supported with FREQ=DAILY or WEEKLY, not {freq}")
+        self.byday = tuple(sorted(byday)) if byday else None  # weekday numbers, Monday = 0
+
+    @classmethod
+    def parse(cls, text):
+        parts = {}
+        for part in text.strip().upper().removeprefix("RRULE:").split(";"):
+            if part:
+                key, _, value = part.partition("=")
+                parts[key] = value
+        try:
+            until = parts.get("UNTIL")
+            if until:
+                # A trailing Z (UTC) is read as local time; a bare date means the end of that day
+                until = until.rstrip("Z")
+                if "T" not in until:
+                    until += "T235959"
+                until = _epoch(datetime.datetime.strptime(until, _UNTIL_FORMAT))
+            byday = parts.get("BYDAY")
+            if byday:
+                unknown = [day for day in byday.split(",") if day not in WEEKDAYS]
+                if unknown:
+                    # Ordinals ("2MO", "-1FR") would need per-month expansion; refuse rather
+                    # than quietly repeating every Monday
+                    raise ValueError(f"unsupported BYDAY value(s) {','.join(unknown)}")
+                byday = [WEEKDAYS.index(day) for day in byday.split(",")]
+            return cls(parts.get("FREQ"), int(parts.get("INTERVAL", 1)),
+                       int(parts["COUNT"]) if "COUNT" in parts else None, until or None, byday)
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Invalid recurrence rule {text!r}: {e}")
+
+    def __str__(self):
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.byday:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in self.byday))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append("UNTIL=" + _local(self.until).strftime(_UNTIL_FORMAT))
+        return ";".join(parts)
+
+    def describe(self):
+        unit = _UNITS[self.freq]
+        text = f"every {self.interval} {unit}s" if self.interval != 1 else ("daily" if unit == "day" else f"{unit}ly")
+        if self.byday:
+            text += " on " + ", ".join(_DAY_NAMES[day] for day in self.byday)
+        if self.count is not None:
+            text += f", {self.count} left"
+        return text
+
+    # --- Expansion ---
+
+    def _candidates(self, start, weekday=None):
+        """Occurrences from local datetime start, ignoring COUNT/UNTIL (infinite).
+        A WEEKLY rule without BYDAY repeats on weekday (default: start's)."""
+        step = self.interval
+        if self.freq == "DAILY":
+            # BYDAY only filters; stop if the step can never land on one of its days
+            if self.byday and not {(start.weekday() + i * step) % 7 for i in range(7)} & set(self.byday):
+                return
+            day = start
+            while True:
+                if not self.byday or day.weekday() in self.byday:
+                    yield day
+                day += datetime.timedelta(days=step)
+        elif self.freq == "WEEKLY":
+            days = self.byday or (start.weekday() if weekday is None else weekday,)
+            week = start - datetime.timedelta(days=start.weekday())
+            while True:
+                for weekday in days:
+                    day = week + datetime.timedelta(days=weekday)
+                    if day >= start:
+                        yield day
+                week += datetime.timedelta(weeks=step)
+        else:
+            months = step if self.freq == "MONTHLY" else 12 * step
+            index = start.year * 12 + start.month - 1
+            while True:
+                year, month = divmod(index, 12)
+                try:
+                    yield start.replace(year=year, month=month + 1)
+                except ValueError:
+                    pass  # no such day this month (31st, Feb 29)
+                index += months
+
+    def occurrences(self, dtstart, after=None):
+        """Yield occurrence instants (epoch seconds) from dtstart on, lazily.
+
+        With after given, only instants >= after are yielded. Without COUNT, DAILY and
+        WEEKLY rules jump straight to after's period instead of walking up to it.
+        """
+        start = _local(dtstart)
+        first = start
+        if after is not None and self.count is None and after > dtstart and self.freq in ("DAILY", "WEEKLY"):
+            period = self.interval * (1 if self.freq == "DAILY" else 7)
+            skip = (_local(after).date() - start.date()).days // period * period
+            if skip > 0:
+                first = start + datetime.timedelta(days=skip)
+                if self.freq == "WEEKLY":
+                    # Restart at the top of that week so BYDAY days before first still count
+                    first = first - datetime.timedelta(days=first.weekday())
+                    first = max(first, start)
+        produced = 0
+        for occurrence in self._candidates(first, start.weekday()):
+            instant = _epoch(occurrence)
+            if self.until is not None and instant > self.until:
+                return
+            if self.count is not None:
+                if produced >= self.count:
+                    return
+                produced += 1
+            if after is None or instant >= after:
+                yield instant
+
+    def between(self, dtstart, start, end):
+        """Occurrences in [start, end); stops reading the generator at end."""
+        for instant in self.occurrences(dtstart, after=start):
+            if instant >= end:
+                return
+            yield instant
+
+    def next_after(self, dtstart, instant):
+        """First occurrence strictly after instant, or None when the rule has run out."""
+        return next(self.occurrences(dtstart, after=instant + 1), None)
+
+    def advance(self, dtstart, instant):
+        """(next due, rule for the remaining occurrences) once everything up to instant is
+        done; (None, None) when nothing is left. COUNT shrinks by the occurrences passed."""
+        if self.count is None:
+            due = self.next_after(dtstart, instant)
+            return (due, self) if due is not None else (None, None)
+        remaining = self.count
+        for occurrence in self.occurrences(dtstart):
+            if occurrence > instant:
+                rule = RecurrenceRule(self.freq, self.interval, remaining, self.until, self.byday)
+                return occurrence, rule
+            remaining -= 1
+        return None, None
+
+
+def task_rule(record):
+    """The RecurrenceRule stored on a task record (its "rrule" field), or None for one-shot tasks."""
+    text = record.extra.get("rrule") if record.extra else None
+    if not text:
+        return None
+    try:
+        return RecurrenceRule.parse(text)
+    except ValueError as e:
+        print(f"[Recurrence] Ignoring rule on task {record.id}: {e}")
+        return None
@@ -0,0 +1,88 @@
+# reminder_scheduler.py
+# Priority queue of upcoming reminder instants. One single-shot timer is armed for the
+# earliest entry, so the cost no longer depends on how many tasks exist and nothing
+# waits for a once-a-minute scan.
+import heapq
+import itertools
+import time
+from PyQt5.QtCore import QObject, QTimer, Qt
+
+MAX_TIMER_MS = 2 ** 31 - 1  # QTimer's limit (~24.8 days); longer waits just re-arm
+MIN_COMPACT_SIZE = 64  # heaps this small are never worth rebuilding
+
+
+class ReminderScheduler(QObject):
+    """Calls on_fire(key, payload) once each scheduled instant (epoch seconds) is reached.
+
+    schedule/cancel are O(log n): a re-scheduled or cancelled key leaves its old heap
+    entry behind and that entry is skipped when it surfaces (lazy deletion). Once stale
+    entries outnumber live ones the heap is rebuilt from the live entries, so it stays
+    within about twice the number of reminders however often tasks are edited.
+    """
+    def __init__(self, on_fire, parent=None, clock=time.time):
+        super().__init__(parent)
+        self.on_fire = on_fire
+        self.clock = clock
+        self.heap = []  # (instant, seq, key)
+        self.entries = {}  # key -> (instant, seq, payload) of the live entry
+        self._seq = itertools.count()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.fire_due)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def schedule(self, key, instant, payload=None):
+        seq = next(self._seq)
+        self.entries[key] = (instant, seq, payload)
+        heapq.heappush(self.heap, (instant, seq, key))
+        if self.heap[0][1] == seq:
+            self._arm()
+        self._compact()
+
+    def cancel(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None and self.heap and self.heap[0][1] == entry[1]:
+            self._arm()
+        self._compact()
+
+    def _compact(self):
+        # The earliest live entry stays first, so the armed timer is still right
+        if len(self.heap) > MIN_COMPACT_SIZE and len(self.heap) > 2 * len(self.entries):
+            self.heap = [(instant, seq, key) for key, (instant, seq, _) in self.entries.items()]
+            heapq.heapify(self.heap)
+
+    def next_instant(self):
+        self._drop_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def _drop_stale(self):
+        while self.heap:
+            instant, seq, key = self.heap[0]
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == seq:
+                return
+            heapq.heappop(self.heap)
+
+    def _arm(self):
+        instant = self.next_instant()
+        if instant is None:
+            self.timer.stop()
+            return
+        delay_ms = max(0, int((instant - self.clock()) * 1000))
+        self.timer.start(min(delay_ms, MAX_TIMER_MS))
+
+    def fire_due(self):
+        now = self.clock()
+        due = []
+        while True:
+            instant = self.next_instant()
+            if instant is None or instant > now:
+                break
+            _, _, key = heapq.heappop(self.heap)
+            due.append((key, self.entries.pop(key)[2]))
+        for key, payload in due:
+            self.on_fire(key, payload)
+        self._arm()
@@ -0,0 +1,140 @@
+# sprite_widget.py
+# Paints the dog's current frame directly instead of going through QLabel.setPixmap,
+# which relayouts and recomposites the whole translucent window on every tick.
+import time
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QRect, QSize
+from PyQt5.QtGui import QPainter, QPixmap, QRegion
+from PyQt5.QtWidgets import QWidget, QStyle
+
+DIRTY_CACHE_SIZE = 256  # frame pairs; a GIF played through QMovie has new cacheKeys every lap
+
+
+def _common_prefix(a, b):
+    # Binary search on slice equality: each probe is a memcmp, not a Python loop
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _rows(image):
+    rows = []
+    for y in range(image.height()):
+        line = image.constScanLine(y)
+        line.setsize(image.bytesPerLine())
+        rows.append(bytes(line))
+    return rows
+
+
+def changed_rect(old, new):
+    """Bounding rect (in image pixels) of the pixels that differ between two images."""
+    if old.size() != new.size() or old.format() != new.format():
+        return QRect(0, 0, max(old.width(), new.width()), max(old.height(), new.height()))
+    depth = old.depth() // 8
+    top = bottom = None
+    left, right = old.width(), -1
+    for y, (a, b) in enumerate(zip(_rows(old), _rows(new))):
+        if a == b:
+            continue
+        if top is None:
+            top = y
+        bottom = y
+        left = min(left, _common_prefix(a, b) // depth)
+        right = max(right, (len(a) - 1 - _common_prefix(a[::-1], b[::-1])) // depth)
+    if top is None:
+        return QRect()
+    return QRect(left, top, right - left + 1, bottom - top + 1)
+
+
+class SpriteWidget(QWidget):
+    """Draws one pixmap in paintEvent and repaints only what changed between frames.
+
+    Dirty rects are computed once per (previous, next) frame pair and cached by
+    pixmap cacheKey, so a looping animation pays for the diff only on its first
+    lap. The cache keeps the DIRTY_CACHE_SIZE most recently used pairs, since frames
+    decoded afresh each lap never hit it again. Set frame_time_hook to a callable(ms) to time each paint.
+    """
+    def __init__(self, parent=None, alignment=Qt.AlignLeft | Qt.AlignVCenter):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TranslucentBackground, True)
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        self.alignment = alignment
+        self._pixmap = QPixmap()
+        self._dirty_cache = OrderedDict()  # (old key, new key) -> QRect, oldest first
+        self.frame_time_hook = None
+        self.skipped_updates = 0
+
+    def pixmap(self):
+        return self._pixmap
+
+    def sizeHint(self):
+        if self._pixmap.isNull():
+            return QSize(0, 0)
+        return self._pixmap.size() / self._pixmap.devicePixelRatio()
+
+    def _target_rect(self, pixmap):
+        size = pixmap.size() / pixmap.devicePixelRatio()
+        return QStyle.alignedRect(self.layoutDirection(), self.alignment, size, self.rect())
+
+    def _dirty_region(self, old, new):
+        old_rect = self._target_rect(old)
+        new_rect = self._target_rect(new)
+        if old_rect != new_rect or old.devicePixelRatio() != new.devicePixelRatio():
+            return QRegion(old_rect).united(QRegion(new_rect))
+        key = (old.cacheKey(), new.cacheKey())
+        rect = self._dirty_cache.get(key)
+        if rect is None:
+            rect = changed_rect(old.toImage(), new.toImage())
+            self._dirty_cache[key] = rect
+            if len(self._dirty_cache) > DIRTY_CACHE_SIZE:
+                self._dirty_cache.popitem(last=False)
+        else:
+            self._dirty_cache.move_to_end(key)
+        if rect.isEmpty():
+            return QRegion()
+        # Image pixels to logical widget coordinates, rounded outwards
+        dpr = new.devicePixelRatio()
+        x1 = int(rect.left() / dpr)
+        y1 = int(rect.top() / dpr)
+        x2 = -int(-(rect.right() + 1) // dpr)
+        y2 = -int(-(rect.bottom() + 1) // dpr)
+        return QRegion(QRect(new_rect.x() + x1, new_rect.y() + y1, x2 - x1, y2 - y1))
+
+    def setPixmap(self, pixmap):
+        old = self._pixmap
+        self._pixmap = pixmap
+        if old.isNull() or pixmap.isNull():
+            self.updateGeometry()
+            self.update()
+            return
+        if old.cacheKey() == pixmap.cacheKey():
+            self.skipped_updates += 1
+            return
+        region = self._dirty_region(old, pixmap)
+        if region.isEmpty():
+            self.skipped_updates += 1
+            return
+        self.update(region)
+
+    def clear_dirty_cache(self):
+        self._dirty_cache.clear()
+
+    def paintEvent(self, event):
+        if self._pixmap.isNull():
+            return
+        start = time.perf_counter()
+        painter = QPainter(self)
+        # The window is translucent: clear the dirty area so the old frame's
+        # pixels do not show through where the new frame is transparent
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(event.rect(), Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        painter.drawPixmap(self._target_rect(self._pixmap), self._pixmap)
+        painter.end()
+        if self.frame_time_hook:
+            self.frame_time_hook((time.perf_counter() - start) * 1000)
@@ -0,0 +1,227 @@
+# stat_history.py
+# Compact history of the pet's stats in fixed-size typed-array rings, so it never grows
+# past its configured span. Recent samples are kept raw; every sample is also folded
+# into a min/max/mean bucket (hourly by default) that lives much longer.
+#
+# Memory per day with the defaults (3 stats, one sample a minute, hourly buckets):
+#   raw:     1440 samples x (8 B time + 3 x 4 B value)          = 28.1 KiB/day (2 days kept)
+#   buckets:   24 buckets x (8 B time + 4 B count + 3 x 3 x 4 B) =  1.1 KiB/day (400 days kept)
+import os
+import struct
+from array import array
+
+SAMPLE_SECONDS = 60
+BUCKET_SECONDS = 3600
+RAW_DAYS = 2
+BUCKET_DAYS = 400
+HISTORY_FILE = "pet_history.bin"
+
+
+class Ring:
+    """Fixed-capacity ring of rows: a float64 time column plus named float32 columns.
+
+    Times must be appended in increasing order, which lets range lookups bisect.
+    """
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.columns = {name: array("f", bytes(4 * capacity)) for name in columns}
+        self.start = 0  # physical index of the oldest row
+        self.size = 0
+
+    def _physical(self, i):
+        return (self.start + i) % self.capacity
+
+    def append(self, t, row):
+        if self.size < self.capacity:
+            i = self._physical(self.size)
+            self.size += 1
+        else:
+            i = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[i] = t
+        for name, column in self.columns.items():
+            column[i] = row[name]
+
+    def time(self, i):
+        return self.times[self._physical(i)]
+
+    def get(self, name, i):
+        return self.columns[name][self._physical(i)]
+
+    def last_time(self):
+        return self.time(self.size - 1) if self.size else None
+
+    def first_time(self):
+        return self.time(0) if self.size else None
+
+    def bisect_left(self, t):
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time(mid) < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def nbytes(self):
+        return self.times.itemsize * self.capacity + sum(c.itemsize * self.capacity for c in self.columns.values())
+
+
+class StatHistory:
+    def __init__(self, stats, sample_seconds=SAMPLE_SECONDS, bucket_seconds=BUCKET_SECONDS,
+                 raw_days=RAW_DAYS, bucket_days=BUCKET_DAYS):
+        self.stats = list(stats)
+        self.sample_seconds = sample_seconds
+        self.bucket_seconds = bucket_seconds
+        self.raw = Ring(int(raw_days * 86400 // sample_seconds), self.stats)
+        bucket_columns = ["count"] + [f"{s}.{k}" for s in self.stats for k in ("min", "max", "mean")]
+        self.buckets = Ring(int(bucket_days * 86400 // bucket_seconds), bucket_columns)
+        self._open_bucket = None  # (bucket start, count, {stat: [min, max, sum]})
+
+    def nbytes(self):
+        return self.raw.nbytes() + self.buckets.nbytes()
+
+    def last_time(self):
+        return self.raw.last_time()
+
+    def record(self, t, values):
+        last = self.raw.last_time()
+        if last is not None and t <= last:
+            return
+        self.raw.append(t, values)
+        start = t - t % self.bucket_seconds
+        if self._open_bucket is not None and self._open_bucket[0] != start:
+            self._close_bucket()
+        if self._open_bucket is None:
+            self._open_bucket = [start, 0, {s: [values[s], values[s], 0.0] for s in self.stats}]
+        bucket = self._open_bucket
+        bucket[1] += 1
+        for s in self.stats:
+            acc = bucket[2][s]
+            acc[0] = min(acc[0], values[s])
+            acc[1] = max(acc[1], values[s])
+            acc[2] += values[s]
+
+    def _close_bucket(self):
+        start, count, accs = self._open_bucket
+        self._open_bucket = None
+        if self.buckets.last_time() == start:
+            # save() already wrote part of this bucket: merge into that row
+            i = self.buckets._physical(self.buckets.size - 1)
+            columns = self.buckets.columns
+            saved = columns["count"][i]
+            columns["count"][i] = saved + count
+            for s, (lo, hi, total) in accs.items():
+                columns[f"{s}.min"][i] = min(columns[f"{s}.min"][i], lo)
+                columns[f"{s}.max"][i] = max(columns[f"{s}.max"][i], hi)
+                columns[f"{s}.mean"][i] = (columns[f"{s}.mean"][i] * saved + total) / (saved + count)
+            return
+        row = {"count": count}
+        for s, (lo, hi, total) in accs.items():
+            row[f"{s}.min"] = lo
+            row[f"{s}.max"] = hi
+            row[f"{s}.mean"] = total / count
+        self.buckets.append(start, row)
+
+    def backfill(self, value_at, now):
+        """Record samples on the sample grid from the last sample up to now using value_at(t)."""
+        last = self.raw.last_time()
+        if last is None:
+            t = now - now % self.sample_seconds
+        else:
+            # Never backfill further than the raw ring can hold
+            t = max(last + self.sample_seconds, now - self.raw.capacity * self.sample_seconds)
+            t -= t % self.sample_seconds
+        while t <= now:
+            self.record(t, value_at(t))
+            t += self.sample_seconds
+
+    def query(self, stat, start, end, max_points=200):
+        """Return [(t, min, max, mean)] for stat over [start, end), at most max_points rows.
+
+        Uses raw samples where they cover the range and hourly buckets before that,
+        then merges neighbouring rows so the result fits max_points.
+        """
+        rows = []
+        raw_first = self.raw.first_time()
+        if raw_first is None or start < raw_first:
+            limit = end if raw_first is None else min(end, raw_first)
+            i = self.buckets.bisect_left(start - self.bucket_seconds + 1)
+            while i < self.buckets.size and self.buckets.time(i) < limit:
+                rows.append((self.buckets.time(i), self.buckets.get(f"{stat}.min", i),
+                             self.buckets.get(f"{stat}.max", i), self.buckets.get(f"{stat}.mean", i),
+                             self.buckets.get("count", i)))
+                i += 1
+        i = self.raw.bisect_left(start)
+        while i < self.raw.size and self.raw.time(i) < end:
+            v = self.raw.get(stat, i)
+            rows.append((self.raw.time(i), v, v, v, 1))
+            i += 1
+        return _downsample(rows, start, end, max_points)
+
+    # --- Persistence: a small header followed by both rings' raw arrays ---
+
+    def save(self, path=HISTORY_FILE):
+        if self._open_bucket is not None:
+            # So the current hour is not lost; later samples in it are merged into this row
+            self._close_bucket()
+        try:
+            with open(path + ".tmp", "wb") as f:
+                for ring in (self.raw, self.buckets):
+                    f.write(struct.pack("<III", ring.capacity, ring.start, ring.size))
+                    ring.times.tofile(f)
+                    for name in sorted(ring.columns):
+                        ring.columns[name].tofile(f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"[History] Failed to save {path}: {e}")
+
+    def load(self, path=HISTORY_FILE):
+        if not os.path.exists(path):
+            return
+        loaded = []
+        try:
+            with open(path, "rb") as f:
+                for ring in (self.raw, self.buckets):
+                    capacity, start, size = struct.unpack("<III", f.read(12))
+                    if capacity != ring.capacity:
+                        raise ValueError("history file was written with a different span")
+                    if start >= capacity or size > capacity:
+                        raise ValueError("ring header is out of range")
+                    times = array("d")
+                    times.fromfile(f, capacity)
+                    columns = {}
+                    for name in sorted(ring.columns):
+                        columns[name] = array("f")
+                        columns[name].fromfile(f, capacity)
+                    loaded.append((times, columns, start, size))
+        except (OSError, EOFError, ValueError, struct.error) as e:
+            print(f"[History] Ignoring {path}: {e}")
+            return
+        # Both rings parsed: only now replace them, so a damaged file changes neither
+        for ring, (times, columns, start, size) in zip((self.raw, self.buckets), loaded):
+            ring.times, ring.columns, ring.start, ring.size = times, columns, start, size
+        self._open_bucket = None
+
+
+def _downsample(rows, start, end, max_points):
+    if len(rows) <= max_points:
+        return [row[:4] for row in rows]
+    width = (end - start) / max_points
+    merged = []
+    current = None
+    for t, lo, hi, mean, count in rows:
+        slot = int((t - start) // width)
+        if current is None or current[0] != slot:
+            if current is not None:
+                merged.append(current)
+            current = [slot, t, lo, hi, mean * count, count]
+        else:
+            current[2] = min(current[2], lo)
+            current[3] = max(current[3], hi)
+            current[4] += mean * count
+            current[5] += count
+    merged.append(current)
+    return [(t, lo, hi, total / count) for _, t, lo, hi, total, count in merged]
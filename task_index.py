@@ -0,0 +1,156 @@
+# task_index.py
+# Search indexes over pending tasks: an inverted token index with prefix matching and a
+# due-date index kept sorted. Both are updated per task on add/complete/edit, never rebuilt.
+import bisect
+import datetime
+import re
+import time
+from recurrence import task_rule
+
+_TOKEN = re.compile(r"\w+")
+
+DUE_FILTERS = ("All", "Overdue", "Due today", "Next 7 days")
+
+
+def tokenize(text):
+    return set(_TOKEN.findall(text.lower()))
+
+
+class TaskIndex:
+    """Maps tokens and due times to task ids.
+
+    vocab is the sorted list of distinct tokens, so every token starting with a prefix
+    is one contiguous slice found by bisect; due is a sorted list of (due, id).
+    """
+    def __init__(self, records=()):
+        self.postings = {}  # token -> set of task ids
+        self.vocab = []  # sorted distinct tokens
+        self.due = []  # sorted (due epoch, task id)
+        self.indexed = {}  # task id -> (tokens, due) as indexed, for removal
+        self.recurring = {}  # task id -> (rule, due) for tasks that repeat
+        self.add_many(records)
+
+    def __len__(self):
+        return len(self.indexed)
+
+    def __contains__(self, task_id):
+        return task_id in self.indexed
+
+    def add(self, record):
+        if record.id in self.indexed:
+            self.remove(record.id)
+        tokens = tokenize(record.text)
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                bisect.insort(self.vocab, token)
+            ids.add(record.id)
+        bisect.insort(self.due, (record.due, record.id))
+        self.indexed[record.id] = (tokens, record.due)
+        self._add_rule(record)
+
+    def _add_rule(self, record):
+        rule = task_rule(record)
+        if rule is not None:
+            self.recurring[record.id] = (rule, record.due)
+
+    def add_many(self, records):
+        """Bulk add: append everything, then sort each list once instead of insorting."""
+        new_tokens = []
+        for record in records:
+            if record.id in self.indexed:
+                self.remove(record.id)
+            tokens = tokenize(record.text)
+            for token in tokens:
+                ids = self.postings.get(token)
+                if ids is None:
+                    ids = self.postings[token] = set()
+                    new_tokens.append(token)
+                ids.add(record.id)
+            self.due.append((record.due, record.id))
+            self.indexed[record.id] = (tokens, record.due)
+            self._add_rule(record)
+        if new_tokens:
+            # Sorted list plus a sorted tail: timsort merges the two runs in linear time
+            new_tokens.sort()
+            self.vocab += new_tokens
+            self.vocab.sort()
+        self.due.sort()
+
+    def remove(self, task_id):
+        entry = self.indexed.pop(task_id, None)
+        if entry is None:
+            return
+        tokens, due = entry
+        self.recurring.pop(task_id, None)
+        for token in tokens:
+            ids = self.postings[token]
+            ids.discard(task_id)
+            if not ids:
+                del self.postings[token]
+                del self.vocab[bisect.bisect_left(self.vocab, token)]
+        i = bisect.bisect_left(self.due, (due, task_id))
+        if i < len(self.due) and self.due[i] == (due, task_id):
+            del self.due[i]
+
+    def update(self, record):
+        self.add(record)
+
+    # --- Queries ---
+
+    def prefix_ids(self, prefix):
+        start = bisect.bisect_left(self.vocab, prefix)
+        # "\uffff" sorts after every character a token can continue with
+        end = bisect.bisect_left(self.vocab, prefix + "\uffff", start)
+        if end - start == 1:
+            return self.postings[self.vocab[start]]
+        return set().union(*[self.postings[token] for token in self.vocab[start:end]])
+
+    def search(self, query):
+        """Ids of tasks containing a token starting with each word of query (None for an empty query)."""
+        words = tokenize(query)
+        if not words:
+            return None
+        # Intersect smallest first so every step is bounded by the rarest word
+        matches = sorted((self.prefix_ids(word) for word in words), key=len)
+        result = set(matches[0])
+        for ids in matches[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def due_between(self, start, end):
+        """Ids of tasks due in [start, end), including repeating tasks with a later
+        occurrence in the range (expanded only up to the first hit)."""
+        lo = bisect.bisect_left(self.due, (start,))
+        hi = bisect.bisect_left(self.due, (end,), lo)
+        ids = {task_id for _, task_id in self.due[lo:hi]}
+        for task_id, (rule, due) in self.recurring.items():
+            if task_id not in ids and due < end and next(rule.between(due, max(start, due), end), None) is not None:
+                ids.add(task_id)
+        return ids
+
+    def due_filter(self, name, now=None):
+        """Ids for one of DUE_FILTERS, or None for "All"."""
+        now = time.time() if now is None else now
+        if name == "Overdue":
+            return self.due_between(float("-inf"), now)
+        if name == "Due today":
+            midnight = datetime.datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+            start = midnight.timestamp()
+            return self.due_between(start, (midnight + datetime.timedelta(days=1)).timestamp())
+        if name == "Next 7 days":
+            return self.due_between(now, now + 7 * 86400)
+        return None
+
+    def query(self, text, due_name="All", now=None):
+        """Combined search; None means no filter is active."""
+        by_text = self.search(text)
+        by_due = self.due_filter(due_name, now)
+        if by_text is None:
+            return by_due
+        if by_due is None:
+            return by_text
+        return by_text & by_due
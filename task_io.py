@@ -0,0 +1,328 @@
+# task_io.py
+# Bulk import/export of tasks as CSV, JSONL or iCalendar (.ics). Each stage is a
+# generator (lines -> rows -> validated tasks -> batches), so a file is never held in
+# memory whole. TaskImporter feeds the batches to the GUI from a timer, one slice per
+# tick, so a 50k-row import keeps the window responsive.
+import calendar
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from recurrence import RecurrenceRule
+from task_store import parse_due
+
+FORMATS = {".csv": "CSV", ".jsonl": "JSONL", ".ics": "iCalendar"}
+FILE_FILTER = "Tasks (*.csv *.jsonl *.ics)"
+CSV_FIELDS = ("text", "due", "rrule", "done")
+BATCH_SIZE = 200
+_TEXT_KEYS = ("text", "title", "summary", "task")
+_DUE_KEYS = ("due", "due_date", "dtstart", "date")
+_TRUE = {"1", "true", "yes", "y", "x", "done", "completed"}
+
+
+def file_format(path):
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+# --- Parsing: each reader yields plain dicts ---
+
+class _Progress:
+    """Wraps a text file and counts the characters read, for a progress fraction."""
+    def __init__(self, f, total):
+        self.f = f
+        self.total = max(1, total)
+        self.read = 0
+
+    def __iter__(self):
+        for line in self.f:
+            self.read += len(line)
+            yield line
+
+    @property
+    def fraction(self):
+        return min(1.0, self.read / self.total)
+
+
+def read_csv(lines):
+    yield from csv.DictReader(lines)
+
+
+def read_jsonl(lines):
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield {"_error": f"line {number}: {e}"}
+
+
+def _unfold(lines):
+    """RFC 5545 line unfolding: a line starting with a space or tab continues the last."""
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _ics_unescape(value):
+    return (value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",")
+            .replace("\\;", ";").replace("\\\\", "\\"))
+
+
+def _ics_escape(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_fold(line, limit=75):
+    # Content lines are limited to 75 octets (UTF-8), the leading space of a continuation
+    # included; folds fall between characters, never inside one
+    if len(line.encode("utf-8")) <= limit:
+        return line
+    parts = []
+    start = size = 0
+    for i, char in enumerate(line):
+        octets = len(char.encode("utf-8"))
+        if size + octets > limit - (1 if parts else 0):
+            parts.append(line[start:i])
+            start, size = i, 0
+        size += octets
+    parts.append(line[start:])
+    return "\r\n ".join(parts)
+
+
+def _ics_time(value):
+    """Epoch seconds from an iCalendar DATE or DATE-TIME (UTC with Z, else local time)."""
+    if "T" not in value:
+        return int(datetime.datetime.strptime(value[:8], "%Y%m%d").timestamp())
+    parsed = datetime.datetime.strptime(value[:15], "%Y%m%dT%H%M%S")
+    if value.endswith("Z"):
+        return calendar.timegm(parsed.timetuple())
+    return int(parsed.timestamp())
+
+
+def read_ics(lines):
+    event = None
+    for line in _unfold(lines):
+        name, _, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()  # drop parameters such as TZID
+        if name == "BEGIN" and value.upper() in ("VTODO", "VEVENT"):
+            event = {}
+        elif name == "END" and value.upper() in ("VTODO", "VEVENT"):
+            if event is not None:
+                yield event
+            event = None
+        elif event is not None:
+            if name == "SUMMARY":
+                event["text"] = _ics_unescape(value)
+            elif name == "DUE" or (name == "DTSTART" and "due" not in event):
+                try:
+                    event["due"] = _ics_time(value)
+                except ValueError:
+                    event["_error"] = f"bad {name}: {value}"
+            elif name == "RRULE":
+                event["rrule"] = value
+            elif name == "STATUS":
+                event["done"] = value.upper() == "COMPLETED"
+
+
+READERS = {"CSV": read_csv, "JSONL": read_jsonl, "iCalendar": read_ics}
+
+
+# --- Validation ---
+
+def _first(row, keys):
+    for key in keys:
+        for candidate in (key, key.capitalize(), key.upper()):
+            value = row.get(candidate)
+            if value not in (None, ""):
+                return value
+    return None
+
+
+def _parse_time(value):
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        return int(datetime.datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        due = parse_due(value)
+        if not due:
+            raise ValueError(f"unrecognised due date {value!r}")
+        return due
+
+
+def validate(rows, report):
+    """Yield (text, due, rrule or None, done) for good rows; bad rows go to report(message)."""
+    for number, row in enumerate(rows, 1):
+        if not isinstance(row, dict):
+            report(f"row {number}: not an object")
+            continue
+        if "_error" in row:
+            report(f"row {number}: {row['_error']}")
+            continue
+        text = _first(row, _TEXT_KEYS)
+        due = _first(row, _DUE_KEYS)
+        if text is None or due is None:
+            report(f"row {number}: missing text or due date")
+            continue
+        try:
+            due = _parse_time(due)
+            rrule = row.get("rrule") or row.get("RRULE") or None
+            if rrule:
+                rrule = str(RecurrenceRule.parse(rrule))
+        except ValueError as e:
+            report(f"row {number}: {e}")
+            continue
+        done = row.get("done", False)
+        if not isinstance(done, bool):
+            done = str(done).strip().lower() in _TRUE
+        yield str(text).strip(), due, rrule, done
+
+
+def batched(items, size=BATCH_SIZE):
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+# --- Export: each writer yields output lines ---
+
+def _csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def line(row):
+        writer.writerow(row)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(CSV_FIELDS)
+    for record in records:
+        extra = record.extra or {}
+        yield line((record.text, datetime.datetime.fromtimestamp(record.due).isoformat(timespec="minutes"),
+                    extra.get("rrule", ""), "true" if record.done else "false"))
+
+
+def _jsonl_lines(records):
+    for record in records:
+        data = record.to_json()
+        data.pop("id", None)
+        yield json.dumps(data) + "\n"
+
+
+def _ics_lines(records):
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Digital Dog//Tasks//EN\r\n"
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    for record in records:
+        lines = ["BEGIN:VTODO", f"UID:task-{record.id}@digital-dog", f"DTSTAMP:{stamp}",
+                 _ics_fold(f"SUMMARY:{_ics_escape(record.text)}"),
+                 "DUE:" + time.strftime("%Y%m%dT%H%M%S", time.localtime(record.due))]
+        if record.extra and record.extra.get("rrule"):
+            lines.append(f"RRULE:{record.extra['rrule']}")
+        lines.append("STATUS:" + ("COMPLETED" if record.done else "NEEDS-ACTION"))
+        lines.append("END:VTODO")
+        yield "\r\n".join(lines) + "\r\n"
+    yield "END:VCALENDAR\r\n"
+
+
+WRITERS = {"CSV": _csv_lines, "JSONL": _jsonl_lines, "iCalendar": _ics_lines}
+
+
+def export_tasks(records, path):
+    """Stream records to path in the format its extension names; returns the count."""
+    fmt = file_format(path)
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {path}")
+    count = 0
+
+    def counted():
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        f.writelines(WRITERS[fmt](counted()))
+    os.replace(tmp, path)
+    return count
+
+
+# --- Import driver ---
+
+class TaskImporter(QObject):
+    """Reads a file through the pipeline and hands on_batch(list of (text, due, rrule,
+    done)) one batch per timer tick, so parsing and inserting share the event loop
+    with painting. on_batch returns how many tasks it kept. progress(fraction,
+    imported) fires after each batch and finished(imported, skipped) once at the end."""
+    progress = pyqtSignal(float, int)
+    finished = pyqtSignal(int, int)
+
+    def __init__(self, path, on_batch, parent=None, batch_size=BATCH_SIZE):
+        super().__init__(parent)
+        fmt = file_format(path)
+        if fmt is None:
+            raise ValueError(f"Unsupported file type: {path}")
+        self.path = path
+        self.on_batch = on_batch
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []  # first few problems, for the summary
+        self._file = open(path, "r", newline="", encoding="utf-8-sig")
+        self._lines = _Progress(self._file, os.path.getsize(path))
+        self._batches = batched(validate(READERS[fmt](self._lines), self._report), batch_size)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._step)
+
+    def _report(self, message):
+        self.skipped += 1
+        if len(self.errors) < 10:
+            self.errors.append(message)
+
+    def start(self):
+        self.timer.start(0)
+
+    def cancel(self):
+        self._finish()
+
+    def _step(self):
+        try:
+            batch = next(self._batches, None)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"[TaskIO] Import of {self.path} stopped: {e}")
+            self._report(str(e))
+            batch = None
+        if batch is None:
+            self._finish()
+            return
+        self.imported += self.on_batch(batch)
+        self.progress.emit(self._lines.fraction, self.imported)
+
+    def _finish(self):
+        if self._file.closed:
+            return
+        self.timer.stop()
+        self._file.close()
+        print(f"[TaskIO] Imported {self.imported} task(s) from {self.path}, skipped {self.skipped}")
+        self.finished.emit(self.imported, self.skipped)
@@ -1,7 +1,12 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QListWidget, QListWidgetItem, QMessageBox, QDialog, QDialogButtonBox, QDateTimeEdit
-from PyQt5.QtCore import QTimer, QDateTime, Qt
-import json
-import os
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QListView, QComboBox, QMessageBox, QFileDialog, QProgressBar, QDialog, QDialogButtonBox, QDateTimeEdit, QLabel, QApplication
+from PyQt5.QtCore import QDateTime, Qt
+from notifications import shared_dispatcher, URGENT, NORMAL
+from reminder_scheduler import ReminderScheduler
+from task_store import TaskStore
+from task_model import TaskListModel, format_task
+from task_index import TaskIndex, DUE_FILTERS
+from recurrence import PRESETS, task_rule
+from task_io import TaskImporter, FILE_FILTER, export_tasks
 
 class TaskManager(QWidget):
     TASKS_FILE = "tasks.json"
@@ -16,26 +21,68 @@ class TaskManager(QWidget):
         input_layout = QHBoxLayout()
         self.task_input = QLineEdit()
         self.task_input.setPlaceholderText("Enter a new task...")
+        self.repeat_input = QComboBox()
+        self.repeat_input.addItems(PRESETS)
         self.add_task_button = QPushButton("Add Task")
         self.add_task_button.clicked.connect(self.add_task)
         input_layout.addWidget(self.task_input)
+        input_layout.addWidget(self.repeat_input)
         input_layout.addWidget(self.add_task_button)
         layout.addLayout(input_layout)
 
-        # Task list
-        self.task_list = QListWidget()
+        # Search: matches word prefixes, narrowed by an optional due-date range
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search tasks...")
+        self.search_input.textChanged.connect(self.apply_filter)
+        self.due_filter = QComboBox()
+        self.due_filter.addItems(DUE_FILTERS)
+        self.due_filter.currentIndexChanged.connect(self.apply_filter)
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.due_filter)
+        layout.addLayout(search_layout)
+
+        # Task list: a virtualized view over compact TaskRecords
+        self.task_model = TaskListModel(self)
+        self.task_model.completion_toggled.connect(self._on_completion_toggled)
+        self.task_list = QListView()
+        self.task_list.setUniformItemSizes(True)
+        self.task_list.setLayoutMode(QListView.Batched)
+        self.task_list.setModel(self.task_model)
         layout.addWidget(self.task_list)
 
-        # Reminder timer
-        self.reminder_timer = QTimer(self)
-        self.reminder_timer.timeout.connect(self.check_reminders)
-        self.reminder_timer.start(60000)  # Check every minute
+        # Reminders: a heap of upcoming instants with one timer for the earliest
+        self.reminder_lead_minutes = 10  # Remind 10 minutes before due
+        self.reminders = ReminderScheduler(self._on_reminder, self)
 
-        # Store tasks as (item, due_datetime)
-        self.tasks = []
+        self.store = TaskStore(self.TASKS_FILE)
+        self.index = TaskIndex()
         self.load_tasks()
-        self.reminder_callback = None  # Callback for dog reminder
-        self.reminder_lead_minutes = 10  # Remind 10 minutes before due
+
+        # Bulk import/export; imports run a batch per event-loop pass
+        io_layout = QHBoxLayout()
+        self.import_button = QPushButton("Import...")
+        self.import_button.clicked.connect(self.import_tasks)
+        self.export_button = QPushButton("Export...")
+        self.export_button.clicked.connect(self.export_tasks)
+        self.import_progress = QProgressBar()
+        self.import_progress.setRange(0, 100)
+        self.import_progress.hide()
+        io_layout.addWidget(self.import_button)
+        io_layout.addWidget(self.export_button)
+        io_layout.addWidget(self.import_progress)
+        layout.addLayout(io_layout)
+        self.importer = None
+
+        # Writes happen in the background; show when some are still pending
+        self.save_status = QLabel()
+        self.save_status.setStyleSheet("color: #888; font-size: 11px;")
+        layout.addWidget(self.save_status)
+        self.store.worker.pending_changed.connect(self._on_pending_writes)
+        self._on_pending_writes(self.store.pending_writes)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.store.close)
 
     def add_task(self):
         text = self.task_input.text().strip()
@@ -45,63 +92,200 @@ class TaskManager(QWidget):
         due, ok = self.get_due_datetime("Set Due Date & Time", QDateTime.currentDateTime())
         if not ok:
             return
-        item = QListWidgetItem(f"{text} (Due: {due.toString('yyyy-MM-dd hh:mm')})")
-        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-        item.setCheckState(Qt.Unchecked)
-        self.task_list.addItem(item)
-        self.tasks.append((item, due))
+        self._add_record(self._store_task(text, due, PRESETS[self.repeat_input.currentText()]))
         self.task_input.clear()
-        self.save_tasks()
+        self.repeat_input.setCurrentIndex(0)
+
+    def _store_task(self, text, due, rrule=None):
+        # Only repeating tasks carry the extra field
+        if rrule:
+            return self.store.add(text, due.toSecsSinceEpoch(), rrule=rrule)
+        return self.store.add(text, due.toSecsSinceEpoch())
+
+    def _add_record(self, record):
+        self.task_model.append([record])
+        self.index.add(record)
+        self.schedule_reminders(record)
+        if self.search_input.text() or self.due_filter.currentIndex():
+            self.apply_filter()
+        return record
+
+    def apply_filter(self, *args):
+        self.task_model.set_filter(self.index.query(self.search_input.text(), self.due_filter.currentText()))
+
+    def schedule_reminders(self, record):
+        """(Re)arm the lead-time reminder and the due-time alert for one task."""
+        lead_secs = record.due - self.reminder_lead_minutes * 60
+        now = QDateTime.currentSecsSinceEpoch()
+        if record.due > now:
+            # Added inside the lead window: remind straight away
+            self.reminders.schedule((record.id, "upcoming"), max(lead_secs, now))
+        self.reminders.schedule((record.id, "due"), record.due)
+
+    def cancel_reminders(self, task_id):
+        self.reminders.cancel((task_id, "upcoming"))
+        self.reminders.cancel((task_id, "due"))
+
+    def reschedule_task(self, task_id, due):
+        record = self.store.get(task_id)
+        if record is None:
+            return
+        self.store.edit(task_id, due=due.toSecsSinceEpoch())
+        self.cancel_reminders(task_id)
+        if not record.done:
+            self.schedule_reminders(record)
+            self.index.update(record)
+        self.task_model.refresh(task_id)
+
+    def _advance(self, record, instant):
+        """Move a repeating task on to its first occurrence after instant. Returns False
+        for one-shot tasks and for rules with nothing left."""
+        rule = task_rule(record)
+        if rule is None:
+            return False
+        due, rule = rule.advance(record.due, instant)
+        if due is None:
+            return False
+        record.done = False
+        self.store.edit(record.id, due=due, rrule=str(rule), done=False)
+        self.cancel_reminders(record.id)
+        self.schedule_reminders(record)
+        self.index.update(record)
+        self.task_model.refresh(record.id)
+        return True
+
+    def _on_completion_toggled(self, record):
+        # Ticking a task off in the list cancels its reminders; unticking re-arms them
+        # Only pending tasks are searchable; the row stays put until the filter changes
+        # A repeating task is never done: ticking it off skips to the next occurrence,
+        # or past every missed one if it is overdue
+        if record.done and self._advance(record, max(record.due, QDateTime.currentSecsSinceEpoch())):
+            return
+        if record.done:
+            self.cancel_reminders(record.id)
+            self.index.remove(record.id)
+            self.store.complete(record.id)
+        else:
+            self.schedule_reminders(record)
+            self.index.add(record)
+            # Compaction may already have dropped the completed task from the store
+            self.store.reopen(record)
+
+    def _on_reminder(self, key, payload):
+        task_id, kind = key
+        record = self.store.get(task_id)
+        if record is None or record.done:
+            return
+        text = format_task(record)
+        # Non-blocking: reminders firing together are coalesced rather than stacked
+        if kind == "upcoming":
+            shared_dispatcher().notify("tasks", text, key=key, priority=NORMAL,
+                                       summary="{count} tasks coming up")
+        else:
+            shared_dispatcher().notify("tasks", f"Task '{text}' is due!", key=key, priority=URGENT,
+                                       title="Task Reminder", summary="{count} tasks overdue")
+            # A repeating task stays due (and overdue) until it is ticked off, which moves
+            # it on; until then, alert again at each later occurrence. Missed occurrences
+            # (app closed) collapse into this single alert.
+            rule = task_rule(record)
+            if rule is not None:
+                following = rule.next_after(record.due, QDateTime.currentSecsSinceEpoch())
+                if following is not None:
+                    self.reminders.schedule(key, following)
 
     def check_reminders(self):
-        from PyQt5.QtCore import QDateTime
-        now = QDateTime.currentDateTime()
-        for item, due in self.tasks:
-            if item.checkState() == Qt.Unchecked:
-                minutes_to_due = now.secsTo(due) / 60
-                if 0 <= minutes_to_due <= self.reminder_lead_minutes:
-                    if self.reminder_callback:
-                        self.reminder_callback(item.text())
-                if now > due:
-                    QMessageBox.information(self, "Task Reminder", f"Task '{item.text()}' is due!")
-
-    def mark_task_complete(self, item):
-        item.setCheckState(Qt.Checked)
-        self.save_tasks()
+        # Fire anything already due; normally the scheduler's own timer does this
+        self.reminders.fire_due()
+
+    def mark_task_complete(self, task_id):
+        # Goes through the model so the view, the journal and the reminders all agree
+        row = self.task_model.row_of(task_id)
+        if row >= 0:
+            self.task_model.setData(self.task_model.index(row), Qt.Checked, Qt.CheckStateRole)
+
+    def import_tasks(self, path=None):
+        if self.importer is not None:
+            return
+        if not path:
+            path, _ = QFileDialog.getOpenFileName(self, "Import Tasks", "", FILE_FILTER)
+            if not path:
+                return
+        try:
+            self.importer = TaskImporter(path, self._import_batch, self)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Import Tasks", f"Could not import {path}: {e}")
+            return
+        self.importer.progress.connect(self._on_import_progress)
+        self.importer.finished.connect(self._on_import_finished)
+        self.import_button.setEnabled(False)
+        self.import_progress.setValue(0)
+        self.import_progress.show()
+        # Each batch is journaled; snapshotting as the journal grows would rewrite the
+        # file several times over, so the import ends with a single compact() instead
+        self.store.auto_compact = False
+        self.importer.start()
+
+    def _import_batch(self, rows):
+        # Completed rows are dropped: the store only keeps pending tasks
+        records = self.store.add_many((text, due, {"rrule": rrule} if rrule else {})
+                                      for text, due, rrule, done in rows if not done)
+        self.task_model.append(records)
+        self.index.add_many(records)
+        for record in records:
+            self.schedule_reminders(record)
+        return len(records)
+
+    def _on_import_progress(self, fraction, imported):
+        self.import_progress.setValue(int(fraction * 100))
+
+    def _on_import_finished(self, imported, skipped):
+        errors = self.importer.errors
+        self.importer.deleteLater()
+        self.importer = None
+        self.import_button.setEnabled(True)
+        self.import_progress.hide()
+        if self.search_input.text() or self.due_filter.currentIndex():
+            self.apply_filter()
+        # One snapshot for the whole import instead of replaying thousands of journal lines
+        self.store.auto_compact = True
+        self.store.compact()
+        if skipped:
+            details = "\n".join(errors)
+            QMessageBox.information(self, "Import Tasks",
+                                    f"Imported {imported} task(s); skipped {skipped} row(s).\n\n{details}")
+
+    def export_tasks(self, path=None):
+        if not path:
+            path, _ = QFileDialog.getSaveFileName(self, "Export Tasks", "tasks.csv", FILE_FILTER)
+            if not path:
+                return
+        try:
+            count = export_tasks(self.store.pending(), path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Export Tasks", f"Could not export to {path}: {e}")
+            return
+        print(f"[TaskManager] Exported {count} task(s) to {path}")
 
     def closeEvent(self, event):
         self.save_tasks()
         super().closeEvent(event)
 
+    def _on_pending_writes(self, count):
+        self.save_status.setText(f"Saving {count} change(s)..." if count else "All changes saved")
+
     def save_tasks(self):
-        # Save only unchecked tasks
-        tasks_to_save = []
-        for item, due in self.tasks:
-            if item.checkState() == Qt.Unchecked:
-                tasks_to_save.append({
-                    "text": item.text(),
-                    "due": due.toString("yyyy-MM-dd hh:mm")
-                })
-        with open(self.TASKS_FILE, "w") as f:
-            json.dump(tasks_to_save, f)
+        # Every change is already journaled; fold the journal into a fresh snapshot
+        # and wait for it so nothing is lost if the app exits next
+        self.store.compact()
+        self.store.flush()
 
     def load_tasks(self):
-        from PyQt5.QtCore import QDateTime
-        if not os.path.exists(self.TASKS_FILE):
-            return
-        try:
-            with open(self.TASKS_FILE, "r") as f:
-                tasks_to_load = json.load(f)
-            for task in tasks_to_load:
-                text = task["text"]
-                due = QDateTime.fromString(task["due"], "yyyy-MM-dd hh:mm")
-                item = QListWidgetItem(text)
-                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                item.setCheckState(Qt.Unchecked)
-                self.task_list.addItem(item)
-                self.tasks.append((item, due))
-        except Exception as e:
-            print(f"[TaskManager] Failed to load tasks: {e}")
+        # Due dates are already epoch ints; nothing to parse per task
+        records = self.store.pending()
+        self.task_model.set_records(records)
+        self.index.add_many(records)
+        for record in records:
+            self.schedule_reminders(record)
 
     def get_due_datetime(self, title, default_dt):
         from PyQt5.QtWidgets import QDialog, QVBoxLayout, QDialogButtonBox, QDateTimeEdit
@@ -120,10 +304,5 @@ class TaskManager(QWidget):
         else:
             return default_dt, False
 
-    def add_task_from_voice(self, text, due_qdatetime):
-        item = QListWidgetItem(f"{text} (Due: {due_qdatetime.toString('yyyy-MM-dd hh:mm')})")
-        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-        item.setCheckState(Qt.Unchecked)
-        self.task_list.addItem(item)
-        self.tasks.append((item, due_qdatetime))
-        self.save_tasks()
+    def add_task_from_voice(self, text, due_qdatetime, rrule=None):
+        self._add_record(self._store_task(text, due_qdatetime, rrule))
@@ -0,0 +1,288 @@
+# task_store.py
+# Task persistence as a snapshot (tasks.json) plus an append-only journal of
+# add/complete/edit operations. A mutation appends one line instead of rewriting every
+# task; the journal is folded into a fresh snapshot (temp file + rename) once it grows.
+# Writes are debounced and done off the GUI thread by a PersistenceWorker.
+import datetime
+import json
+import os
+import re
+from persistence import PersistenceWorker, DEBOUNCE_MS
+
+SNAPSHOT_VERSION = 3  # 3: due stored as epoch seconds
+COMPACT_MIN_OPS = 200
+DUE_FORMAT = "yyyy-MM-dd hh:mm"  # QDateTime format of the "due" field in older files
+_DUE_STRPTIME = "%Y-%m-%d %H:%M"
+
+_DUE_SUFFIX = re.compile(r" \(Due: [^)]*\)$")
+
+
+def _write_atomic(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def parse_due(value):
+    """Due time as epoch seconds; accepts epoch numbers or the older "yyyy-MM-dd hh:mm" strings."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.datetime.strptime(value, _DUE_STRPTIME).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+class TaskRecord:
+    """One task. Slots keep it to a few dozen bytes; rarely used fields live in extra."""
+    __slots__ = ("id", "text", "due", "done", "extra")
+    FIELDS = ("text", "due", "done")
+
+    def __init__(self, task_id, text, due, done=False, extra=None):
+        self.id = task_id
+        self.text = text
+        self.due = due  # epoch seconds
+        self.done = done
+        self.extra = extra
+
+    def update(self, fields):
+        for key, value in fields.items():
+            if key == "due":
+                self.due = parse_due(value)
+            elif key in self.FIELDS:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    def to_json(self):
+        data = {"id": self.id, "text": self.text, "due": self.due, "done": self.done}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        record = cls(data["id"], data.get("text", ""), parse_due(data.get("due")), bool(data.get("done", False)))
+        record.update({key: value for key, value in data.items() if key not in ("id", "op", "text", "due", "done")})
+        return record
+
+
+class TaskStore:
+    """Tasks keyed by integer id, each a TaskRecord with text, due (epoch seconds) and done.
+    A repeating task also has an "rrule" field (see recurrence.py); its due is the next
+    occurrence still to be done and moves forward instead of the task completing.
+
+    The snapshot holds every task still pending at the last compaction; the journal
+    replays on top of it. Completed tasks are dropped at compaction, matching the
+    old behaviour of only saving unchecked tasks.
+
+    Mutations update memory at once and queue their journal line; the lines (and a
+    snapshot, when compaction is due) are written by a background thread after a
+    short debounce. Pass debounce_ms=None to write synchronously instead.
+    """
+    def __init__(self, snapshot_path="tasks.json", journal_path=None, compact_min_ops=COMPACT_MIN_OPS,
+                 debounce_ms=DEBOUNCE_MS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + ".journal"
+        self.compact_min_ops = compact_min_ops
+        self.tasks = {}
+        self.next_id = 1
+        self.journal_ops = 0
+        self._pending_lines = []
+        self._compact_requested = False
+        self.auto_compact = True  # off while a bulk import runs; it compacts once at the end
+        self.worker = None if debounce_ms is None else PersistenceWorker(self._collect_writes, debounce_ms)
+        self.load()
+
+    # --- Loading ---
+
+    def load(self):
+        self.tasks = {}
+        self.next_id = 1
+        migrated = self._load_snapshot()
+        self.journal_ops, damaged = self._replay_journal()
+        if migrated or damaged:
+            # Old list-format file, or a journal with a bad line: rewrite straight away
+            self.compact()
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[TaskStore] Failed to load {self.snapshot_path}: {e}")
+            return False
+        if isinstance(data, list):
+            # Pre-journal format: [{"text": "... (Due: ...)", "due": "..."}]
+            for entry in data:
+                self._apply({"op": "add", "id": self.next_id,
+                             "text": _DUE_SUFFIX.sub("", entry.get("text", "")),
+                             "due": entry.get("due", "")})
+            return True
+        for task in data.get("tasks", []):
+            self.tasks[task["id"]] = TaskRecord.from_json(task)
+        self.next_id = max(data.get("next_id", 1), max(self.tasks, default=0) + 1)
+        return False
+
+    def _replay_journal(self):
+        """Apply the journal; returns (ops applied, whether a damaged line was skipped)."""
+        if not os.path.exists(self.journal_path):
+            return 0, False
+        count = 0
+        damaged = False
+        with open(self.journal_path, "r") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-append; everything before it is intact
+                    print(f"[TaskStore] Skipping damaged journal entry in {self.journal_path}")
+                    damaged = True
+                    continue
+                self._apply(op)
+                count += 1
+        if damaged:
+            self._truncate_torn_tail()
+        return count, damaged
+
+    def _truncate_torn_tail(self):
+        # Cut a fragment without a newline, so the next append starts on a fresh line
+        with open(self.journal_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _apply(self, op):
+        kind = op.get("op")
+        task_id = op.get("id")
+        if kind == "add":
+            self.tasks[task_id] = TaskRecord.from_json(op)
+            self.next_id = max(self.next_id, task_id + 1)
+        elif task_id in self.tasks:
+            if kind == "complete":
+                self.tasks[task_id].done = True
+            elif kind == "edit":
+                self.tasks[task_id].update(op.get("fields", {}))
+
+    # --- Writing: one journal line per mutation, batched by the worker ---
+
+    def _append(self, op):
+        self._apply(op)
+        self._pending_lines.append(json.dumps(op) + "\n")
+        self._count_ops(1)
+        self._request_write()
+
+    def _count_ops(self, count):
+        self.journal_ops += count
+        if self.auto_compact and self.journal_ops >= max(self.compact_min_ops, len(self.tasks)):
+            self._compact_requested = True
+
+    def _request_write(self, count=1):
+        if self.worker is not None:
+            self.worker.request(count)
+        else:
+            self._collect_writes()()
+
+    def _collect_writes(self):
+        # GUI thread: capture what to write; the returned job does the I/O
+        lines, self._pending_lines = self._pending_lines, []
+        snapshot = None
+        if self._compact_requested:
+            self._compact_requested = False
+            self.tasks = {record.id: record for record in self.pending()}
+            # Plain dicts are captured here; encoding them happens on the writer thread
+            snapshot = {
+                "version": SNAPSHOT_VERSION,
+                "next_id": self.next_id,
+                "tasks": [record.to_json() for record in self.tasks.values()],
+            }
+            self.journal_ops = 0
+        return lambda: self._write(lines, snapshot)
+
+    def _write(self, lines, snapshot):
+        if lines:
+            with open(self.journal_path, "a") as f:
+                f.write("".join(lines))
+        if snapshot is not None:
+            try:
+                _write_atomic(self.snapshot_path, json.dumps(snapshot))
+                # Only after the snapshot is safely in place can the journal go
+                if os.path.exists(self.journal_path):
+                    os.remove(self.journal_path)
+            except OSError as e:
+                print(f"[TaskStore] Compaction failed, keeping journal: {e}")
+
+    # --- Mutations ---
+
+    def add(self, text, due, **fields):
+        """Add a task due at epoch seconds due; returns its TaskRecord."""
+        task_id = self.next_id
+        self._append({"op": "add", "id": task_id, "text": text, "due": int(due), **fields})
+        return self.tasks[task_id]
+
+    def add_many(self, tasks):
+        """Add (text, due, fields) tuples as one batch: one write request for all of them.
+        Returns the new TaskRecords."""
+        records = []
+        for text, due, fields in tasks:
+            task_id = self.next_id
+            op = {"op": "add", "id": task_id, "text": text, "due": int(due), **fields}
+            self._apply(op)
+            self._pending_lines.append(json.dumps(op) + "\n")
+            records.append(self.tasks[task_id])
+        if records:
+            self._count_ops(len(records))
+            self._request_write(len(records))
+        return records
+
+    def complete(self, task_id):
+        self._append({"op": "complete", "id": task_id})
+
+    def edit(self, task_id, **fields):
+        self._append({"op": "edit", "id": task_id, "fields": fields})
+
+    def reopen(self, record):
+        """Mark record pending again. A completed task already dropped by compaction is
+        re-added under its id, as the same object the caller (the list model) holds."""
+        if self.tasks.get(record.id) is record:
+            self.edit(record.id, done=False)
+            return
+        record.done = False
+        self.tasks[record.id] = record
+        self.next_id = max(self.next_id, record.id + 1)
+        self._pending_lines.append(json.dumps({"op": "add", **record.to_json()}) + "\n")
+        self._count_ops(1)
+        self._request_write()
+
+    def get(self, task_id):
+        return self.tasks.get(task_id)
+
+    def pending(self):
+        return [record for record in self.tasks.values() if not record.done]
+
+    # --- Compaction ---
+
+    def compact(self):
+        """Fold the journal into a new snapshot of the pending tasks."""
+        self._compact_requested = True
+        self._request_write()
+
+    @property
+    def pending_writes(self):
+        return self.worker.pending if self.worker is not None else 0
+
+    def flush(self):
+        """Block until every change so far is on disk."""
+        if self.worker is not None:
+            self.worker.flush()
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.stop()
@@ -0,0 +1,24 @@
+# tests/conftest.py
+# Run from the repository root: python -m pytest -q
+# The modules are flat at the top level, and Qt needs no display in offscreen mode.
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def process_events(ms):
+    """Run the Qt event loop for ms milliseconds."""
+    from PyQt5.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
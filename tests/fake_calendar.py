@@ -0,0 +1,154 @@
+# tests/fake_calendar.py
+# A local stand-in for the Google Calendar API v3 events endpoints, shared by the
+# tests and benchmarks.py: a fake server with sync tokens and an HTTP client for it.
+import datetime
+import json
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from calendar_cache import PAGE_SIZE, SyncTokenExpired
+
+
+class RestCalendarClient:
+    """Calendar API v3 over plain HTTP (urllib), with the list_events/add_event/
+    delete_event of CalendarIntegration; talks to FakeCalendarServer so the sync can
+    be timed without Google credentials. bytes_received counts response bodies."""
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.bytes_received = 0
+
+    def _call(self, method, path, params=None, body=None):
+        url = self.base_url + path
+        if params:
+            url += "?" + urllib.parse.urlencode({k: v for k, v in params.items() if v is not None})
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(url, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                payload = response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 410:
+                raise SyncTokenExpired(e.reason)
+            raise
+        self.bytes_received += len(payload)
+        return json.loads(payload) if payload else None
+
+    def _events_path(self, calendar_id):
+        return f"/calendars/{urllib.parse.quote(calendar_id, safe='')}/events"
+
+    def list_events(self, calendar_id="primary", sync_token=None, page_token=None):
+        return self._call("GET", self._events_path(calendar_id),
+                          {"singleEvents": "true", "maxResults": PAGE_SIZE,
+                           "syncToken": sync_token, "pageToken": page_token})
+
+    def add_event(self, summary, start_dt, end_dt, description=None, calendar_id="primary"):
+        body = {
+            "summary": summary,
+            "description": description or "",
+            "start": {"dateTime": start_dt.isoformat(), "timeZone": "UTC"},
+            "end": {"dateTime": end_dt.isoformat(), "timeZone": "UTC"},
+        }
+        return self._call("POST", self._events_path(calendar_id), body=body)
+
+    def delete_event(self, event_id, calendar_id="primary"):
+        self._call("DELETE", f"{self._events_path(calendar_id)}/{urllib.parse.quote(event_id, safe='')}")
+
+
+class FakeCalendarServer(ThreadingHTTPServer):
+    """Calendar API v3 events list/insert/delete with sync tokens, on 127.0.0.1.
+
+    Every change bumps a version; an event remembers the version it last changed at,
+    and a sync token is simply the version it was issued at. Deleted events stay as
+    "cancelled" tombstones. Tokens older than min_token get HTTP 410, as the real
+    API does once it has forgotten them."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FakeCalendarHandler)
+        self.lock = threading.Lock()
+        self.events = {}  # id -> event
+        self.changed_at = {}  # id -> version
+        self.version = 0
+        self.min_token = 0
+        self.requests = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/calendar/v3"
+
+    def put(self, event):
+        with self.lock:
+            self.version += 1
+            event = dict(event, id=event.get("id") or f"ev{self.version}", updated=str(self.version))
+            self.events[event["id"]] = event
+            self.changed_at[event["id"]] = self.version
+            return event
+
+    def delete(self, event_id):
+        with self.lock:
+            self.version += 1
+            self.events[event_id] = {"id": event_id, "status": "cancelled"}
+            self.changed_at[event_id] = self.version
+
+    def page(self, sync_token, page_token, max_results):
+        with self.lock:
+            if sync_token is not None:
+                since = int(sync_token)
+                if since < self.min_token:
+                    return None
+                ids = [i for i, v in self.changed_at.items() if v > since]
+            else:
+                ids = [i for i, e in self.events.items() if e.get("status") != "cancelled"]
+            ids.sort(key=self.changed_at.get)
+            offset = int(page_token or 0)
+            response = {"items": [self.events[i] for i in ids[offset:offset + max_results]]}
+            if offset + max_results < len(ids):
+                response["nextPageToken"] = str(offset + max_results)
+            else:
+                response["nextSyncToken"] = str(self.version)
+            return response
+
+
+class _FakeCalendarHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, body=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self.server.requests += 1
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        response = self.server.page(query.get("syncToken"), query.get("pageToken"), int(query.get("maxResults", 250)))
+        if response is None:
+            self._reply(410, {"error": {"code": 410, "message": "Sync token is no longer valid"}})
+        else:
+            self._reply(200, response)
+
+    def do_POST(self):
+        self.server.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self._reply(200, self.server.put(body))
+
+    def do_DELETE(self):
+        self.server.requests += 1
+        self.server.delete(urllib.parse.unquote(self.path.rsplit("/", 1)[1]))
+        self._reply(204)
+
+
+def fake_event(i, start):
+    return {"summary": f"Meeting {i}", "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + datetime.timedelta(hours=1)).isoformat()}}
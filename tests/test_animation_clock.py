@@ -0,0 +1,98 @@
+# tests/test_animation_clock.py
+import pytest
+from PyQt5.QtWidgets import QWidget
+
+import animation_clock
+from animation_clock import AnimationClock
+from conftest import process_events
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(qapp, monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(animation_clock.time, "monotonic", fake)
+    clock = AnimationClock()
+    clock.fake = fake
+    return clock
+
+
+def advance(clock, seconds):
+    clock.fake.now += seconds
+    clock.tick()
+
+
+def test_frame_follows_elapsed_time_and_wraps(clock):
+    shown = []
+    clock.play("loop", [1, 2, 3, 4], 8, shown.append)
+    advance(clock, 0.0625)  # same frame, not repeated
+    advance(clock, 0.125)
+    advance(clock, 0.25)  # frames skipped while late are not replayed
+    advance(clock, 0.125)
+    assert shown == [0, 1, 3, 0]
+    assert clock.timer.isActive()
+
+
+def test_timer_waits_for_the_next_boundary(clock):
+    clock.play("loop", [1, 2, 3, 4], 4, lambda index: None)
+    clock.fake.now += 0.125
+    clock._reschedule()
+    assert clock.timer.interval() == 125
+
+
+def test_one_shot_animation_finishes_and_is_dropped(clock):
+    shown, done = [], []
+    clock.play("once", [1, 2], 8, shown.append, loop=False, on_finished=lambda: done.append(True))
+    advance(clock, 0.1875)
+    advance(clock, 0.125)
+    assert shown == [0, 1] and done == [True]
+    assert not clock.is_playing("once")
+    assert not clock.timer.isActive()
+
+
+def test_resume_keeps_time_or_continues_where_it_stopped(clock):
+    shown = []
+    clock.play("loop", list(range(10)), 8, shown.append)
+    clock.pause("loop")
+    assert not clock.timer.isActive()
+    advance(clock, 0.375)
+    clock.resume("loop")
+    assert shown == [0, 3]
+    clock.pause("loop")
+    advance(clock, 0.5)
+    clock.resume("loop", keep_time=False)
+    assert shown == [0, 3]
+    advance(clock, 0.125)
+    assert shown == [0, 3, 4]
+
+
+def test_hidden_host_stops_the_timer_until_shown(clock):
+    host = QWidget()
+    shown = []
+    clock.play("dog", [1, 2, 3, 4], 8, shown.append, host=host)
+    assert shown == [] and not clock.timer.isActive()
+    clock.fake.now += 0.25
+    host.show()
+    process_events(0)
+    assert shown == [2]  # caught up to the current time on show
+    assert clock.timer.isActive()
+    host.hide()
+    process_events(0)
+    assert not clock.timer.isActive()
+
+
+def test_empty_frame_set_waits_for_frames(clock):
+    frames, shown = [], []
+    clock.play("loading", frames, 8, shown.append)
+    advance(clock, 0.125)
+    assert clock.is_playing("loading") and shown == []
+    frames.extend([1, 2])
+    advance(clock, 0.125)
+    assert shown == [0]
@@ -0,0 +1,104 @@
+# tests/test_animation_manifest.py
+import pytest
+from PyQt5.QtCore import QObject, pyqtSignal
+
+import animation_clock
+from animation_clock import AnimationClock
+from animation_manifest import IDLE, DogAnimator, load_manifest, parse_manifest
+
+MANIFEST = {
+    "idle": {"frames": "idle_*.png", "fps": 4, "preload": 0},
+    "eating": {"frames": "eat_*.png", "fps": 4, "loop": False, "preload": 1},
+    "walking": {"frames": "walk_*.png", "fps": 4, "loop": False, "preload": 2, "then": "eating"},
+    "sleeping": {"frames": "sleep_*.png"},
+}
+
+
+class FakeLoader(QObject):
+    frame_loaded = pyqtSignal(object, int)
+    finished = pyqtSignal(object)
+
+    def __init__(self, frames):
+        super().__init__()
+        self.frames = frames
+        self.requests = []
+
+    def load(self, pattern, size, device_pixel_ratio, name):
+        self.requests.append(name)
+        return self.frames.get(pattern, [])
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def animator(qapp, monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(animation_clock.time, "monotonic", fake)
+    frames = {"idle_*.png": ["i0", "i1"], "eat_*.png": ["e0", "e1"], "walk_*.png": ["w0"]}
+    shown = []
+    animator = DogAnimator(parse_manifest(MANIFEST), FakeLoader(frames), AnimationClock(), None, shown.append)
+    animator.fake_time, animator.shown = fake, shown
+    return animator
+
+
+def advance(animator, seconds):
+    animator.fake_time.now += seconds
+    animator.clock.tick()
+
+
+def test_manifest_defaults_and_errors():
+    specs = parse_manifest(MANIFEST)
+    assert (specs["sleeping"].fps, specs["sleeping"].loop, specs["sleeping"].then) == (5.0, True, IDLE)
+    assert specs["sleeping"].preload is None
+    with pytest.raises(ValueError, match="no frames"):
+        parse_manifest({"idle": {"fps": 5}})
+    with pytest.raises(ValueError, match="idle"):
+        parse_manifest({"eating": {"frames": "eat_*.png"}})
+
+
+def test_shipped_manifest_loads_and_a_broken_one_falls_back(tmp_path, capsys):
+    assert {"idle", "eating", "playing", "walking"} <= set(load_manifest())
+    path = tmp_path / "animations.json"
+    path.write_text('{"eating": {"frames": "eat_*.png"}}')
+    assert list(load_manifest(str(path))) == [IDLE]
+    assert "Using built-in manifest" in capsys.readouterr().out
+
+
+def test_actions_play_then_hand_over_to_their_next_state(animator):
+    states = []
+    animator.state_changed.connect(states.append)
+    animator.start()
+    assert animator.shown == ["i0"]
+    advance(animator, 0.25)
+    assert animator.set_state("walking")
+    advance(animator, 0.25)  # walking ran out, eating takes over
+    assert animator.state == "eating"
+    advance(animator, 0.25)
+    advance(animator, 0.25)  # eating ran out
+    assert states == ["walking", "eating", IDLE]
+    assert animator.shown[:5] == ["i0", "i1", "w0", "e0", "e1"]
+    assert animator.shown[-1] == "i0"  # idle kept time underneath: 1s at 4 fps is frame 4 % 2
+
+
+def test_an_action_without_frames_keeps_the_dog_idle(animator):
+    animator.start()
+    assert not animator.set_state("sleeping")
+    assert animator.state == IDLE
+    assert animator.clock.is_playing(DogAnimator.IDLE_KEY)
+    assert not animator.clock.is_playing(DogAnimator.ACTION_KEY)
+
+
+def test_background_prefetch_follows_preload_order_one_at_a_time(animator):
+    idle = animator.start()
+    assert animator.loader.requests == ["idle"]
+    animator.loader.finished.emit(idle)
+    assert animator.loader.requests == ["idle", "eating"]
+    animator.loader.finished.emit(type("Set", (), {"name": "eating"})())
+    animator.loader.finished.emit(type("Set", (), {"name": "eating"})())  # stale, ignored
+    assert animator.loader.requests == ["idle", "eating", "walking"]
@@ -0,0 +1,23 @@
+# tests/test_benchmarks.py
+import benchmarks
+
+
+def test_compare_flags_slowdowns_and_missing_results():
+    baseline = {"a": {"x_ms": 10.0}, "b": {"x_ms": 10.0}, "c": {"x_ms": 10.0}}
+    results = {"a": {"x_ms": 20.0}, "b": {"x_ms": 10.1}}
+    assert benchmarks.compare(results, baseline) == [("c", None, None, None), ("a", "x_ms", 10.0, 20.0)]
+    assert benchmarks.compare(results, baseline, attempted={"a", "b"}) == [("a", "x_ms", 10.0, 20.0)]
+
+
+def test_failing_benchmark_exits_non_zero(qapp, monkeypatch, capsys):
+    def broken(size):
+        raise RuntimeError("boom")
+
+    def optional(size):
+        raise ImportError("no module named extra")
+
+    monkeypatch.setattr(benchmarks, "BENCHMARKS", [("optional", None, optional)])
+    assert benchmarks.main(["--repeat", "1"]) == 0
+    monkeypatch.setattr(benchmarks, "BENCHMARKS", [("broken", None, broken), ("optional", None, optional)])
+    assert benchmarks.main(["--repeat", "1"]) == 1
+    assert "broken: FAILED (RuntimeError: boom)" in capsys.readouterr().out
@@ -0,0 +1,89 @@
+# tests/test_blocklist.py
+import os
+import time
+
+import pytest
+
+from blocklist import Blocklist, BlocklistWatcher
+from conftest import process_events
+
+RULES = """
+youtube.com
+!youtube.com/feed/lectures     # course videos are fine
+reddit.com/r/funny
+app:com.netflix.Netflix
+app:com.google.*
+!app:com.google.docs*
+app:org.game?
+"""
+
+
+@pytest.fixture
+def blocklist():
+    return Blocklist.parse(RULES)
+
+
+@pytest.mark.parametrize("url, verdict", [
+    ("https://youtube.com/watch?v=1", True),
+    ("https://m.youtube.com/", True),
+    ("www.YouTube.com/feed/lectures/week1", False),
+    ("https://youtube.com/feed/lecturesX", True),  # whole segments only
+    ("https://notyoutube.com/", None),
+    ("https://reddit.com/r/funny/top", True),
+    ("https://reddit.com/r/python", None),
+    ("", None),
+])
+def test_urls_match_by_domain_and_path(blocklist, url, verdict):
+    assert blocklist.check_url(url) is verdict
+
+
+@pytest.mark.parametrize("app_id, verdict", [
+    ("com.netflix.Netflix", True),
+    ("com.google.Chrome", True),
+    ("com.google.docs.editor", False),
+    ("org.game1", True),
+    ("org.game12", None),
+    ("com.apple.Safari", None),
+])
+def test_apps_match_exactly_or_by_wildcard(blocklist, app_id, verdict):
+    assert blocklist.check_app(app_id) is verdict
+
+
+def test_more_specific_rules_win_and_allow_wins_ties():
+    blocklist = Blocklist.parse("!example.com\nnews.example.com\nexample.com/a\n!example.com/a")
+    assert blocklist.check_url("news.example.com/x") is True
+    assert blocklist.check_url("example.com/a/b") is False
+    assert blocklist.check_url("shop.example.com") is False
+
+
+def test_url_rule_overrides_the_app(blocklist):
+    assert blocklist.is_distracting("org.mozilla.firefox", "https://youtube.com/watch")
+    assert not blocklist.is_distracting("com.google.Chrome", "https://youtube.com/feed/lectures/1")
+    assert blocklist.is_distracting("com.google.Chrome", "https://docs.python.org")
+    assert not blocklist.is_distracting("org.mozilla.firefox", "https://docs.python.org")
+    assert blocklist.is_distracting("com.netflix.Netflix")
+    assert blocklist.rule_count == 7
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        process_events(20)
+    assert condition()
+
+
+def test_watcher_reloads_the_file_and_falls_back_to_defaults(qapp, tmp_path):
+    path = tmp_path / "blocklist.txt"
+    path.write_text("youtube.com\n")
+    watcher = BlocklistWatcher(str(path), default_rules=["reddit.com"])
+    reloads = []
+    watcher.reloaded.connect(reloads.append)
+    assert watcher.is_distracting(None, "youtube.com")
+    path.write_text("twitch.tv\n")
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    wait_for(lambda: reloads)
+    assert watcher.is_distracting(None, "twitch.tv")
+    assert not watcher.is_distracting(None, "youtube.com")
+    path.unlink()
+    wait_for(lambda: len(reloads) == 2)
+    assert watcher.is_distracting(None, "reddit.com")
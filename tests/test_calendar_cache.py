@@ -0,0 +1,134 @@
+# tests/test_calendar_cache.py
+import datetime
+import threading
+
+import pytest
+
+from calendar_cache import CalendarCache, PAGE_SIZE
+from fake_calendar import FakeCalendarServer, RestCalendarClient, fake_event
+
+BASE = datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def server():
+    server = FakeCalendarServer()
+    for i in range(PAGE_SIZE + 10):  # more than one page
+        server.put(fake_event(i, BASE + datetime.timedelta(hours=i)))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def live_ids(server):
+    return {i for i, e in server.events.items() if e.get("status") != "cancelled"}
+
+
+def cached_ids(cache):
+    return {e["id"] for e in cache.upcoming(limit=10 ** 6, now=0)}
+
+
+def test_incremental_sync_fetches_only_changes(server, tmp_path):
+    cache = CalendarCache(str(tmp_path / "calendar.sqlite3"))
+    client = RestCalendarClient(server.base_url)
+    assert cache.sync(client) == PAGE_SIZE + 10
+    assert cached_ids(cache) == live_ids(server)
+    full_bytes, client.bytes_received = client.bytes_received, 0
+    ids = sorted(server.events)
+    server.put(dict(server.events[ids[0]], summary="Moved"))
+    server.delete(ids[1])
+    server.put(fake_event("new", BASE))
+    assert cache.sync(client) == 3
+    assert client.bytes_received < full_bytes / 20
+    assert cached_ids(cache) == live_ids(server)
+    assert [e["summary"] for e in cache.upcoming(limit=10 ** 6, now=0) if e["id"] == ids[0]] == ["Moved"]
+    assert cache.sync_token() == str(server.version)
+
+
+def test_expired_token_falls_back_to_a_full_sync(server, tmp_path):
+    cache = CalendarCache(str(tmp_path / "calendar.sqlite3"))
+    client = RestCalendarClient(server.base_url)
+    cache.sync(client)
+    deleted = sorted(server.events)[0]
+    server.delete(deleted)
+    server.min_token = server.version + 1  # every token handed out so far is now 410
+    server.put(fake_event("new", BASE))
+    assert cache.sync(client) == len(live_ids(server))
+    assert cached_ids(cache) == live_ids(server)
+    assert deleted not in cached_ids(cache)
+    assert cache.sync_token() == str(server.version)
+
+
+def test_failed_sync_keeps_the_previous_events_and_token(server, tmp_path):
+    cache = CalendarCache(str(tmp_path / "calendar.sqlite3"))
+    cache.sync(RestCalendarClient(server.base_url))
+    token, before = cache.sync_token(), cached_ids(cache)
+    server.min_token = server.version + 1
+
+    class BrokenClient(RestCalendarClient):
+        def list_events(self, calendar_id="primary", sync_token=None, page_token=None):
+            if page_token:
+                raise OSError("connection reset")
+            return super().list_events(calendar_id, sync_token, page_token)
+
+    with pytest.raises(OSError):
+        cache.sync(BrokenClient(server.base_url))  # 410, then the full sync dies on page 2
+    assert cache.sync_token() == token
+    assert cached_ids(cache) == before
+
+
+# --- The production client, against a stand-in for the discovery-built service ---
+
+class FakeRequest:
+    def __init__(self, execute):
+        self.execute = execute
+
+
+class FakeEvents:
+    """service.events() as googleapiclient builds it, serving pages from a FakeCalendarServer."""
+    def __init__(self, server, http_error):
+        self.server = server
+        self.http_error = http_error
+        self.calls = []
+
+    def list(self, **params):
+        self.calls.append(params)
+
+        def execute():
+            response = self.server.page(params.get("syncToken"), params.get("pageToken"), params["maxResults"])
+            if response is None:
+                import httplib2
+                raise self.http_error(httplib2.Response({"status": 410}), b'{"error": {"code": 410}}')
+            return response
+        return FakeRequest(execute)
+
+
+class FakeService:
+    def __init__(self, events):
+        self._events = events
+
+    def events(self):
+        return self._events
+
+
+def test_calendar_integration_syncs_through_the_api_client(server, tmp_path):
+    errors = pytest.importorskip("googleapiclient.errors")
+    from calendar_integration import CalendarIntegration
+    events = FakeEvents(server, errors.HttpError)
+    integration = CalendarIntegration.__new__(CalendarIntegration)  # skips the OAuth flow
+    integration.service = FakeService(events)
+    integration.lock = threading.Lock()
+    cache = CalendarCache(str(tmp_path / "calendar.sqlite3"))
+
+    assert cache.sync(integration) == PAGE_SIZE + 10
+    assert [("syncToken" in c, "pageToken" in c) for c in events.calls] == [(False, False), (False, True)]
+    assert all(c["singleEvents"] and c["maxResults"] == PAGE_SIZE and "timeMin" not in c for c in events.calls)
+    token = cache.sync_token()
+    server.delete(sorted(server.events)[0])
+    events.calls.clear()
+    assert cache.sync(integration) == 1
+    assert [c.get("syncToken") for c in events.calls] == [token]
+    server.min_token = server.version + 1
+    server.put(fake_event("new", BASE))
+    assert cache.sync(integration) == len(live_ids(server))
+    assert cached_ids(cache) == live_ids(server)
@@ -0,0 +1,210 @@
+# tests/test_dog_animation.py
+import os
+import struct
+import time
+
+import pytest
+from PyQt5.QtCore import QThreadPool
+from PyQt5.QtGui import QColor, QImage
+
+import dog_animation
+from conftest import process_events
+from dog_animation import (FrameLoader, FrameSet, StreamingAnimation, is_streamed, load_atlas, load_frames,
+                           pack_atlas)
+from pixmap_cache import PixmapCache
+
+
+def write_frames(folder, count, width=40, height=20):
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        image = QImage(width, height, QImage.Format_ARGB32)
+        image.fill(QColor.fromHsv(i * 50 % 360, 200, 200))
+        image.save(os.path.join(folder, f"frame_{i:02d}.png"))
+    return os.path.join(folder, "frame_*.png")
+
+
+def no_decoding(*args):
+    raise AssertionError("frame decoded despite a warm atlas")
+
+
+def test_pack_atlas_lays_frames_left_to_right(qapp):
+    images = [QImage(w, h, QImage.Format_ARGB32) for w, h in ((10, 5), (20, 8), (4, 4))]
+    images.insert(1, QImage())  # frames that failed to decode are dropped
+    atlas, rects = pack_atlas(images)
+    assert rects == [(0, 0, 10, 5), (10, 0, 20, 8), (30, 0, 4, 4)]
+    assert (atlas.width(), atlas.height()) == (34, 8)
+    assert pack_atlas([QImage()]) == (None, [])
+
+
+def test_warm_atlas_is_read_without_decoding(qapp, tmp_path, monkeypatch):
+    pattern = write_frames(str(tmp_path / "frames"), 3)
+    cache_dir = str(tmp_path / "cache")
+    atlas, rects = load_atlas(pattern, (20, 20), 1.0, cache_dir)
+    assert rects == [(0, 0, 20, 10), (20, 0, 20, 10), (40, 0, 20, 10)]
+    monkeypatch.setattr(dog_animation, "scale_frame", no_decoding)
+    cached, cached_rects = load_atlas(pattern, (20, 20), 1.0, cache_dir)
+    assert cached_rects == rects
+    assert cached == atlas
+
+
+def test_changed_frames_or_size_rebuild_the_atlas(qapp, tmp_path):
+    folder = str(tmp_path / "frames")
+    pattern = write_frames(folder, 2)
+    cache_dir = str(tmp_path / "cache")
+    load_atlas(pattern, (20, 20), 1.0, cache_dir)
+    write_frames(folder, 3)
+    assert len(load_atlas(pattern, (20, 20), 1.0, cache_dir)[1]) == 3
+    atlas, rects = load_atlas(pattern, (20, 20), 2.0, cache_dir)
+    assert rects[0] == (0, 0, 40, 20)
+
+
+def test_truncated_atlas_file_is_rebuilt(qapp, tmp_path):
+    pattern = write_frames(str(tmp_path / "frames"), 2)
+    cache_dir = str(tmp_path / "cache")
+    atlas, _ = load_atlas(pattern, (20, 20), 1.0, cache_dir)
+    [atlas_file] = [name for name in os.listdir(cache_dir) if name.endswith(".atlas")]
+    with open(os.path.join(cache_dir, atlas_file), "r+b") as f:
+        f.truncate(100)
+    rebuilt, _ = load_atlas(pattern, (20, 20), 1.0, cache_dir)
+    assert rebuilt == atlas
+    assert os.path.getsize(os.path.join(cache_dir, atlas_file)) == atlas.byteCount()
+
+
+@pytest.mark.parametrize("dpr", [1.0, 2.0])
+def test_load_frames_cuts_pixmaps_at_the_device_pixel_ratio(qapp, tmp_path, dpr):
+    pattern = write_frames(str(tmp_path / "frames"), 2)
+    frames = load_frames(pattern, (20, 20), dpr, str(tmp_path / "cache"))
+    assert len(frames) == 2
+    assert frames[0].width() == 20 * dpr
+    assert frames[0].devicePixelRatio() == dpr
+    assert load_frames(str(tmp_path / "missing_*.png"), cache_dir=str(tmp_path / "cache")) == []
+
+
+def load_and_wait(loader, pattern, timeout=5.0):
+    loaded, finished = [], []
+    loader.frame_loaded.connect(lambda frame_set, index: loaded.append(index))
+    loader.finished.connect(finished.append)
+    frame_set = loader.load(pattern, (20, 20), 1.0, name="test")
+    deadline = time.monotonic() + timeout
+    while not finished and time.monotonic() < deadline:
+        process_events(10)
+    loader.pool.waitForDone()
+    process_events(0)
+    return frame_set, loaded, finished
+
+
+@pytest.fixture
+def make_loader(qapp, tmp_path):
+    loaders = []
+
+    def make():
+        loader = FrameLoader(pool=QThreadPool(), cache_dir=str(tmp_path / "cache"), cache=PixmapCache())
+        loaders.append(loader)
+        return loader
+    yield make
+    for loader in loaders:
+        loader.pool.waitForDone()
+
+
+def test_cold_load_delivers_every_frame_then_writes_the_atlas(make_loader, tmp_path):
+    pattern = write_frames(str(tmp_path / "frames"), 5)
+    loader = make_loader()
+    frame_set, loaded, finished = load_and_wait(loader, pattern)
+    assert finished == [frame_set]
+    assert sorted(loaded) == [0, 1, 2, 3, 4]
+    assert frame_set.is_complete() and frame_set.name == "test"
+    assert frame_set[0].width() == 20
+    assert len(load_atlas(pattern, (20, 20), 1.0, loader.cache_dir)[1]) == 5
+
+
+def test_warm_load_reads_the_atlas_without_decoding(make_loader, tmp_path, monkeypatch):
+    pattern = write_frames(str(tmp_path / "frames"), 3)
+    load_and_wait(make_loader(), pattern)
+    monkeypatch.setattr(dog_animation, "scale_frame", no_decoding)
+    frame_set, loaded, finished = load_and_wait(make_loader(), pattern)
+    assert loaded == [0, 1, 2]
+    assert frame_set.is_complete()
+
+
+def test_repeated_loads_share_one_frame_set(make_loader, tmp_path):
+    pattern = write_frames(str(tmp_path / "frames"), 3)
+    loader = make_loader()
+    first = loader.load(pattern, (20, 20), 1.0)
+    assert loader.load(pattern, (20, 20), 1.0) is first  # still loading
+    load_and_wait(loader, pattern)
+    frame_set, loaded, finished = load_and_wait(loader, pattern)  # resident in the cache
+    assert frame_set is first
+    assert loaded == [0] and finished == [first]
+    assert loader.cache.hits == 1
+
+
+def test_missing_frames_finish_straight_away(make_loader, tmp_path):
+    loader = make_loader()
+    finished = []
+    loader.finished.connect(finished.append)
+    frame_set = loader.load(str(tmp_path / "missing_*.png"))
+    assert finished == [frame_set] and len(frame_set) == 0
+
+
+def test_next_ready_skips_frames_still_loading():
+    frame_set = FrameSet("partial", 4)
+    assert frame_set.next_ready(0) is None
+    frame_set.set_frame(2, "b")
+    frame_set.set_frame(0, "a")
+    assert frame_set.next_ready(0) == 2
+    assert frame_set.next_ready(2) == 0
+    assert list(frame_set) == ["a", "b"] and not frame_set.is_complete()
+
+
+def write_gif(path, delays_ms):
+    """A 1x1 animated GIF, one frame per delay, alternating black and white."""
+    data = bytearray(b"GIF89a" + struct.pack("<HHBBB", 1, 1, 0x80, 0, 0) + b"\0\0\0\xff\xff\xff")
+    for i, delay in enumerate(delays_ms):
+        data += b"\x21\xf9\x04\0" + struct.pack("<H", delay // 10) + b"\0\0"
+        # 3-bit LZW codes: clear (4), the pixel, end (5)
+        data += b"\x2c" + struct.pack("<HHHHB", 0, 0, 1, 1, 0) + b"\x02\x02"
+        data += struct.pack("<H", 4 | (i % 2) << 3 | 5 << 6) + b"\0"
+    data += b"\x3b"
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_only_single_animated_files_are_streamed():
+    assert is_streamed("Dog_idle.gif") and is_streamed("walk.APNG")
+    assert not is_streamed("frames/*.gif")
+    assert not is_streamed("Dog tongue animation/Dog_Tongue_*.png")
+
+
+def test_streamed_gif_keeps_its_own_frame_delays(qapp, tmp_path):
+    animation = StreamingAnimation(write_gif(tmp_path / "a.gif", [50, 200, 100]), (20, 20))
+    assert len(animation) == 3
+    assert animation[0].width() == 20
+    list(animation)
+    assert list(animation.offsets) == [0, 50, 250, 350]
+    assert animation.duration_ms() == 350
+    assert [animation.index_at(t) for t in (0.0, 0.06, 0.26, 0.36)] == [0, 1, 2, 0]
+    assert animation.index_at(0.36, loop=False) is None
+    assert animation.next_boundary(0.06) == pytest.approx(0.25)
+    assert animation.next_boundary(0.36) == pytest.approx(0.4)  # second lap
+
+
+def test_streamed_frames_stay_within_the_look_ahead(qapp, tmp_path):
+    animation = StreamingAnimation(write_gif(tmp_path / "long.gif", [20] * 40), (20, 20), lookahead=4)
+    for index in range(40):
+        assert animation[index] is not None
+        process_events(0)  # let the prefetch top the buffer up
+        assert len(animation.buffer) <= 4
+        assert min(animation.buffer) >= index
+    assert len(animation.offsets) == 41
+    assert animation[3] is not None  # going back rewinds the reader
+    assert len(animation.buffer) <= 4
+    with pytest.raises(IndexError):
+        animation[40]
+
+
+def test_loader_streams_animated_files(make_loader, tmp_path):
+    path = write_gif(tmp_path / "a.gif", [100, 100])
+    frame_set, loaded, finished = load_and_wait(make_loader(), path)
+    assert isinstance(frame_set, StreamingAnimation)
+    assert finished == [frame_set] and loaded == [0]
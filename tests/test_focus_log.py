@@ -0,0 +1,84 @@
+# tests/test_focus_log.py
+import datetime
+import os
+
+import pytest
+
+import focus_log
+from focus_log import FocusLog
+
+
+def test_torn_append_is_cut_from_the_files(tmp_path):
+    directory = str(tmp_path / "focus_log")
+    log = FocusLog(directory)
+    log.append(1000.0, 60.0, "editor")
+    log.append(2000.0, 30.0, "browser", "example.com", True)
+    # Crash part way through an append: start written in full, duration only in part
+    with open(os.path.join(directory, "start.d"), "ab") as f:
+        f.write(b"\0" * 8)
+    with open(os.path.join(directory, "duration.f"), "ab") as f:
+        f.write(b"\0" * 2)
+    log = FocusLog(directory)
+    assert len(log) == 2
+    log.append(3000.0, 45.0, "terminal")
+    log = FocusLog(directory)
+    assert list(log.sessions(0, 10000)) == [
+        (1000.0, 60.0, "editor", None, False),
+        (2000.0, 30.0, "browser", "example.com", True),
+        (3000.0, 45.0, "terminal", None, False),
+    ]
+
+
+def at(day, hour, minute=0):
+    return datetime.datetime(2024, 3, day, hour, minute).timestamp()
+
+
+def test_switch_records_one_session_per_change(tmp_path):
+    log = FocusLog(str(tmp_path / "focus_log"))
+    log.switch("editor", None, False, now=at(4, 9))
+    log.switch("editor", None, False, now=at(4, 9, 30))  # unchanged
+    log.switch("browser", "reddit.com", True, now=at(4, 10))
+    log.switch(None, None, False, now=at(4, 10, 15))  # idle: closes without opening
+    assert log.current is None
+    assert list(log.sessions(at(4, 0), at(5, 0))) == [
+        (at(4, 9), 3600.0, "editor", None, False),
+        (at(4, 10), 900.0, "browser", "reddit.com", True),
+    ]
+
+
+def test_sessions_are_split_at_midnight_in_the_daily_rollup(tmp_path):
+    log = FocusLog(str(tmp_path / "focus_log"))
+    log.append(at(5, 23), 2 * 3600.0, "editor")
+    assert log.days["2024-03-05"]["seconds"] == 3600.0
+    assert log.days["2024-03-06"]["seconds"] == 3600.0
+    assert log.days["2024-03-05"]["sessions"] == 1 and log.days["2024-03-06"]["sessions"] == 0
+    assert log.weeks["2024-03-04"]["seconds"] == 7200.0
+
+
+def test_report_covers_whole_weeks_and_the_open_session(tmp_path):
+    log = FocusLog(str(tmp_path / "focus_log"))
+    log.append(at(1, 10), 600.0, "editor")  # outside a 14-day report ending on the 17th
+    for day in (4, 8, 11, 17):
+        log.append(at(day, 10), 3600.0, "editor")
+        log.append(at(day, 12), 1200.0, "browser", "youtube.com", True)
+    log.switch("browser", "youtube.com", True, now=at(17, 15))
+    report = log.report(days=14, now=at(17, 15, 30))
+    assert report["sessions"] == 9  # the open one included
+    assert report["seconds"] == 4 * 4800.0 + 1800.0
+    assert report["distracting"] == 4 * 1200.0 + 1800.0
+    assert report["ratio"] == pytest.approx(6600.0 / 21000.0)
+    assert report["apps"] == [("editor", 14400.0), ("browser", 6600.0)]
+    assert report["domains"] == [("youtube.com", 6600.0)]
+    assert log.report(days=1, now=at(17, 15, 30))["seconds"] == 4800.0 + 1800.0
+
+
+def test_rollups_are_rebuilt_from_the_log_when_missing_or_behind(tmp_path, monkeypatch):
+    directory = str(tmp_path / "focus_log")
+    monkeypatch.setattr(focus_log, "ROLLUP_SAVE_EVERY", 2)
+    log = FocusLog(directory)
+    for hour in range(9, 14):
+        log.append(at(6, hour), 1800.0, "editor", "docs.python.org")
+    reopened = FocusLog(directory)  # saved after 4 sessions, the 5th is folded in on load
+    assert reopened.days == log.days and reopened.folded == 5
+    os.remove(os.path.join(directory, "rollups.json"))
+    assert FocusLog(directory).weeks == log.weeks
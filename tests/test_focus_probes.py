@@ -0,0 +1,53 @@
+# tests/test_focus_probes.py
+import pytest
+
+from focus_probes import FocusProbe, MacProbe
+from helper_process import HelperProcess
+from probe_worker import ProbeWorker
+
+
+class FakeApp:
+    def bundleIdentifier(self):
+        return "com.apple.Safari"
+
+
+class FakeWorkspace:
+    def frontmostApplication(self):
+        return FakeApp()
+
+
+def mac_probe(helper):
+    # Skips __init__, which needs pyobjc
+    probe = MacProbe.__new__(MacProbe)
+    probe.workspace = FakeWorkspace()
+    probe.url_scripts = {"com.apple.Safari": "get URL of front document"}
+    probe.helper = helper
+    probe.quartz = None
+    return probe
+
+
+def test_failed_url_lookup_still_reports_the_app(qapp):
+    helper = HelperProcess(backend="linux")  # answers every script with an error
+    try:
+        worker = ProbeWorker(mac_probe(helper), timeout=5.0)
+        assert worker.probe(worker) == ("com.apple.Safari", None)
+    finally:
+        helper.close()
+
+
+def test_a_probe_without_probe_fails_when_created():
+    class Incomplete(FocusProbe):
+        def watch(self, worker):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_an_event_driven_probe_without_watch_fails_when_defined():
+    with pytest.raises(TypeError, match="watch"):
+        class Pushy(FocusProbe):
+            event_driven = True
+
+            def probe(self, worker):
+                return None, None
@@ -0,0 +1,103 @@
+# tests/test_notifications.py
+import pytest
+
+from notifications import LOW, NORMAL, URGENT, NotificationDispatcher, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def dispatcher(qapp):
+    dispatcher = NotificationDispatcher(clock=FakeClock())
+    dispatcher.shown = []
+    dispatcher.add_sink(lambda n: dispatcher.shown.append(n.message))
+    return dispatcher
+
+
+def test_token_bucket_allows_a_burst_then_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(0.5, 2, clock)
+    assert bucket.take() and bucket.take()
+    assert not bucket.take()
+    assert bucket.wait() == pytest.approx(2.0)
+    clock.now += 1
+    assert bucket.wait() == pytest.approx(1.0)
+    clock.now += 10  # never more than the burst
+    assert bucket.take() and bucket.take() and not bucket.take()
+
+
+def test_notify_only_queues_until_the_timer_fires(dispatcher):
+    dispatcher.notify("tasks", "Walk the dog")
+    assert dispatcher.shown == []
+    assert dispatcher.timer.isActive()
+    dispatcher.flush()
+    assert dispatcher.shown == ["Walk the dog"]
+    assert dispatcher.stats["delivered"] == 1
+
+
+def test_repeats_are_dropped_while_queued_and_just_after_showing(dispatcher):
+    dispatcher.notify("tasks", "Vet at 3pm", key="vet")
+    dispatcher.notify("tasks", "Vet at 3:30pm", key="vet")
+    dispatcher.flush()
+    assert dispatcher.shown == ["Vet at 3:30pm"]
+    dispatcher.clock.now += 30
+    dispatcher.notify("tasks", "Vet at 3:30pm", key="vet")
+    dispatcher.flush()
+    assert dispatcher.shown == ["Vet at 3:30pm"]
+    dispatcher.clock.now += 31
+    dispatcher.notify("tasks", "Vet at 3:30pm", key="vet")
+    dispatcher.flush()
+    assert len(dispatcher.shown) == 2
+    assert dispatcher.stats["duplicates"] == 2
+
+
+def test_notifications_with_a_summary_are_coalesced(dispatcher):
+    delivered = []
+    dispatcher.delivered.connect(delivered.append)
+    for text in ("Feed", "Walk", "Brush"):
+        dispatcher.notify("tasks", f"{text} is overdue", summary="{count} tasks overdue")
+    dispatcher.notify("tasks", "Vet today")
+    dispatcher.flush()
+    assert dispatcher.shown == ["3 tasks overdue", "Vet today"]
+    assert delivered[0].items == ["Feed is overdue", "Walk is overdue", "Brush is overdue"]
+    assert dispatcher.stats["coalesced"] == 2
+    dispatcher.notify("tasks", "Walk is overdue", summary="{count} tasks overdue")
+    dispatcher.flush()
+    assert len(dispatcher.shown) == 2  # each coalesced message counts as shown
+
+
+def test_bursts_are_rate_limited_per_source(dispatcher):
+    dispatcher.set_rate_limit("monitor", 2, 1)
+    for i in range(3):
+        dispatcher.notify("monitor", f"distracted {i}")
+    dispatcher.notify("tasks", "Walk the dog")
+    dispatcher.flush()
+    assert dispatcher.shown == ["distracted 0", "Walk the dog"]
+    assert dispatcher.timer.interval() == 30_001  # two a minute: next token in 30 s
+    dispatcher.clock.now += 30
+    dispatcher.flush()
+    assert dispatcher.shown[2:] == ["distracted 1"]
+    assert dispatcher.stats["rate_limited"] == 2
+
+
+def test_most_urgent_first_and_sinks_filter_by_priority_and_source(dispatcher, capsys):
+    urgent_only, pet_only = [], []
+    dispatcher.add_sink(lambda n: urgent_only.append(n.message), max_priority=URGENT)
+    dispatcher.add_sink(lambda n: pet_only.append(n.message), sources=["pet"])
+
+    def broken(notification):
+        raise RuntimeError("no display")
+    dispatcher.add_sink(broken)
+    dispatcher.notify("tasks", "later", priority=LOW)
+    dispatcher.notify("pet", "hungry", priority=NORMAL)
+    dispatcher.notify("tasks", "now", priority=URGENT)
+    dispatcher.flush()
+    assert dispatcher.shown == ["now", "hungry", "later"]
+    assert urgent_only == ["now"] and pet_only == ["hungry"]
+    assert "failed: no display" in capsys.readouterr().out
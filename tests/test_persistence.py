@@ -0,0 +1,35 @@
+# tests/test_persistence.py
+import time
+
+from conftest import process_events
+from task_store import TaskStore
+
+DEBOUNCE_MS = 50
+
+
+def test_changes_spread_over_a_live_loop_are_coalesced_per_window(qapp, tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = TaskStore(path, debounce_ms=DEBOUNCE_MS)
+    counts = []
+    store.worker.pending_changed.connect(counts.append)
+    expected = {}
+    start = time.perf_counter()
+    for i in range(300):
+        record = store.add(f"task {i}", 1893484800 + i)
+        expected[record.id] = record.text
+        if i % 4 == 0:
+            store.edit(record.id, text=f"task {i} (edited)")
+            expected[record.id] = f"task {i} (edited)"
+        process_events(2)  # about 600 ms of changes, a dozen debounce windows
+    process_events(3 * DEBOUNCE_MS)
+    store.flush()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    try:
+        writes = store.worker.writes
+        assert 3 <= writes <= elapsed_ms // DEBOUNCE_MS + 2  # batched, yet written as it goes
+        assert store.worker.gui_blocked_ms < 16.0  # under one frame in total
+        assert max(counts) > 1 and store.pending_writes == 0 and counts[-1] == 0
+        on_disk = TaskStore(path, debounce_ms=None)
+        assert {r.id: r.text for r in on_disk.pending()} == expected
+    finally:
+        store.close()
@@ -0,0 +1,82 @@
+# tests/test_pet_needs.py
+import pytest
+
+from pet_needs import DEFAULT_VALUES, NeedsModel
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def make_model(qapp, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # history file
+    clock = FakeClock()
+
+    def make():
+        model = NeedsModel(str(tmp_path / "pet_state.json"), clock=clock)
+        model.clock_ = clock
+        return model
+    return make
+
+
+def test_values_decay_from_the_timestamp_and_stop_at_zero(make_model):
+    model = make_model()
+    model.clock_.now += 40
+    assert model.values() == {"food": 65.0, "happiness": 60.0, "walk": 30.0}
+    model.clock_.now += 1000
+    assert model.value("walk") == 0.0
+
+
+def test_add_folds_decay_clamps_and_survives_a_restart(make_model):
+    model = make_model()
+    model.clock_.now += 40
+    model.add("food", 50)
+    assert model.value("food") == 100.0
+    model.add("walk", -100)
+    assert model.value("walk") == 0.0
+    model.clock_.now += 3600 * 2  # app closed for two hours
+    reopened = make_model()
+    assert reopened.value("happiness") == 0.0
+    assert reopened.value("food", now=reopened.updated + 8) == 97.0
+
+
+def test_timer_is_armed_for_the_first_threshold(make_model):
+    model = make_model()
+    # walk falls from 40 to 30 at 0.25 a second before the others
+    assert model.timer.isActive()
+    assert model.timer.interval() == 40_001
+    assert model.seconds_until("food", 30.0) == pytest.approx((DEFAULT_VALUES["food"] - 30.0) / 0.375)
+
+
+def test_each_threshold_is_announced_once_until_refilled(make_model):
+    model = make_model()
+    crossed = []
+    model.threshold_crossed.connect(lambda name, label: crossed.append(label))
+    model.clock_.now += 41
+    model._on_threshold_timer()
+    assert crossed == ["restless"]
+    assert model.timer.interval() == 39_001  # happiness: 59.25 down to 30
+    model.clock_.now += 40
+    model._on_threshold_timer()
+    assert crossed == ["restless", "bored"]
+    model.add("walk", 50)
+    model.clock_.now += 200
+    model._on_threshold_timer()
+    assert crossed == ["restless", "bored", "hungry", "restless"]
+
+
+def test_needs_already_low_at_start_are_not_announced(make_model):
+    model = make_model()
+    model.clock_.now += 45
+    model.save()
+    reopened = make_model()
+    crossed = []
+    reopened.threshold_crossed.connect(lambda name, label: crossed.append(label))
+    reopened._on_threshold_timer()
+    assert crossed == []
+    assert reopened.timer.interval() == 35_001  # happiness; walk is already below
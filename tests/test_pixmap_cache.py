@@ -0,0 +1,70 @@
+# tests/test_pixmap_cache.py
+from PyQt5.QtGui import QColor, QImage, QPixmap
+
+from pixmap_cache import PixmapCache, frames_bytes, pixmap_bytes
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = PixmapCache(budget_bytes=300)
+    for name in "abc":
+        cache.put(name, name.upper(), 100)
+    assert cache.get("a") == "A"
+    cache.put("d", "D", 100)
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert cache.resident_bytes == 300
+    assert cache.stats()["evictions"] == 1
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = PixmapCache(budget_bytes=300)
+    cache.put("a", "A", 100)
+    cache.put("a", "A2", 250)
+    assert cache.resident_bytes == 250 and len(cache.entries) == 1
+
+
+def test_an_oversized_entry_is_kept_alone():
+    cache = PixmapCache(budget_bytes=100)
+    cache.put("a", "A", 50)
+    cache.put("big", "BIG", 500)
+    assert list(cache.entries) == ["big"]
+    assert cache.get("big") == "BIG"
+
+
+def test_shrinking_the_budget_evicts_down_to_it():
+    cache = PixmapCache(budget_bytes=1000)
+    for i in range(10):
+        cache.put(i, i, 100)
+    cache.set_budget(250)
+    assert list(cache.entries) == [8, 9]
+    assert cache.resident_bytes == 200
+
+
+def test_hits_and_misses_are_counted():
+    cache = PixmapCache()
+    cache.put("a", "A", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_load_pixmap_is_keyed_by_size_and_device_pixel_ratio(qapp, tmp_path):
+    path = str(tmp_path / "dog.png")
+    image = QImage(64, 32, QImage.Format_ARGB32)
+    image.fill(QColor("brown"))
+    image.save(path)
+    cache = PixmapCache()
+    small = cache.load_pixmap(path, (32, 32))
+    assert (small.width(), small.height()) == (32, 16)
+    assert cache.load_pixmap(path, (32, 32)) is small
+    hidpi = cache.load_pixmap(path, (32, 32), 2.0)
+    assert hidpi.width() == 64 and hidpi.devicePixelRatio() == 2.0
+    assert cache.hits == 1 and len(cache.entries) == 2
+    assert cache.resident_bytes == pixmap_bytes(small) + pixmap_bytes(hidpi)
+    assert cache.load_pixmap(str(tmp_path / "missing.png"), (32, 32)).isNull()
+    assert len(cache.entries) == 2
+
+
+def test_frame_bytes_skip_frames_not_loaded(qapp):
+    pixmap = QPixmap(10, 10)
+    assert frames_bytes([pixmap, None, QPixmap()]) == pixmap_bytes(pixmap) > 0
@@ -0,0 +1,112 @@
+# tests/test_probe_worker.py
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import process_events
+from focus_probes import FakeProbe
+from helper_process import HelperProcess
+from probe_worker import FocusWatcher, ProbeTimeout, ProbeWorker
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+def test_slow_command_is_killed_at_the_timeout(qapp):
+    worker = ProbeWorker(lambda w: w.run_command(SLEEP), timeout=0.2)
+    started = time.monotonic()
+    with pytest.raises(ProbeTimeout):
+        worker.probe(worker)
+    assert time.monotonic() - started < 2.0
+
+
+def test_cancel_kills_a_running_command(qapp):
+    worker = ProbeWorker(lambda w: w.run_command(SLEEP), timeout=30.0)
+    threading.Timer(0.2, worker.cancel).start()
+    started = time.monotonic()
+    with pytest.raises(ProbeTimeout, match="cancelled"):
+        worker.probe(worker)
+    assert time.monotonic() - started < 2.0
+    with pytest.raises(ProbeTimeout, match="cancelled"):
+        worker.run_command(SLEEP)  # nothing new starts once cancelled
+
+
+def test_helper_request_times_out_and_is_cancellable(qapp):
+    helper = HelperProcess(backend="fake")
+    try:
+        worker = ProbeWorker(lambda w: w.request(helper, "sleep", seconds=30), timeout=0.2)
+        with pytest.raises(ProbeTimeout):
+            worker.probe(worker)
+        assert helper.request("ping") == "pong"  # restarted after the stuck one was killed
+
+        worker = ProbeWorker(lambda w: w.request(helper, "sleep", seconds=30), timeout=30.0)
+        threading.Timer(0.2, worker.cancel).start()
+        started = time.monotonic()
+        with pytest.raises(ProbeTimeout, match="cancelled"):
+            worker.probe(worker)
+        assert time.monotonic() - started < 2.0
+    finally:
+        helper.close()
+
+
+def test_stale_result_is_dropped(qapp):
+    worker = ProbeWorker(FakeProbe("editor", delay=0.3), timeout=0.1)
+    seen = []
+    worker.focus_changed.connect(lambda app, url: seen.append(app))
+    assert worker._probe() is False
+    assert worker.timeouts == 1 and seen == []
+
+
+def test_watcher_stops_promptly_while_a_probe_blocks(qapp):
+    calls = []
+
+    def probe(worker):
+        calls.append(1)
+        if len(calls) > 1:
+            worker.run_command(SLEEP)  # every later poll hangs until killed
+        return "editor", None
+
+    watcher = FocusWatcher(probe, interval_ms=50, timeout=30.0)
+    seen = []
+    watcher.focus_changed.connect(lambda app, url: seen.append(app))
+    watcher.start()
+    process_events(300)
+    assert seen == ["editor"] and len(calls) == 2
+    started = time.monotonic()
+    watcher.stop()
+    assert not watcher.probe_thread.isRunning()
+    assert time.monotonic() - started < 2.0
+    assert watcher.worker.timeouts == 0  # a cancelled probe is not counted as a timeout
+
+
+def test_event_driven_watcher_reports_pushes(qapp):
+    probe = FakeProbe("editor", event_driven=True)
+    watcher = FocusWatcher(probe)
+    seen = []
+    watcher.focus_changed.connect(lambda app, url: seen.append((app, url)))
+    watcher.start()
+    process_events(200)
+    probe.push("browser", "https://example.com/")
+    probe.push("browser", "https://example.com/")  # unchanged: not reported again
+    process_events(300)
+    watcher.stop()
+    assert seen == [("editor", None), ("browser", "https://example.com/")]
+
+
+def test_watcher_exposes_probe_counters(qapp):
+    probe = FakeProbe("editor")
+    watcher = FocusWatcher(probe, interval_ms=40)
+    updates = []
+    watcher.stats_changed.connect(updates.append)
+    watcher.start()
+    process_events(400)
+    assert updates and watcher.stats is updates[-1]
+    assert watcher.stats["probes"] == len(updates) and watcher.stats["timeouts"] == 0
+    probe.idle = float("inf")  # paused polls are counted separately
+    process_events(300)
+    watcher.stop()
+    stats = watcher.stats
+    assert stats["probes"] == probe.calls
+    assert stats["probes"] < stats["fixed_probes"]  # backed off while focus was stable
+    assert set(stats) == {"probes", "fixed_probes", "paused_checks", "saved_per_hour", "timeouts"}
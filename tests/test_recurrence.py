@@ -0,0 +1,53 @@
+# tests/test_recurrence.py
+import datetime
+import itertools
+
+import pytest
+
+from recurrence import RecurrenceRule
+
+
+def epoch(*args):
+    return datetime.datetime(*args).timestamp()
+
+
+def test_weekly_rule_keeps_its_weekday_when_far_overdue():
+    rule = RecurrenceRule.parse("FREQ=WEEKLY")
+    wednesday = epoch(2026, 1, 7, 9, 0)
+    due = rule.next_after(wednesday, epoch(2026, 3, 2, 12, 0))  # a Monday, weeks later
+    assert due == epoch(2026, 3, 4, 9, 0)
+
+
+def test_weekly_skip_matches_walking():
+    start = epoch(2026, 1, 7, 9, 0)
+    for text in ("FREQ=WEEKLY", "FREQ=WEEKLY;INTERVAL=2", "FREQ=WEEKLY;BYDAY=MO,FR", "FREQ=DAILY;INTERVAL=3"):
+        rule = RecurrenceRule.parse(text)
+        after = epoch(2026, 5, 20, 8, 0)
+        walked = next(t for t in rule.occurrences(start) if t >= after)
+        assert next(rule.occurrences(start, after=after)) == walked, text
+
+
+def test_daily_byday_keeps_only_those_weekdays():
+    rule = RecurrenceRule.parse("FREQ=DAILY;BYDAY=MO,WE,FR")
+    start = epoch(2026, 1, 6, 9, 0)  # a Tuesday
+    days = [datetime.datetime.fromtimestamp(t).strftime("%a %d") for t in itertools.islice(rule.occurrences(start), 5)]
+    assert days == ["Wed 07", "Fri 09", "Mon 12", "Wed 14", "Fri 16"]
+    assert str(rule) == "FREQ=DAILY;BYDAY=MO,WE,FR"
+
+
+def test_daily_byday_that_the_step_never_reaches_has_no_occurrences():
+    rule = RecurrenceRule.parse("FREQ=DAILY;INTERVAL=7;BYDAY=MO")
+    assert list(rule.occurrences(epoch(2026, 1, 7, 9, 0))) == []  # Wednesdays only
+
+
+@pytest.mark.parametrize("text", [
+    "FREQ=MONTHLY;BYDAY=2MO",
+    "FREQ=MONTHLY;BYDAY=-1FR",
+    "FREQ=WEEKLY;BYDAY=1MO",
+    "FREQ=MONTHLY;BYDAY=MO",
+    "FREQ=YEARLY;BYDAY=SU",
+    "FREQ=WEEKLY;BYDAY=XX",
+])
+def test_unsupported_byday_is_rejected(text):
+    with pytest.raises(ValueError):
+        RecurrenceRule.parse(text)
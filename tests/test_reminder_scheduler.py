@@ -0,0 +1,44 @@
+# tests/test_reminder_scheduler.py
+import time
+
+from conftest import process_events
+from reminder_scheduler import ReminderScheduler
+
+
+def test_rescheduling_keeps_the_heap_bounded(qapp):
+    now = [1000.0]
+    scheduler = ReminderScheduler(lambda key, payload: None, clock=lambda: now[0])
+    for task_id in range(50):
+        scheduler.schedule((task_id, "due"), 2000 + task_id)
+    for edit in range(200):  # every task edited over and over
+        for task_id in range(50):
+            scheduler.cancel((task_id, "upcoming"))
+            scheduler.schedule((task_id, "due"), 2000 + task_id + edit)
+    assert len(scheduler) == 50
+    assert len(scheduler.heap) <= 2 * 50 + 1
+    assert scheduler.next_instant() == 2000 + 199
+
+
+def test_fires_in_order_after_rebuilds(qapp):
+    fired = []
+    now = [1000.0]
+    scheduler = ReminderScheduler(lambda key, payload: fired.append((key, payload)), clock=lambda: now[0])
+    for i in range(100):
+        scheduler.schedule(i, 1500 + i, payload=i)
+    for i in range(0, 100, 2):
+        scheduler.cancel(i)  # stale entries now outnumber live ones
+    for i in range(1, 100, 2):
+        scheduler.schedule(i, 1100 - i, payload=-i)
+    now[0] = 2000.0
+    scheduler.fire_due()
+    assert fired == [(i, -i) for i in range(99, 0, -2)]
+    assert len(scheduler) == 0
+
+
+def test_timer_fires_the_earliest_reminder(qapp):
+    fired = []
+    scheduler = ReminderScheduler(lambda key, payload: fired.append(key))
+    scheduler.schedule("later", time.time() + 60)
+    scheduler.schedule("soon", time.time() + 0.05)
+    process_events(200)
+    assert fired == ["soon"]
@@ -0,0 +1,37 @@
+# tests/test_sprite_widget.py
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QColor, QPixmap
+
+import sprite_widget
+from sprite_widget import SpriteWidget, changed_rect
+
+
+def frame(i):
+    pixmap = QPixmap(32, 32)
+    pixmap.fill(QColor.fromHsv(i * 37 % 360, 200, 200))
+    return pixmap
+
+
+def test_changed_rect_bounds_the_differing_pixels(qapp):
+    old = QPixmap(32, 32)
+    old.fill(Qt.white)
+    image = old.toImage()
+    image.setPixel(5, 7, QColor(Qt.black).rgba())
+    image.setPixel(9, 20, QColor(Qt.black).rgba())
+    assert changed_rect(old.toImage(), image) == QRect(5, 7, 5, 14)
+    assert changed_rect(old.toImage(), old.toImage()).isEmpty()
+
+
+def test_dirty_cache_stays_bounded_and_reuses_pairs(qapp, monkeypatch):
+    monkeypatch.setattr(sprite_widget, "DIRTY_CACHE_SIZE", 8)
+    widget = SpriteWidget()
+    widget.resize(32, 32)
+    loop = [frame(i) for i in range(4)]
+    for pixmap in loop * 3:
+        widget.setPixmap(pixmap)
+    cached = dict(widget._dirty_cache)
+    assert len(cached) == 4  # one per pair in the loop, computed on the first lap only
+    for lap in range(20):  # frames decoded afresh each lap, as QMovie does
+        for i in range(4):
+            widget.setPixmap(frame(i))
+    assert len(widget._dirty_cache) == 8
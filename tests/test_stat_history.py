@@ -0,0 +1,110 @@
+# tests/test_stat_history.py
+from stat_history import BUCKET_DAYS, RAW_DAYS, Ring, StatHistory
+
+STATS = ("hunger", "energy", "happiness")
+HOUR = 3600
+T0 = 1_800_000_000 - 1_800_000_000 % 86400  # midnight UTC, on the bucket grid
+
+
+def values(v):
+    return {s: float(v) for s in STATS}
+
+
+def test_memory_per_day_matches_the_header():
+    history = StatHistory(STATS)
+    assert history.raw.nbytes() / RAW_DAYS == 1440 * (8 + 3 * 4)  # 28.1 KiB/day
+    assert history.buckets.nbytes() / BUCKET_DAYS == 24 * (8 + 4 + 3 * 3 * 4)  # 1.1 KiB/day
+    history.backfill(lambda t: values(50), T0 + 5 * 86400)
+    assert history.nbytes() == history.raw.nbytes() + history.buckets.nbytes()  # never grows
+
+
+def test_ring_wraps_around_keeping_the_newest_rows():
+    ring = Ring(4, ["v"])
+    for t in range(10):
+        ring.append(float(t), {"v": t * 10})
+    assert ring.size == 4
+    assert [ring.time(i) for i in range(4)] == [6.0, 7.0, 8.0, 9.0]
+    assert [ring.get("v", i) for i in range(4)] == [60.0, 70.0, 80.0, 90.0]
+    assert ring.bisect_left(7.5) == 2 and ring.first_time() == 6.0 and ring.last_time() == 9.0
+
+
+def test_record_ignores_samples_out_of_order():
+    history = StatHistory(STATS)
+    history.record(T0 + 60, values(1))
+    history.record(T0, values(2))
+    history.record(T0 + 60, values(3))
+    assert history.raw.size == 1
+
+
+def test_backfill_is_capped_at_the_raw_span():
+    history = StatHistory(STATS, raw_days=1)
+    history.record(T0, values(0))
+    now = T0 + 30 * 86400
+    calls = []
+    history.backfill(lambda t: calls.append(t) or values(1), now)
+    assert len(calls) == history.raw.capacity + 1
+    assert calls[0] == now - history.raw.capacity * 60 and calls[-1] == now
+    assert history.raw.size == history.raw.capacity
+
+
+def test_query_uses_buckets_before_the_raw_window_and_downsamples():
+    history = StatHistory(STATS, raw_days=1)
+    history.backfill(lambda t: values((t - T0) // HOUR), T0)  # start the grid at T0
+    t = T0 + 60
+    while t <= T0 + 3 * 86400:
+        history.record(t, values((t - T0) // HOUR))
+        t += 60
+    raw_first = history.raw.first_time()
+    assert raw_first == T0 + 2 * 86400 + 60
+    old = history.query("hunger", T0, T0 + 6 * HOUR)
+    assert [row[0] for row in old] == [T0 + h * HOUR for h in range(6)]  # one row per hourly bucket
+    assert old[2][1:] == (2.0, 2.0, 2.0)
+    recent = history.query("hunger", raw_first, raw_first + 10 * 60)
+    assert len(recent) == 10 and recent[0] == (raw_first, 48.0, 48.0, 48.0)  # raw samples
+    span = history.query("hunger", T0, T0 + 3 * 86400, max_points=24)
+    assert len(span) <= 24
+    assert span[0][1] == 0.0 and span[-1][2] == 71.0  # min/max survive the merge
+    assert all(lo <= mean <= hi for _, lo, hi, mean in span)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = StatHistory(STATS, raw_days=1, bucket_days=2)
+    for i in range(3000):  # wraps the raw ring
+        history.record(T0 + i * 60, values(i % 100))
+    history.save(path)
+    loaded = StatHistory(STATS, raw_days=1, bucket_days=2)
+    loaded.load(path)
+    for stat in STATS:
+        assert loaded.query(stat, T0, T0 + 3000 * 60, 10 ** 6) == history.query(stat, T0, T0 + 3000 * 60, 10 ** 6)
+    assert loaded.last_time() == history.last_time()
+
+
+def test_saving_mid_hour_does_not_split_the_bucket(tmp_path):
+    path = str(tmp_path / "history.bin")
+    history = StatHistory(STATS)
+    for i in range(30):
+        history.record(T0 + i * 60, values(10))
+    history.save(path)
+    for i in range(30, 60):
+        history.record(T0 + i * 60, values(40))
+    history.record(T0 + HOUR, values(0))  # closes the hour
+    assert history.buckets.size == 1
+    assert history.buckets.get("count", 0) == 60
+    assert (history.buckets.get("hunger.min", 0), history.buckets.get("hunger.max", 0),
+            history.buckets.get("hunger.mean", 0)) == (10.0, 40.0, 25.0)
+
+
+def test_damaged_file_leaves_the_history_untouched(tmp_path):
+    path = str(tmp_path / "history.bin")
+    saved = StatHistory(STATS, raw_days=1, bucket_days=2)
+    for i in range(200):
+        saved.record(T0 + i * 60, values(1))
+    saved.save(path)
+    with open(path, "rb+") as f:
+        f.truncate(f.seek(0, 2) - 100)  # cut into the bucket ring
+    history = StatHistory(STATS, raw_days=1, bucket_days=2)
+    history.record(T0 - 60, values(7))
+    history.load(path)
+    assert history.raw.size == 1 and history.raw.get("hunger", 0) == 7.0
+    assert history.buckets.size == 0
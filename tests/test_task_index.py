@@ -0,0 +1,69 @@
+# tests/test_task_index.py
+import datetime
+
+from task_index import TaskIndex
+from task_store import TaskRecord
+
+NOW = datetime.datetime(2024, 3, 13, 12, 0).timestamp()
+HOUR = 3600
+DAY = 86400
+
+
+def records():
+    return [
+        TaskRecord(1, "Buy dog food", NOW - DAY),
+        TaskRecord(2, "Walk the dog", NOW + 2 * HOUR),
+        TaskRecord(3, "Book vet appointment", NOW + 3 * DAY),
+        TaskRecord(4, "Buy birthday present", NOW + 30 * DAY),
+        TaskRecord(5, "Brush dog", NOW - 2 * DAY, extra={"rrule": "FREQ=DAILY"}),
+    ]
+
+
+def test_every_word_matches_as_a_prefix():
+    index = TaskIndex(records())
+    assert index.search("dog") == {1, 2, 5}
+    assert index.search("BU do") == {1}
+    assert index.search("b") == {1, 3, 4, 5}
+    assert index.search("cat") == set()
+    assert index.search("  ") is None
+
+
+def test_bulk_and_incremental_adds_agree():
+    bulk = TaskIndex(records())
+    incremental = TaskIndex()
+    for record in records():
+        incremental.add(record)
+    assert bulk.vocab == incremental.vocab
+    assert bulk.due == incremental.due
+    assert bulk.postings == incremental.postings
+
+
+def test_removing_and_editing_keep_the_indexes_in_step():
+    index = TaskIndex(records())
+    index.remove(3)
+    assert 3 not in index and len(index) == 4
+    assert "vet" not in index.vocab and "book" not in index.postings
+    assert index.due_between(NOW, NOW + 7 * DAY) == {2, 5}
+    index.update(TaskRecord(2, "Walk the cat", NOW + 10 * DAY))
+    assert index.search("dog") == {1, 5}
+    assert index.search("ca") == {2}
+    assert index.vocab == sorted(index.postings)
+    index.remove(42)  # unknown ids are ignored
+
+
+def test_due_filters_include_the_next_occurrence_of_repeating_tasks():
+    index = TaskIndex(records())
+    assert index.due_filter("All", NOW) is None
+    assert index.due_filter("Overdue", NOW) == {1, 5}
+    assert index.due_filter("Due today", NOW) == {2, 5}
+    assert index.due_filter("Next 7 days", NOW) == {2, 3, 5}
+    assert index.due_between(NOW + 2 * HOUR, NOW + 3 * HOUR) == {2}  # start is inclusive
+    assert index.due_between(NOW + HOUR, NOW + 2 * HOUR) == set()  # end is not
+
+
+def test_query_combines_text_and_due():
+    index = TaskIndex(records())
+    assert index.query("", "All", NOW) is None
+    assert index.query("dog", "All", NOW) == {1, 2, 5}
+    assert index.query("", "Overdue", NOW) == {1, 5}
+    assert index.query("dog", "Due today", NOW) == {2, 5}
@@ -0,0 +1,35 @@
+# tests/test_task_io.py
+import gc
+
+from conftest import process_events
+from task_io import TaskImporter, _unfold, export_tasks, read_ics
+from task_store import TaskRecord
+
+
+def test_import_streams_batches_and_leaves_gc_alone(qapp, tmp_path):
+    path = tmp_path / "tasks.csv"
+    path.write_text("text,due\n" + "".join(f"task {i},2030-01-01 09:00\n" for i in range(450)) + ",no text\n")
+    batches, done = [], []
+    importer = TaskImporter(str(path), lambda batch: batches.append(batch) or len(batch), batch_size=200)
+    importer.finished.connect(lambda imported, skipped: done.append((imported, skipped)))
+    frozen = gc.get_freeze_count()
+    importer.start()
+    process_events(300)
+    assert done == [(450, 1)]
+    assert [len(batch) for batch in batches] == [200, 200, 50]
+    assert batches[0][0][0] == "task 0"
+    assert gc.isenabled() and gc.get_freeze_count() == frozen
+
+
+def test_ics_export_folds_at_75_octets_between_characters(tmp_path):
+    text = "Café 会議の準備 🐶 " * 12
+    record = TaskRecord(1, text, 1893484800)
+    path = str(tmp_path / "tasks.ics")
+    export_tasks([record], path)
+    raw = open(path, "rb").read()
+    lines = raw.split(b"\r\n")
+    assert max(len(line) for line in lines) <= 75
+    assert sum(1 for line in lines if line.startswith(b" ")) > 1
+    for line in lines:
+        line.decode("utf-8")  # every physical line is whole UTF-8
+    assert [t for t in read_ics(_unfold(open(path, encoding="utf-8")))][0]["text"] == text
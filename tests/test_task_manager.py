@@ -0,0 +1,60 @@
+# tests/test_task_manager.py
+import time
+
+import pytest
+
+from conftest import process_events
+from task_manager import TaskManager
+
+DAY = 86400
+
+
+@pytest.fixture
+def manager(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(TaskManager, "TASKS_FILE", str(tmp_path / "tasks.json"))
+    manager = TaskManager()
+    yield manager
+    manager.store.close()
+    manager.deleteLater()
+
+
+def test_due_alert_then_tick_moves_a_daily_task_on_once(manager):
+    due = int(time.time()) - 60
+    record = manager._add_record(manager.store.add("water plants", due, rrule="FREQ=DAILY"))
+    manager._on_reminder((record.id, "due"), None)
+    # Alerting leaves the task where it is: still pending, still overdue
+    assert record.due == due and not record.done
+    assert record.id in manager.index.query("", "Overdue")
+    # ...and re-arms the alert for the next occurrence
+    assert manager.reminders.entries[(record.id, "due")][0] == due + DAY
+    record.done = True
+    manager._on_completion_toggled(record)
+    assert record.due == due + DAY and not record.done
+    assert manager.reminders.entries[(record.id, "due")][0] == due + DAY
+
+
+def test_ticking_an_overdue_daily_task_skips_missed_occurrences(manager):
+    due = int(time.time()) - 3 * DAY - 60
+    record = manager._add_record(manager.store.add("stretch", due, rrule="FREQ=DAILY"))
+    record.done = True
+    manager._on_completion_toggled(record)
+    assert record.due == due + 4 * DAY
+
+
+def test_import_writes_one_snapshot(manager, tmp_path):
+    path = tmp_path / "import.csv"
+    path.write_text("text,due\n" + "".join(f"task {i},2030-01-01 09:00\n" for i in range(20000)))
+    snapshots = []
+    collect = manager.store.worker.collect
+
+    def counting_collect():
+        snapshots.append(manager.store._compact_requested)
+        return collect()
+    manager.store.worker.collect = counting_collect
+    manager.import_tasks(str(path))
+    while manager.importer is not None:
+        process_events(20)
+    manager.store.flush()
+    assert len(manager.store.pending()) == 20000
+    assert sum(snapshots) == 1 and snapshots[-1]  # only the compact() at the end
+    assert manager.store.journal_ops == 0
@@ -0,0 +1,60 @@
+# tests/test_task_model.py
+import pytest
+from PyQt5.QtCore import Qt
+
+from task_model import TaskListModel, format_due
+from task_store import TaskRecord
+
+DUE = 1_700_000_000
+
+
+@pytest.fixture
+def model(qapp):
+    model = TaskListModel()
+    model.set_records(TaskRecord(i, f"task {i}", DUE + i * 3600) for i in range(1, 21))
+    return model
+
+
+def test_rows_are_formatted_when_asked(model):
+    assert model.rowCount() == 20
+    index = model.index(2)
+    assert model.data(index) == f"task 3 (Due: {format_due(DUE + 3 * 3600)})"
+    assert model.data(index, Qt.CheckStateRole) == Qt.Unchecked
+    assert model.data(index, Qt.UserRole) == 3
+    model.records[2].extra = {"rrule": "FREQ=WEEKLY"}
+    assert ", repeats " in model.data(index)
+
+
+def test_checking_a_row_reports_the_toggle_once(model):
+    toggled, changed = [], []
+    model.completion_toggled.connect(toggled.append)
+    model.dataChanged.connect(lambda first, last, roles: changed.append(first.row()))
+    assert model.setData(model.index(4), Qt.Checked, Qt.CheckStateRole)
+    assert model.setData(model.index(4), Qt.Checked, Qt.CheckStateRole)
+    assert not model.setData(model.index(4), "renamed", Qt.EditRole)
+    assert [record.id for record in toggled] == [5] and changed == [4]
+    assert model.record(5).done
+
+
+def test_filter_keeps_insertion_order(model):
+    model.set_filter({17, 3, 9, 999})
+    assert model.rowCount() == 3
+    assert [model.data(model.index(row), Qt.UserRole) for row in range(3)] == [3, 9, 17]
+    assert model.row_of(9) == 1 and model.row_of(4) == -1
+    model.set_filter(range(1, 16))  # large result takes the in-order pass
+    assert model.rowCount() == 15 and model.row_of(15) == 14
+    model.set_filter(None)
+    assert model.rowCount() == 20 and model.row_of(15) == 14
+
+
+def test_append_inserts_rows_only_when_unfiltered(model):
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.append([TaskRecord(21, "new", DUE), TaskRecord(22, "newer", DUE)])
+    assert inserted == [(20, 21)] and model.rowCount() == 22
+    model.set_filter({1})
+    model.append([TaskRecord(23, "hidden", DUE)])
+    assert inserted == [(20, 21)] and model.rowCount() == 1
+    assert model.record(23).text == "hidden"
+    model.set_filter(None)
+    assert model.row_of(23) == 22
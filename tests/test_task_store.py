@@ -0,0 +1,32 @@
+# tests/test_task_store.py
+from task_store import TaskStore
+
+
+def open_store(tmp_path):
+    return TaskStore(str(tmp_path / "tasks.json"), debounce_ms=None)
+
+
+def test_torn_journal_line_does_not_swallow_the_next_append(tmp_path):
+    store = open_store(tmp_path)
+    store.add("a", 1000)
+    store.add("b", 2000)
+    with open(store.journal_path, "a") as f:
+        f.write('{"op": "add", "id": 3, "te')  # crash mid-append
+    store = open_store(tmp_path)
+    store.add("c-after-crash", 3000)
+    store = open_store(tmp_path)
+    assert sorted(record.text for record in store.pending()) == ["a", "b", "c-after-crash"]
+
+
+def test_unticking_a_task_dropped_by_compaction_keeps_it(tmp_path):
+    store = open_store(tmp_path)
+    record = store.add("walk the dog", 1000)
+    record.done = True
+    store.complete(record.id)
+    store.compact()
+    assert store.get(record.id) is None
+    record.done = False
+    store.reopen(record)
+    assert store.get(record.id) is record
+    store = open_store(tmp_path)
+    assert [(r.id, r.text, r.done) for r in store.pending()] == [(record.id, "walk the dog", False)]